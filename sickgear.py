@@ -763,7 +763,16 @@ class SickGear(object):
                 src_file = os.path.join(src_dir, filename)
                 dst_file = os.path.join(dst_dir, filename)
                 bak_file = os.path.join(dst_dir, '%s.bak' % filename)
+                if filename.endswith('.db') and os.path.isfile(dst_file):
+                    # write the WAL journal into the db before it is moved aside
+                    db.DBConnection(filename).checkpoint()
+                # pooled connections opened by initialize must not keep using the file that is moved aside
+                db.connection_pool.release(dst_file, all_threads=True)
                 shutil.move(dst_file, bak_file)
+                # a WAL journal left next to the restored db would be applied to it
+                for cur_suffix in ('-wal', '-shm'):
+                    if os.path.isfile(dst_file + cur_suffix):
+                        shutil.move(dst_file + cur_suffix, bak_file + cur_suffix)
                 shutil.move(src_file, dst_file)
 
             os.rmdir(src_dir)
@@ -788,6 +797,9 @@ class SickGear(object):
                 except (BaseException, Exception):
                     pass
 
+            # close all pooled db connections
+            db.close_all_connections()
+
             # if run as daemon delete the pidfile
             if self.run_as_daemon and self.create_pid:
                 self.remove_pid_file(self.pid_file)
@@ -36,9 +36,9 @@ import zlib
 
 # noinspection PyPep8Naming
 import encodingKludge as ek
-from . import classes, db, helpers, image_cache, indexermapper, logger, metadata, naming, people_queue, providers, \
-    scene_exceptions, scene_numbering, scheduler, search_backlog, search_propers, search_queue, search_recent, \
-    show_queue, show_updater, subtitles, trakt_helpers, traktChecker, version_checker, watchedstate_queue
+from . import classes, db, helpers, image_cache, indexermapper, logger, metadata, naming, page_cache, people_queue, \
+    providers, scene_exceptions, scene_numbering, scheduler, search_backlog, search_propers, search_queue, \
+    search_recent, show_queue, show_updater, subtitles, trakt_helpers, traktChecker, version_checker, watchedstate_queue
 from . import auto_post_processer, properFinder  # must come after the above imports
 from .common import SD, SKIPPED, USER_AGENT
 from .config import check_section, check_setting_int, check_setting_str, ConfigMigrator, minimax
@@ -63,7 +63,7 @@ import sg_helpers
 
 # noinspection PyUnreachableCode
 if False:
-    from typing import AnyStr, Dict, List
+    from typing import AnyStr, Dict, List, Set, Tuple
     from adba import Connection
     from .event_queue import Events
     from .tv import TVShow
@@ -85,6 +85,7 @@ MY_FULLNAME = None
 MY_ARGS = []
 SYS_ENCODING = ''
 DATA_DIR = ''
+NO_RESIZE = False
 
 # system events
 # noinspection PyTypeChecker
@@ -112,6 +113,7 @@ provider_ping_thread_pool = {}
 
 showList = []  # type: List[TVShow]
 showDict = {}  # type: Dict[int, TVShow]
+showMappedIds = {}  # type: Dict[Tuple[int, int], Set[int]]
 switched_shows = {}  # type: Dict[AnyStr, AnyStr]
 UPDATE_SHOWS_ON_START = False
 SHOW_UPDATE_HOUR = 3
@@ -119,6 +121,15 @@ SHOW_UPDATE_HOUR = 3
 # non ui settings
 REMOVE_FILENAME_CHARS = None
 IMPORT_DEFAULT_CHECKED_SHOWS = 0
+NAME_PARSER_CACHE_SIZE = 5000
+NAME_PARSER_CACHE_KB = 16384
+SEARCH_PROVIDER_WORKERS = 4
+SEARCH_BACKLOG_SEGMENTS = 2
+SHOW_QUEUE_LANES = 3
+SHOW_UPDATE_PREFETCH = 20
+SHOW_UPDATE_DELTA = True
+EPISODE_CACHE_SIZE = 20000
+IMAGE_RESIZE_CACHE_MB = 200
 # /non ui settings
 
 providerList = []
@@ -657,12 +668,16 @@ def initialize(console_logging=True):
 def init_stage_1(console_logging):
 
     # Misc
-    global showList, showDict, switched_shows, providerList, newznabProviderList, torrentRssProviderList, \
+    global showList, showDict, showMappedIds, switched_shows, \
+        providerList, newznabProviderList, torrentRssProviderList, \
         WEB_HOST, WEB_ROOT, ACTUAL_CACHE_DIR, CACHE_DIR, ZONEINFO_DIR, ADD_SHOWS_WO_DIR, ADD_SHOWS_METALANG, \
         CREATE_MISSING_SHOW_DIRS, SHOW_DIRS_WITH_DOTS, \
         RECENTSEARCH_STARTUP, NAMING_FORCE_FOLDERS, SOCKET_TIMEOUT, DEBUG, TVINFO_DEFAULT, \
         CONFIG_FILE, CONFIG_VERSION, \
-        REMOVE_FILENAME_CHARS, IMPORT_DEFAULT_CHECKED_SHOWS, WANTEDLIST_CACHE, MODULE_UPDATE_STRING, EXT_UPDATES
+        REMOVE_FILENAME_CHARS, IMPORT_DEFAULT_CHECKED_SHOWS, NAME_PARSER_CACHE_SIZE, NAME_PARSER_CACHE_KB, \
+        SEARCH_PROVIDER_WORKERS, SEARCH_BACKLOG_SEGMENTS, SHOW_QUEUE_LANES, SHOW_UPDATE_PREFETCH, \
+        SHOW_UPDATE_DELTA, EPISODE_CACHE_SIZE, IMAGE_RESIZE_CACHE_MB, WANTEDLIST_CACHE, MODULE_UPDATE_STRING, \
+        EXT_UPDATES
     # Add Show Search
     global RESULTS_SORTBY
     # Add Show Defaults
@@ -1028,6 +1043,18 @@ def init_stage_1(console_logging):
     REMOVE_FILENAME_CHARS = check_setting_str(CFG, 'General', 'remove_filename_chars', '')
     sg_helpers.REMOVE_FILENAME_CHARS = REMOVE_FILENAME_CHARS
     IMPORT_DEFAULT_CHECKED_SHOWS = bool(check_setting_int(CFG, 'General', 'import_default_checked_shows', 0))
+    NAME_PARSER_CACHE_SIZE = minimax(check_setting_int(CFG, 'General', 'name_parser_cache_size', 5000),
+                                     5000, 100, 1000000)
+    NAME_PARSER_CACHE_KB = minimax(check_setting_int(CFG, 'General', 'name_parser_cache_kb', 16384),
+                                   16384, 256, 4194304)
+    SEARCH_PROVIDER_WORKERS = minimax(check_setting_int(CFG, 'General', 'search_provider_workers', 4), 4, 1, 16)
+    SEARCH_BACKLOG_SEGMENTS = minimax(check_setting_int(CFG, 'General', 'search_backlog_segments', 2), 2, 1, 8)
+    SHOW_QUEUE_LANES = minimax(check_setting_int(CFG, 'General', 'show_queue_lanes', 3), 3, 1, 8)
+    SHOW_UPDATE_PREFETCH = minimax(check_setting_int(CFG, 'General', 'show_update_prefetch', 20), 20, 0, 100)
+    SHOW_UPDATE_DELTA = bool(check_setting_int(CFG, 'General', 'show_update_delta', 1))
+    EPISODE_CACHE_SIZE = minimax(check_setting_int(CFG, 'General', 'episode_cache_size', 20000),
+                                 20000, 1000, 1000000)
+    IMAGE_RESIZE_CACHE_MB = minimax(check_setting_int(CFG, 'General', 'image_resize_cache_mb', 200), 200, 0, 100000)
 
     SAB_USERNAME = check_setting_str(CFG, 'SABnzbd', 'sab_username', '')
     SAB_PASSWORD = check_setting_str(CFG, 'SABnzbd', 'sab_password', '')
@@ -1527,6 +1554,7 @@ def init_stage_1(console_logging):
 
     showList = []
     showDict = {}
+    showMappedIds = {}
 
     # dict of switched shows for web redirects
     switched_shows = {}
@@ -1862,6 +1890,9 @@ def save_all():
 
 
 def save_config():
+    # rendered pages show config values
+    page_cache.invalidate()
+
     new_config = ConfigObj()
     new_config.filename = CONFIG_FILE
 
@@ -1998,6 +2029,15 @@ def save_config():
     new_config['General']['add_shows_metalang'] = ADD_SHOWS_METALANG
     new_config['General']['remove_filename_chars'] = REMOVE_FILENAME_CHARS
     new_config['General']['import_default_checked_shows'] = int(IMPORT_DEFAULT_CHECKED_SHOWS)
+    new_config['General']['name_parser_cache_size'] = int(NAME_PARSER_CACHE_SIZE)
+    new_config['General']['name_parser_cache_kb'] = int(NAME_PARSER_CACHE_KB)
+    new_config['General']['search_provider_workers'] = int(SEARCH_PROVIDER_WORKERS)
+    new_config['General']['search_backlog_segments'] = int(SEARCH_BACKLOG_SEGMENTS)
+    new_config['General']['show_queue_lanes'] = int(SHOW_QUEUE_LANES)
+    new_config['General']['show_update_prefetch'] = int(SHOW_UPDATE_PREFETCH)
+    new_config['General']['show_update_delta'] = int(SHOW_UPDATE_DELTA)
+    new_config['General']['episode_cache_size'] = int(EPISODE_CACHE_SIZE)
+    new_config['General']['image_resize_cache_mb'] = int(IMAGE_RESIZE_CACHE_MB)
 
     new_config['General']['extra_scripts'] = '|'.join(EXTRA_SCRIPTS)
     new_config['General']['sg_extra_scripts'] = '|'.join(SG_EXTRA_SCRIPTS)
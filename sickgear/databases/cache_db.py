@@ -19,7 +19,7 @@ from collections import OrderedDict
 from .. import db
 
 MIN_DB_VERSION = 1
-MAX_DB_VERSION = 7
+MAX_DB_VERSION = 10
 TEST_BASE_VERSION = None  # the base production db version, only needed for TEST db versions (>=100000)
 
 
@@ -92,6 +92,21 @@ class InitialSchema(db.SchemaUpgrade):
                 ' uid NUMERIC NOT NULL)',
                 'CREATE UNIQUE INDEX idx_show_queue_uid ON show_queue(uid)',
                 'CREATE UNIQUE INDEX idx_show_queue ON show_queue(tvid, prodid, action_id)'
+            ]),
+            ('provider_cache_episodes', [
+                'DELETE FROM provider_cache WHERE 1=1',
+                'CREATE TABLE provider_cache_episodes(provider TEXT, indexer NUMERIC, indexerid NUMERIC,'
+                ' season NUMERIC, episode NUMERIC, url TEXT)',
+                'CREATE INDEX idx_provider_cache_episodes ON provider_cache_episodes'
+                ' (provider, indexer, indexerid, season, episode)',
+                'CREATE UNIQUE INDEX idx_provider_cache_episodes_url ON provider_cache_episodes (url, episode)',
+                'CREATE INDEX idx_provider_cache ON provider_cache (provider, indexer, indexerid, season)',
+                'CREATE TRIGGER provider_cache_episodes_delete AFTER DELETE ON provider_cache'
+                ' BEGIN DELETE FROM provider_cache_episodes WHERE url = old.url; END'
+            ]),
+            ('show_updates', [
+                'CREATE TABLE show_updates(indexer NUMERIC NOT NULL, indexer_id NUMERIC NOT NULL, dir_mtime NUMERIC)',
+                'CREATE UNIQUE INDEX idx_show_updates ON show_updates (indexer, indexer_id)'
             ])
         ])
 
@@ -163,3 +178,31 @@ class AddSaveQueues(AddGenericFailureHandling):
     def execute(self):
         self.do_query(self.queries['save_queues'])
         self.finish()
+
+
+class AddProviderCacheEpisodes(AddSaveQueues):
+    def test(self):
+        return 7 < self.checkDBVersion()
+
+    def execute(self):
+        self.do_query(self.queries['provider_cache_episodes'])
+        self.finish()
+
+
+class AddProviderCacheProperLevel(AddProviderCacheEpisodes):
+    def test(self):
+        return 8 < self.checkDBVersion()
+
+    def execute(self):
+        self.addColumns('provider_cache', [('extra_info', 'TEXT'), ('is_repack', 'NUMERIC'),
+                                           ('proper_level', 'NUMERIC')])
+        self.finish()
+
+
+class AddShowUpdates(AddProviderCacheProperLevel):
+    def test(self):
+        return 9 < self.checkDBVersion()
+
+    def execute(self):
+        self.do_query(self.queries['show_updates'])
+        self.finish()
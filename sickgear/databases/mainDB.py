@@ -18,7 +18,7 @@ import datetime
 import os.path
 import re
 
-from .. import db, common, logger
+from .. import db, common, logger, show_stats
 from ..name_parser.parser import NameParser, InvalidNameException, InvalidShowException
 import sickgear
 # noinspection PyPep8Naming
@@ -38,6 +38,7 @@ TEST_BASE_VERSION = None  # the base production db version, only needed for TEST
 class MainSanityCheck(db.DBSanityCheck):
     def check(self):
         self.fix_missing_table_indexes()
+        self.fix_show_stats()
         self.fix_duplicate_shows()
         self.fix_duplicate_episodes()
         self.fix_orphan_episodes()
@@ -49,6 +50,12 @@ class MainSanityCheck(db.DBSanityCheck):
         self.fix_episode_subtitles()
         self.fix_genre_separator()
 
+    def fix_show_stats(self):
+        if not self.connection.hasTable('tv_show_stats') or 3 > len(self.connection.select(
+                'SELECT name FROM sqlite_master WHERE type = "trigger" AND name LIKE "tv_show_stats_%"')):
+            logger.log('Updating TV Episode table with show stats triggers')
+            self.connection.mass_action([[cur_sql] for cur_sql in show_stats.SHOW_STATS_SQL])
+
     def fix_episode_subtitles(self):
         if not self.connection.has_flag('fix_episode_subtitles'):
             cleaned = False
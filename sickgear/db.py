@@ -23,6 +23,7 @@ import re
 import sqlite3
 import threading
 import time
+import weakref
 
 # noinspection PyPep8Naming
 import encodingKludge as ek
@@ -34,7 +35,7 @@ from .sgdatetime import timestamp_near
 
 from sg_helpers import make_path, compress_file, remove_file_perm, scantree
 
-from _23 import filter_iter, filter_list, list_values, scandir
+from _23 import filter_iter, filter_list, list_keys, list_values, scandir
 from six import iterkeys, iteritems, itervalues
 
 # noinspection PyUnreachableCode
@@ -42,11 +43,175 @@ if False:
     from typing import Any, AnyStr, Dict, List, Optional, Tuple, Union
 
 
-db_lock = threading.Lock()
 db_support_multiple_insert = (3, 7, 11) <= sqlite3.sqlite_version_info  # type: bool
 db_support_column_rename = (3, 25, 0) <= sqlite3.sqlite_version_info  # type: bool
 db_support_upsert = (3, 25, 0) <= sqlite3.sqlite_version_info  # type: bool
 db_supports_backup = hasattr(sqlite3.Connection, 'backup') and (3, 6, 11) <= sqlite3.sqlite_version_info  # type: bool
+db_support_wal = (3, 7, 0) <= sqlite3.sqlite_version_info  # type: bool
+# a statement that select runs without the writer lock, any other statement may write
+_re_read_only = re.compile(r'(?i)\s*SELECT\b')
+
+db_locks = {}  # type: Dict[AnyStr, threading.Lock]
+db_locks_lock = threading.Lock()
+
+
+def get_db_lock(db_src):
+    # type: (AnyStr) -> threading.Lock
+    """
+    get the writer lock of a db file, writes to different db files do not block each other
+
+    :param db_src: full path to db file
+    :return: lock
+    """
+    lock = db_locks.get(db_src)
+    if None is lock:
+        with db_locks_lock:
+            lock = db_locks.setdefault(db_src, threading.Lock())
+    return lock
+
+
+class _ThreadConnections(dict):
+    """
+    per thread store of open sqlite3 connections keyed by (db file path, row type)
+
+    instances live in thread local storage, so when a thread exits, its store is released and all of the
+    connections it holds are closed
+    """
+    def __del__(self):
+        # only use builtins here, module globals may already be gone at interpreter exit
+        for cur_conn in self.values():
+            try:
+                cur_conn.close()
+            except (BaseException, Exception):
+                pass
+        self.clear()
+
+
+class ConnectionPool(object):
+    """
+    cache of sqlite3 connections reused by every DBConnection created in the same thread for the same db file
+
+    sqlite3 connections must not be used concurrently, therefore a connection is never shared between threads
+    """
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stores = weakref.WeakValueDictionary()  # type: Dict[int, _ThreadConnections]
+        self.stats = dict(opens=0, reuses=0, closes=0, open_time=0.0, lock_waits=0, lock_wait_time=0.0)
+
+    def _store(self):
+        # type: (...) -> _ThreadConnections
+        store = getattr(self._local, 'store', None)
+        if None is store:
+            store = self._local.store = _ThreadConnections()
+            with self._lock:
+                self._stores[id(store)] = store
+        return store
+
+    def get(self, db_src, row_type=None):
+        # type: (AnyStr, Optional[AnyStr]) -> sqlite3.Connection
+        """
+        get an open connection for the current thread, open a new connection if none is available
+
+        :param db_src: full path to db file
+        :param row_type: row type of connection
+        :return: connection
+        """
+        store = self._store()
+        key = (db_src, row_type)
+        connection = store.get(key)
+        if None is not connection:
+            with self._lock:
+                self.stats['reuses'] += 1
+            return connection
+
+        start = time.time()
+        connection = sqlite3.connect(db_src, 20, check_same_thread=False)
+        connection.row_factory = (sqlite3.Row, DBConnection._dict_factory)['dict' == row_type]
+        if db_support_wal:
+            # write ahead log allows readers to run concurrently with a writer
+            try:
+                connection.execute('PRAGMA journal_mode = WAL')
+            except sqlite3.Error as e:
+                logger.debug('Failed to set WAL journal mode for %s: %s' % (db_src, ex(e)))
+        store[key] = connection
+        with self._lock:
+            self.stats['opens'] += 1
+            self.stats['open_time'] += time.time() - start
+        return connection
+
+    def release(self, db_src=None, all_threads=False):
+        # type: (Optional[AnyStr], bool) -> None
+        """
+        close pooled connections
+
+        :param db_src: full path of db file to close connections for, or None for all db files
+        :param all_threads: close connections of all threads instead of only the current thread
+        """
+        if all_threads:
+            with self._lock:
+                stores = list_values(self._stores)
+        else:
+            stores = [self._store()]
+        for cur_store in stores:
+            for cur_key in list_keys(cur_store):
+                if None is db_src or cur_key[0] == db_src:
+                    cur_conn = cur_store.pop(cur_key, None)
+                    if None is not cur_conn:
+                        try:
+                            cur_conn.close()
+                        except (BaseException, Exception):
+                            pass
+                        with self._lock:
+                            self.stats['closes'] += 1
+
+    def add_wait(self, wait_time):
+        # type: (float) -> None
+        with self._lock:
+            self.stats['lock_waits'] += 1
+            self.stats['lock_wait_time'] += wait_time
+
+
+connection_pool = ConnectionPool()
+
+
+def connection_stats():
+    # type: (...) -> Dict[AnyStr, Union[int, float]]
+    """
+    :return: counters of the db connection pool
+    """
+    with connection_pool._lock:
+        stats = dict(connection_pool.stats)
+        stats['threads'] = len(connection_pool._stores)
+        stats['connections'] = sum(len(_s) for _s in list_values(connection_pool._stores))
+    for cur_key in ('open_time', 'lock_wait_time'):
+        stats[cur_key] = round(stats[cur_key], 3)
+    return stats
+
+
+def close_all_connections():
+    """
+    close the connections of all threads, used at shutdown
+    """
+    connection_pool.release(all_threads=True)
+
+
+class _DBLock(object):
+    """
+    wrapper of a db writer lock that accounts the time a caller waits to acquire the lock
+    """
+    def __init__(self, lock):
+        self.lock = lock
+
+    def __enter__(self):
+        if not self.lock.acquire(False):
+            start = time.time()
+            self.lock.acquire()
+            connection_pool.add_wait(time.time() - start)
+        return self
+
+    def __exit__(self, *args):
+        self.lock.release()
 
 
 def dbFilename(filename='sickbeard.db', suffix=None):
@@ -108,17 +273,24 @@ class DBConnection(object):
         self.new_db = False
         db_src = dbFilename(filename)
         if not os.path.isfile(db_src):
+            # db file is gone, discard any pooled connection to it
+            connection_pool.release(db_src)
             db_alt = dbFilename('sickrage.db')
             if os.path.isfile(db_alt):
                 helpers.copy_file(db_alt, db_src)
 
         self.filename = filename
-        self.connection = sqlite3.connect(db_src, 20)
+        self.db_src = db_src
+        self.row_type = row_type
+        self.db_lock = get_db_lock(db_src)
 
-        if 'dict' == row_type:
-            self.connection.row_factory = self._dict_factory
-        else:
-            self.connection.row_factory = sqlite3.Row
+    @property
+    def connection(self):
+        # type: (...) -> sqlite3.Connection
+        """
+        the pooled connection of the current thread
+        """
+        return connection_pool.get(self.db_src, self.row_type)
 
     def backup_db(self, target, backup_filename=None):
         # type: (AnyStr, AnyStr) -> Tuple[bool, AnyStr]
@@ -154,7 +326,7 @@ class DBConnection(object):
             # copy into this DB
             backup_con = sqlite3.connect(target_db, 20)
             with backup_con:
-                with db_lock:
+                with _DBLock(self.db_lock):
                     self.connection.backup(backup_con, progress=progress)
             logger.log('%s backup successful' % self.filename, logger.DEBUG)
         except sqlite3.Error as error:
@@ -198,7 +370,7 @@ class DBConnection(object):
         # type: (List[Union[List[AnyStr], Tuple[AnyStr, List], Tuple[AnyStr]]], bool) -> Optional[List, sqlite3.Cursor]
 
         from . import helpers
-        with db_lock:
+        with _DBLock(self.db_lock):
 
             if None is queries:
                 return
@@ -244,6 +416,55 @@ class DBConnection(object):
 
             return sql_result
 
+    def mass_action_many(self, queries, log_transaction=False):
+        # type: (List[Tuple[AnyStr, List[List]]], bool) -> Optional[int]
+        """
+        execute each query for all its list of args with executemany in one transaction
+
+        :param queries: list of query, list of args
+        :param log_transaction: log each query with its number of args
+        :return: number of affected rows
+        """
+        from . import helpers
+        with _DBLock(self.db_lock):
+
+            if None is queries:
+                return
+
+            queries = [cur_query for cur_query in queries if cur_query[1]]
+            if not queries:
+                return 0
+
+            attempt = 0
+            while 5 > attempt:
+                try:
+                    affected = 0
+                    cursor = self.connection.cursor()
+                    for cur_query, cur_args in queries:
+                        if log_transaction:
+                            logger.log('%s with %s args' % (cur_query, len(cur_args)), logger.DB)
+                        cursor.executemany(cur_query, cur_args)
+                        affected += abs(cursor.rowcount)
+
+                    self.connection.commit()
+                    if 0 < affected:
+                        logger.debug(u'Transaction with %s queries executed affected at least %i row%s' % (
+                            len(queries), affected, helpers.maybe_plural(affected)))
+                    return affected
+                except sqlite3.OperationalError as e:
+                    if self.connection:
+                        self.connection.rollback()
+                    if not self.action_error(e):
+                        raise
+                    attempt += 1
+                except sqlite3.DatabaseError as e:
+                    if self.connection:
+                        self.connection.rollback()
+                    logger.error(u'Fatal error executing query: ' + ex(e))
+                    raise
+
+            return 0
+
     @staticmethod
     def action_error(e):
 
@@ -256,7 +477,7 @@ class DBConnection(object):
     def action(self, query, args=None):
         # type: (AnyStr, Optional[List, Tuple]) -> Optional[Union[List, sqlite3.Cursor]]
 
-        with db_lock:
+        with _DBLock(self.db_lock):
 
             if None is query:
                 return
@@ -287,8 +508,44 @@ class DBConnection(object):
 
     def select(self, query, args=None):
         # type: (AnyStr, Optional[List, Tuple]) -> List
+        """
+        read query, does not take the writer lock as WAL journal mode allows concurrent readers,
+        any other statement is run under the writer lock
+        """
+        if None is query:
+            return []
+
+        if _re_read_only.match(query):
+            return self._select(query, args)
+
+        with _DBLock(self.db_lock):
+            return self._select(query, args)
+
+    def _select(self, query, args=None):
+        # type: (AnyStr, Optional[List, Tuple]) -> List
+        sql_results = None
+        attempt = 0
 
-        sql_results = self.action(query, args).fetchall()
+        while 5 > attempt:
+            try:
+                if None is args:
+                    logger.log('%s: %s' % (self.filename, query), logger.DB)
+                    cursor = self.connection.execute(query)
+                else:
+                    logger.log('%s: %s with args %s' % (self.filename, query, str(args)), logger.DB)
+                    cursor = self.connection.execute(query, args)
+                sql_results = cursor.fetchall()
+                if self.connection.in_transaction:
+                    # a write statement was passed to select, so end its implicit transaction
+                    self.connection.commit()
+                break
+            except sqlite3.OperationalError as e:
+                if not self.action_error(e):
+                    raise
+                attempt += 1
+            except sqlite3.DatabaseError as e:
+                logger.log(u'Fatal error executing query: ' + ex(e), logger.ERROR)
+                raise
 
         if None is sql_results:
             return []
@@ -407,10 +664,17 @@ class DBConnection(object):
         return (self.add_flag, self.remove_flag)[not bool(state)](flag_name)
 
     def close(self):
-        """Close database connection"""
-        if None is not getattr(self, 'connection', None):
-            self.connection.close()
-        self.connection = None
+        """Close the database connections of the current thread"""
+        connection_pool.release(self.db_src)
+
+    def checkpoint(self):
+        # type: (...) -> None
+        """
+        write the content of the WAL journal into the db file, required before copying the db file
+        """
+        if db_support_wal:
+            with _DBLock(self.db_lock):
+                self.connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
 
     def upgrade_log(self, to_log, log_level=logger.MESSAGE):
         # type: (AnyStr, int) -> None
@@ -445,6 +709,11 @@ def prettyName(class_name):
 
 def restoreDatabase(filename, version):
     logger.log(u'Restoring database before trying upgrade again')
+    # close connections and discard WAL journal files that must not be applied to the restored file
+    db_src = dbFilename(filename)
+    connection_pool.release(db_src, all_threads=True)
+    for cur_suffix in ('-wal', '-shm'):
+        remove_file_perm('%s%s' % (db_src, cur_suffix))
     if not sickgear.helpers.restore_versioned_file(dbFilename(filename=filename, suffix='v%s' % version), version):
         logger.log_error_and_exit(u'Database restore failed, abort upgrading database')
         return False
@@ -779,6 +1048,7 @@ def backup_database(db_connection, filename, version):
         return
 
     logger.log(u'Backing up database before upgrade')
+    db_connection.checkpoint()
     if not sickgear.helpers.backup_versioned_file(dbFilename(filename), version):
         logger.log_error_and_exit(u'Database backup failed, abort upgrading database')
     else:
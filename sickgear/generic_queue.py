@@ -16,6 +16,7 @@
 
 import copy
 import datetime
+import heapq
 import threading
 
 from . import db, logger
@@ -38,11 +39,21 @@ class QueuePriorities(object):
 
 
 class GenericQueue(object):
-    def __init__(self, cache_db_tables=None, main_db_tables=None):
-        # type: (List[AnyStr], List[AnyStr]) -> None
+    def __init__(self, cache_db_tables=None, main_db_tables=None, lanes=1):
+        # type: (List[AnyStr], List[AnyStr], int) -> None
+        """
+
+        :param cache_db_tables: cache db tables of saved queue items
+        :param main_db_tables: main db tables of saved queue items
+        :param lanes: number of queue items that may run at once
+        """
+
+        # running queue items in the order they started
+        self.current_items = []  # type: List[Union[QueueItem, BaseSearchQueueItem, ShowQueueItem]]
 
-        self.currentItem = None  # type: QueueItem or None
+        self.lanes = max(1, lanes)  # type: int
 
+        # waiting queue items as a heap ordered by priority and time added, use heapify after changing the list
         self.queue = []  # type: List[Union[QueueItem, BaseSearchQueueItem, ShowQueueItem]]
 
         self.queue_name = 'QUEUE'  # type: AnyStr
@@ -51,6 +62,9 @@ class GenericQueue(object):
 
         self.events = {}  # type: Dict[int, List[Callable]]
 
+        # set by a scheduler to be woken when an item may be ready to run
+        self.wakeup = None  # type: Optional[Callable]
+
         self.lock = threading.RLock()
 
         self.cache_db_tables = cache_db_tables or []  # type: List[AnyStr]
@@ -78,11 +92,38 @@ class GenericQueue(object):
     def load_queue(self):
         pass
 
+    @property
+    def currentItem(self):
+        # type: (...) -> Optional[QueueItem]
+        """
+        :return: the first started of the running queue items
+        """
+        return next(iter(self.current_items), None)
+
+    def _wakeup(self):
+        if None is not self.wakeup:
+            self.wakeup()
+
+    def is_idle(self):
+        # type: (...) -> bool
+        """
+        :return: True if no item is running and no queued item can run until an item is added or the queue unpaused
+        """
+        with self.lock:
+            return not self.current_items and not (self.queue and self.queue[0].priority >= self.min_priority)
+
+    def _get_current_items(self):
+        # type: (...) -> List[QueueItem]
+        """
+        :return: the running queue items
+        """
+        return self.current_items[:]
+
     def save_queue(self):
         cl = self._clear_sql()
         try:
             with self.lock:
-                for item in ((self.currentItem and [self.currentItem]) or []) + self.queue:
+                for item in self._get_current_items() + self.queue:
                     cl.extend(self._get_item_sql(item))
 
             if cl:
@@ -163,6 +204,7 @@ class GenericQueue(object):
                 ]
 
                 self.queue = [q for q in self.queue if q.uid not in to_remove]
+                heapq.heapify(self.queue)
                 if del_sql:
                     my_db = db.DBConnection('cache.db')
                     my_db.mass_action(del_sql)
@@ -187,6 +229,7 @@ class GenericQueue(object):
         with self.lock:
             if action_types:
                 self.queue = [q for q in self.queue if q.action_id in excluded_types or q.action_id not in action_types]
+                heapq.heapify(self.queue)
                 del_sql = [
                     ['DELETE FROM %s WHERE action_id IN (%s)' % (t, ','.join(['?'] * len(action_types))), action_types]
                     for t in self.cache_db_tables
@@ -197,6 +240,7 @@ class GenericQueue(object):
                 ]
             else:
                 self.queue = [q for q in self.queue if q.action_id in excluded_types]
+                heapq.heapify(self.queue)
                 del_sql = [
                     ['DELETE FROM %s' % t] for t in self.cache_db_tables
                 ]
@@ -219,6 +263,7 @@ class GenericQueue(object):
         logger.log(u'Unpausing queue')
         with self.lock:
             self.min_priority = 0
+        self._wakeup()
 
     def add_item(self, item, add_to_db=True):
         """
@@ -232,9 +277,10 @@ class GenericQueue(object):
         with self.lock:
             item.added = datetime.datetime.now()
             item.uid = item.uid or self._get_new_id()
-            self.queue.append(item)
+            heapq.heappush(self.queue, item)
             if add_to_db:
                 self.save_item(item)
+            self._wakeup()
 
             return item
 
@@ -271,33 +317,46 @@ class GenericQueue(object):
 
     def run(self):
 
-        # only start a new task if one isn't already going
         with self.lock:
-            if None is self.currentItem or not self.currentItem.is_alive():
-
-                # if the thread is dead then the current item should be finished
-                if self.currentItem:
-                    self.currentItem.finish()
-                    try:
-                        self.delete_item(self.currentItem, finished_run=True)
-                    except (BaseException, Exception):
-                        pass
-                    self.currentItem = None
-
-                # if there's something in the queue then run it in a thread and take it out of the queue
-                if 0 < len(self.queue):
-
-                    self.queue.sort(key=lambda y: (-y.priority, y.added))
-                    if self.queue[0].priority < self.min_priority:
-                        return
-
-                    # launch the queue item in a thread
-                    self.currentItem = self.queue.pop(0)
-                    if 'SEARCHQUEUE' != self.queue_name:
-                        self.currentItem.name = self.queue_name + '-' + self.currentItem.name
-                    self.currentItem.start()
-
-                self.check_events()
+            # finish the items of dead threads
+            for cur_item in [i for i in self.current_items if not i.is_alive()]:
+                self.current_items.remove(cur_item)
+                cur_item.finish()
+                try:
+                    self.delete_item(cur_item, finished_run=True)
+                except (BaseException, Exception):
+                    pass
+
+            # only start a new task if a lane is free and no running item needs to run alone
+            if self.lanes <= len(self.current_items) \
+                    or any(1 for cur_item in self.current_items if None is cur_item.lane_key):
+                return
+
+            # launch the queue items of highest priority in threads and take them out of the queue,
+            # an item that needs to run alone waits for running items, an item of a busy lane key is passed over
+            lane_keys = [cur_item.lane_key for cur_item in self.current_items]
+            passed = []
+            while self.queue and self.lanes > len(self.current_items):
+                cur_item = heapq.heappop(self.queue)
+                if cur_item.priority < self.min_priority or (None is cur_item.lane_key and self.current_items):
+                    passed.append(cur_item)
+                    break
+                if cur_item.lane_key in lane_keys:
+                    passed.append(cur_item)
+                    continue
+
+                if 'SEARCHQUEUE' != self.queue_name:
+                    cur_item.name = self.queue_name + '-' + cur_item.name
+                self.current_items.append(cur_item)
+                cur_item.start()
+                if None is cur_item.lane_key:
+                    break
+                lane_keys.append(cur_item.lane_key)
+
+            for cur_item in passed:
+                heapq.heappush(self.queue, cur_item)
+
+            self.check_events()
 
 
 class QueueItem(threading.Thread):
@@ -319,6 +378,19 @@ class QueueItem(threading.Thread):
         self.added = None  # type: Optional[datetime.datetime]
         self.uid = uid  # type: integer_types
 
+    def __lt__(self, other):
+        # type: (QueueItem) -> bool
+        """order of run in a queue, highest priority first, then first added"""
+        return (-self.priority, self.added, self.uid) < (-other.priority, other.added, other.uid)
+
+    @property
+    def lane_key(self):
+        # type: (...) -> Optional[Tuple]
+        """
+        items with the same key never run at the same time, None is an item that needs to run alone in the queue
+        """
+        return None
+
     def copy(self, deepcopy_obj=None):
         """
 
@@ -98,6 +98,16 @@ def is_parsable_date(text):
     return result
 
 
+_non_release_groups = [re.compile(r'(?i)' + v) for v in [
+    r'([\s\.\-_\[\{\(]*(no-rar|nzbgeek|ripsalot|siklopentan)[\s\.\-_\]\}\)]*)$',
+    r'([\s\.\-_\[\{\(]rp[\s\.\-_\]\}\)]*)$',
+    r'(?<=\w)([\s\.\-_]*[\[\{\(][\s\.\-_]*(www\.\w+.\w+)[\s\.\-_]*[\]\}\)][\s\.\-_]*)$',
+    r'(?<=\w)([\s\.\-_]*[\[\{\(]\s*(rar(bg|tv)|((e[tz]|v)tv))[\s\.\-_]*[\]\}\)][\s\.\-_]*)$']]
+_non_release_groups_non_anime = _non_release_groups + [re.compile(r'(?i)' + v) for v in [
+    r'(?<=\w)([\s\.\-_]*[\[\{\(][\s\.\-_]*[\w\s\.\-\_]+[\s\.\-_]*[\]\}\)][\s\.\-_]*)$',
+    r'^([\s\.\-_]*[\[\{\(][\s\.\-_]*[\w\s\.\-\_]+[\s\.\-_]*[\]\}\)][\s\.\-_]*)(?=\w)']]
+
+
 def remove_non_release_groups(name, is_anime=False):
     """
     Remove non release groups from name
@@ -111,13 +121,7 @@ def remove_non_release_groups(name, is_anime=False):
     """
 
     if name:
-        rc = [re.compile(r'(?i)' + v) for v in [
-              r'([\s\.\-_\[\{\(]*(no-rar|nzbgeek|ripsalot|siklopentan)[\s\.\-_\]\}\)]*)$',
-              r'([\s\.\-_\[\{\(]rp[\s\.\-_\]\}\)]*)$',
-              r'(?<=\w)([\s\.\-_]*[\[\{\(][\s\.\-_]*(www\.\w+.\w+)[\s\.\-_]*[\]\}\)][\s\.\-_]*)$',
-              r'(?<=\w)([\s\.\-_]*[\[\{\(]\s*(rar(bg|tv)|((e[tz]|v)tv))[\s\.\-_]*[\]\}\)][\s\.\-_]*)$'] +
-              ([r'(?<=\w)([\s\.\-_]*[\[\{\(][\s\.\-_]*[\w\s\.\-\_]+[\s\.\-_]*[\]\}\)][\s\.\-_]*)$',
-                r'^([\s\.\-_]*[\[\{\(][\s\.\-_]*[\w\s\.\-\_]+[\s\.\-_]*[\]\}\)][\s\.\-_]*)(?=\w)'], [])[is_anime]]
+        rc = (_non_release_groups_non_anime, _non_release_groups)[bool(is_anime)]
         rename = name = remove_extension(name)
         while rename:
             for regex in rc:
@@ -190,6 +194,78 @@ def is_first_rar_volume(filename):
     return None is not re.search(r'(?P<file>^(?P<base>(?:(?!\.part\d+\.rar$).)*)\.(?:(?:part0*1\.)?rar)$)', filename)
 
 
+# mapped ids indexed for each show sid_int, to remove them when the show or its mapping changes
+_mapped_id_keys = {}  # type: Dict[int, Set[Tuple[int, int]]]
+# the showDict that sickgear.showMappedIds was built for
+_mapped_id_show_dict = None  # type: Optional[Dict[int, TVShow]]
+
+
+def _show_mapped_id_keys(show_obj):
+    # type: (TVShow) -> Set[Tuple[int, int]]
+    return set([(k, v['id']) for k, v in iteritems(show_obj.internal_ids or {})
+                if isinstance(v, dict) and 0 < (v.get('id') or 0)])
+
+
+def index_show_mapped_ids(show_obj):
+    # type: (TVShow) -> None
+    """
+    add or update the mapped ids of a show in the reverse index sickgear.showMappedIds
+
+    :param show_obj: show object
+    """
+    unindex_show_mapped_ids(show_obj.sid_int)
+    keys = _show_mapped_id_keys(show_obj)
+    for cur_key in keys:
+        sickgear.showMappedIds.setdefault(cur_key, set()).add(show_obj.sid_int)
+    _mapped_id_keys[show_obj.sid_int] = keys
+
+
+def unindex_show_mapped_ids(sid_int):
+    # type: (int) -> None
+    """
+    remove the mapped ids of a show from the reverse index sickgear.showMappedIds
+
+    :param sid_int: show sid_int
+    """
+    for cur_key in _mapped_id_keys.pop(sid_int, []):
+        sid_ints = sickgear.showMappedIds.get(cur_key)
+        if None is not sid_ints:
+            sid_ints.discard(sid_int)
+            if not sid_ints:
+                del sickgear.showMappedIds[cur_key]
+
+
+def rebuild_mapped_ids():
+    """
+    build the reverse index sickgear.showMappedIds of (tvid, mapped id) to show sid_int from sickgear.showDict
+    """
+    global _mapped_id_show_dict
+    _mapped_id_keys.clear()
+    sickgear.showMappedIds = {}
+    _mapped_id_show_dict = sickgear.showDict
+    for cur_show_obj in list(_mapped_id_show_dict.values()):
+        index_show_mapped_ids(cur_show_obj)
+
+
+def _find_shows_by_mapped_id(show_id):
+    # type: (Dict[int, int]) -> List[TVShow]
+    """
+    :param show_id: {indexer: id}
+    :return: shows from sickgear.showDict that have a mapped id of show_id
+    """
+    if sickgear.showDict is not _mapped_id_show_dict or len(_mapped_id_keys) != len(sickgear.showDict):
+        rebuild_mapped_ids()
+    results = []
+    for k, v in iteritems(show_id):
+        if k and v and 0 < v:
+            for cur_sid_int in sickgear.showMappedIds.get((k, v), []):
+                show_obj = sickgear.showDict.get(cur_sid_int)
+                # ids can be changed in place, so confirm that an indexed show still has the mapped id
+                if show_obj and v == show_obj.internal_ids.get(k, {'id': 0})['id']:
+                    results.append(show_obj)
+    return results
+
+
 def find_show_by_id(
         show_id,  # type: Union[AnyStr, Dict[int, int], int]
         show_list=None,  # type: Optional[List[TVShow]]
@@ -231,6 +307,8 @@ def find_show_by_id(
                                      if sickgear.showDict.get(_show_sid_id)), None)
                     results = [sickgear.showDict.get(_show_sid_id) for _show_sid_id in sid_int_list
                                if sickgear.showDict.get(_show_sid_id)]
+                elif show_list is sickgear.showList:
+                    results = _find_shows_by_mapped_id(show_id)
                 else:
                     results = [_show_obj for k, v in iteritems(show_id) if k and v and 0 < v
                                for _show_obj in show_list if v == _show_obj.internal_ids.get(k, {'id': 0})['id']]
@@ -14,10 +14,16 @@
 # You should have received a copy of the GNU General Public License
 # along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
 
+from collections import OrderedDict
 import datetime
 import glob
+import hashlib
+import io
 import os.path
 import re
+import struct
+import threading
+import time
 import zlib
 
 # noinspection PyPep8Naming
@@ -32,11 +38,12 @@ from .sgdatetime import timestamp_near
 from .indexers.indexer_config import TVINFO_TVDB, TVINFO_TVMAZE, TVINFO_TMDB, TVINFO_IMDB
 from lib.tvinfo_base.exceptions import *
 
+from _23 import scandir
 from six import itervalues, iteritems
 
 # noinspection PyUnreachableCode
 if False:
-    from typing import AnyStr, Optional, Tuple, Union
+    from typing import AnyStr, Dict, Optional, Set, Tuple, Union
     from .tv import TVShow, Person, Character
     from six import integer_types
     from .metadata.generic import ShowInfosDict
@@ -45,9 +52,142 @@ from lib.hachoir.parser import createParser, guessParser
 from lib.hachoir.metadata import extractMetadata
 from lib.hachoir.stream import StringInputStream
 
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
 cache_img_base = {'tvmaze': TVINFO_TVMAZE, 'themoviedb': TVINFO_TMDB, 'thetvdb': TVINFO_TVDB, 'imdb': TVINFO_IMDB}
 cache_img_src = {TVINFO_TMDB: 'tmdb', TVINFO_TVDB: 'tvdb', TVINFO_TVMAZE: 'tvmaze', TVINFO_IMDB: 'imdb'}
 
+# path: (size, mtime, dimensions) of image files
+img_dimensions = {}  # type: Dict[AnyStr, Tuple[int, float, Optional[Tuple[int, int, float]]]]
+MAX_IMG_DIMENSIONS = 10000
+
+
+def _jpeg_size(stream):
+    # type: (io.IOBase) -> Optional[Tuple[int, int]]
+    """
+    :param stream: jpeg data positioned after the start of image marker
+    :return: width, height from the frame header, reading only segment markers and lengths before it
+    """
+    for _ in range(100):
+        marker = stream.read(2)
+        while 2 == len(marker) and b'\xff' == marker[0:1] and b'\xff' == marker[1:2]:
+            # fill bytes
+            marker = marker[1:] + stream.read(1)
+        if 2 != len(marker) or b'\xff' != marker[0:1]:
+            return
+        marker = ord(marker[1:2])
+        if 0xd0 <= marker <= 0xd9 or 0x01 == marker:
+            # markers without a length
+            continue
+        length = stream.read(2)
+        if 2 != len(length):
+            return
+        length = struct.unpack('>H', length)[0]
+        # start of frame, excluding huffman table (c4), arithmetic coding (cc) and reserved (c8)
+        if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+            frame = stream.read(5)
+            if 5 == len(frame):
+                height, width = struct.unpack('>HH', frame[1:5])
+                return width, height
+            return
+        stream.seek(length - 2, io.SEEK_CUR)
+
+
+def _header_size(stream):
+    # type: (io.IOBase) -> Optional[Tuple[int, int]]
+    """
+    get image width and height from the header of a jpeg, png, gif, or webp image
+
+    :param stream: image data
+    :return: width, height, or None for an image of another format
+    """
+    head = stream.read(30)
+    if head.startswith(b'\x89PNG\r\n\x1a\n') and b'IHDR' == head[12:16]:
+        return struct.unpack('>II', head[16:24])
+    if head[0:6] in (b'GIF87a', b'GIF89a') and 10 <= len(head):
+        return struct.unpack('<HH', head[6:10])
+    if b'RIFF' == head[0:4] and b'WEBP' == head[8:12] and 30 == len(head):
+        chunk = head[12:16]
+        if b'VP8 ' == chunk and b'\x9d\x01\x2a' == head[23:26]:
+            width, height = struct.unpack('<HH', head[26:30])
+            return width & 0x3fff, height & 0x3fff
+        if b'VP8L' == chunk and b'\x2f' == head[20:21]:
+            bits = struct.unpack('<I', head[21:25])[0]
+            return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+        if b'VP8X' == chunk:
+            return (1 + struct.unpack('<I', head[24:27] + b'\0')[0],
+                    1 + struct.unpack('<I', head[27:30] + b'\0')[0])
+        return
+    if b'\xff\xd8' == head[0:2]:
+        stream.seek(2)
+        return _jpeg_size(stream)
+
+
+# widths of resized images, a requested width uses the next larger width
+RESIZE_WIDTHS = (160, 320, 640, 1280)
+resize_lock = threading.Lock()
+# resized file: file size, in order of last use, None until loaded from the resized dir
+resized_files = None  # type: Optional[OrderedDict[AnyStr, int]]
+# sum of the file sizes in resized_files
+resized_total = 0
+# images that are not resized to a width as they are not wider
+unresized = set()  # type: Set[Tuple[AnyStr, int, float, int]]
+
+
+def _load_resized(resized_dir):
+    # type: (AnyStr) -> OrderedDict[AnyStr, int]
+    """
+    :param resized_dir: dir of resized images
+    :return: resized files in order of last use, taken from file times
+    """
+    global resized_files, resized_total
+    if None is resized_files:
+        files = []
+        if ek.ek(os.path.isdir, resized_dir):
+            for cur_entry in ek.ek(scandir, resized_dir):
+                if cur_entry.is_file() and not cur_entry.name.endswith('.tmp'):
+                    cur_stat = cur_entry.stat()
+                    files += [(cur_stat.st_mtime, cur_entry.path, cur_stat.st_size)]
+        resized_files = OrderedDict([(cur_path, cur_size) for _, cur_path, cur_size in sorted(files)])
+        resized_total = sum(itervalues(resized_files))
+    return resized_files
+
+
+def _use_resized(resized_dir, resized_file, size=None):
+    # type: (AnyStr, AnyStr, Optional[int]) -> None
+    """
+    set a resized file as last used, and remove the least recently used files above the disk budget
+
+    :param resized_dir: dir of resized images
+    :param resized_file: resized file
+    :param size: file size of a new file
+    """
+    global resized_total
+    with resize_lock:
+        files = _load_resized(resized_dir)
+        old_size = files.pop(resized_file, None)
+        if None is size:
+            size = old_size
+            if None is size:
+                size = ek.ek(os.path.getsize, resized_file)
+            elif 86400 < time.time() - ek.ek(os.path.getmtime, resized_file):
+                # keep the order of use for a restart, a day at a time to save writes
+                ek.ek(os.utime, resized_file, None)
+        files[resized_file] = size
+        resized_total += size - (old_size or 0)
+
+        max_size = sickgear.IMAGE_RESIZE_CACHE_MB * 1024 * 1024
+        while max_size < resized_total and 1 < len(files):
+            cur_file, cur_size = files.popitem(last=False)
+            resized_total -= cur_size
+            try:
+                ek.ek(os.remove, cur_file)
+            except (BaseException, Exception):
+                pass
+
 
 class ImageCache(object):
     base_dir = None  # type: AnyStr or None
@@ -82,6 +222,11 @@ class ImageCache(object):
         # type: (...) -> AnyStr
         return ek.ek(os.path.join, sickgear.CACHE_DIR, 'images', 'characters')
 
+    @staticmethod
+    def _resized_dir():
+        # type: (...) -> AnyStr
+        return ek.ek(os.path.join, sickgear.CACHE_DIR, 'images', 'resized')
+
     def _fanart_dir(self, tvid=None, prodid=None):
         # type: (int, int) -> AnyStr
         """
@@ -188,8 +333,8 @@ class ImageCache(object):
         :param person_obj:
         """
         base_path = self._character_base_name(character_obj, show_obj=show_obj, tvid=tvid, proid=proid)
-        from .tv import Person
-        if isinstance(person_obj, Person):
+        from . import tv
+        if isinstance(person_obj, tv.Person):
             person_base = self._person_base_name(person_obj)
             if person_base:
                 base_path = '%s-%s' % (base_path, person_base)
@@ -345,6 +490,95 @@ class ImageCache(object):
         """
         return self.has_file(self.banner_thumb_path(tvid, prodid))
 
+    @staticmethod
+    def resize_width(width):
+        # type: (Union[AnyStr, integer_types, None]) -> Optional[int]
+        """
+        :param width: requested width
+        :return: width of a resized image to use for the requested width, or None to use the image
+        """
+        try:
+            width = int(width)
+        except (BaseException, Exception):
+            return
+        if 0 < width:
+            return next((cur_width for cur_width in RESIZE_WIDTHS if width <= cur_width), RESIZE_WIDTHS[-1])
+
+    def resized_path(self, image_file, width, webp=False):
+        # type: (AnyStr, Union[AnyStr, integer_types, None], bool) -> AnyStr
+        """
+        get an image made smaller to a requested width, a resized image is saved on first use and kept until
+        it is least recently used when the resized images use more than the disk budget
+
+        :param image_file: image file
+        :param width: requested width
+        :param webp: True if a webp image can be used
+        :return: resized image file, or image_file if not to be resized or not wider than the resized width
+        """
+        width = self.resize_width(width)
+        if None is Image or sickgear.NO_RESIZE or not width or not sickgear.IMAGE_RESIZE_CACHE_MB:
+            return image_file
+        try:
+            stat = ek.ek(os.stat, image_file)
+        except (BaseException, Exception):
+            return image_file
+        image_key = (image_file, stat.st_size, stat.st_mtime, width)
+        if image_key in unresized:
+            return image_file
+
+        resized_dir = self._resized_dir()
+        # a changed image file is a new name, the resized image of the old file is removed when unused
+        base_name = '%s-%s' % (hashlib.sha1(('%s-%s-%s' % image_key[0:3]).encode('utf-8')).hexdigest(), width)
+        for cur_ext in (('jpg', 'png'), ('webp',))[webp]:
+            resized_file = ek.ek(os.path.join, resized_dir, '%s.%s' % (base_name, cur_ext))
+            if ek.ek(os.path.isfile, resized_file):
+                try:
+                    _use_resized(resized_dir, resized_file)
+                    return resized_file
+                except (BaseException, Exception):
+                    pass
+
+        try:
+            with Image.open(image_file) as src_img:
+                if src_img.width <= width:
+                    if 10000 <= len(unresized):
+                        unresized.clear()
+                    unresized.add(image_key)
+                    return image_file
+
+                height = max(1, int(round(float(src_img.height) * width / src_img.width)))
+                # a jpeg is decoded at a smaller scale that is at least the resized size
+                src_img.draft('RGB', (width, height))
+                has_alpha = 'A' in src_img.mode or 'transparency' in src_img.info
+                img = src_img.convert(('RGB', 'RGBA')[has_alpha]).resize((width, height), Image.LANCZOS)
+            if webp:
+                img_format, options = 'webp', dict(quality=80)
+            elif has_alpha:
+                img_format, options = 'png', dict(optimize=True)
+            else:
+                img_format, options = 'jpeg', dict(quality=85, optimize=True, progressive=True)
+
+            resized_file = ek.ek(os.path.join, resized_dir, '%s.%s' % (
+                base_name, ('jpg' if 'jpeg' == img_format else img_format)))
+            sg_helpers.make_path(resized_dir)
+            tmp_file = '%s.%s.tmp' % (resized_file, threading.current_thread().ident)
+            try:
+                img.save(tmp_file, img_format, **options)
+                try:
+                    ek.ek(os.rename, tmp_file, resized_file)
+                except OSError:
+                    # a rename does not replace a file on Windows, a parallel request saved the same image first
+                    if not ek.ek(os.path.isfile, resized_file):
+                        raise
+            finally:
+                if ek.ek(os.path.isfile, tmp_file):
+                    ek.ek(os.remove, tmp_file)
+            _use_resized(resized_dir, resized_file, ek.ek(os.path.getsize, resized_file))
+            return resized_file
+        except (BaseException, Exception) as e:
+            logger.debug(u'Unable to resize image %s, using the image. Error: %s' % (image_file, ex(e)))
+        return image_file
+
     BANNER = 1
     POSTER = 2
     BANNER_THUMB = 3
@@ -367,12 +601,48 @@ class ImageCache(object):
         :param image: image file or data
         :param is_binary: is data instead of path
         """
-        if not is_binary and not ek.ek(os.path.isfile, image):
-            logger.warning(u'File not found to determine image type of %s' % image)
-            return
         if not image:
             logger.warning('No Image Data to determinate image type')
             return
+        if is_binary:
+            return ImageCache._img_dimensions(image, is_binary)
+
+        try:
+            stat = ek.ek(os.stat, image)
+        except (BaseException, Exception):
+            stat = None
+        if not stat or not ek.ek(os.path.isfile, image):
+            logger.warning(u'File not found to determine image type of %s' % image)
+            return
+
+        # reuse dimensions of a file with the same size and time
+        dimensions = img_dimensions.get(image)
+        if not dimensions or (stat.st_size, stat.st_mtime) != dimensions[0:2]:
+            dimensions = (stat.st_size, stat.st_mtime, ImageCache._img_dimensions(image))
+            if MAX_IMG_DIMENSIONS <= len(img_dimensions):
+                img_dimensions.clear()
+            img_dimensions[image] = dimensions
+        return dimensions[2]
+
+    @staticmethod
+    def _img_dimensions(image, is_binary=False):
+        # type: (AnyStr, bool) -> Optional[Tuple[integer_types, integer_types, float]]
+        """
+        get image dimensions from the image header, or from image metadata for an image of another format
+        :param image: image file or data
+        :param is_binary: is data instead of path
+        """
+        try:
+            if is_binary:
+                size = _header_size(io.BytesIO(image))
+            else:
+                with ek.ek(io.open, image, 'rb') as stream:
+                    size = _header_size(stream)
+            if size and all(size):
+                width, height = size
+                return width, height, float(width) / float(height)
+        except (BaseException, Exception):
+            pass
 
         try:
             if is_binary:
@@ -397,13 +667,16 @@ class ImageCache(object):
 
         width = img_metadata.get('width')
         height = img_metadata.get('height')
-        img_ratio = float(width) / float(height)
 
         if not is_binary:
             # noinspection PyProtectedMember
             img_parser.stream._input.close()
 
-        return width, height, img_ratio
+        if not width or not height:
+            logger.debug(u'Unable to extract image size from %s, not using file' % ('Image Data', image)[not is_binary])
+            return
+
+        return width, height, float(width) / float(height)
 
     def which_type(self, image, is_binary=False):
         # type: (AnyStr, bool) -> Optional[int]
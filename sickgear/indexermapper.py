@@ -19,7 +19,7 @@ import re
 import traceback
 
 from . import classes, db, logger
-from .helpers import try_int
+from .helpers import index_show_mapped_ids, try_int
 from .indexers.indexer_config import TVINFO_IMDB, TVINFO_TMDB, TVINFO_TRAKT, TVINFO_TVDB, TVINFO_TVMAZE
 
 import sickgear
@@ -353,6 +353,9 @@ def save_mapping(show_obj, save_map=None):
         my_db = db.DBConnection()
         my_db.mass_action(sql_l)
 
+    if sickgear.showDict.get(show_obj.sid_int) is show_obj:
+        index_show_mapped_ids(show_obj)
+
 
 def del_mapping(tvid, prodid):
     """
@@ -29,6 +29,7 @@ tvinfo_config = {
         mapped_only=False,
         icon='thetvdb16.png',
         people_url='https://thetvdb.com/people/%s',
+        prefetch_workers=4, prefetch_interval=0.0,
     ),
     TVINFO_TVRAGE: dict(
         main_url='http://tvrage.com/',
@@ -53,6 +54,7 @@ tvinfo_config = {
         icon='tvmaze16.png',
         people_url='https://www.tvmaze.com/person/view?id=%s',
         character_url='https://www.tvmaze.com/character/view?id=%s',
+        prefetch_workers=2, prefetch_interval=1.0,
     ),
     TVINFO_IMDB: dict(
         main_url='https://www.imdb.com/',
@@ -89,6 +91,7 @@ tvinfo_config = {
         mapped_only=False,
         icon='tmdb16.png',
         people_url='https://www.themoviedb.org/person/%s',
+        prefetch_workers=3, prefetch_interval=0.5,
     ),
     # social media sources for people
     TVINFO_INSTAGRAM: dict(
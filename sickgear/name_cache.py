@@ -24,12 +24,64 @@ from six import iteritems
 
 # noinspection PyUnreachableCode
 if False:
-    from typing import AnyStr, Optional, Tuple, Union
+    from typing import AnyStr, Dict, List, Optional, Set, Tuple, Union
     from .tv import TVShow, TVShowBase
 
-nameCache = {}
-sceneNameCache = {}
+# readers use the caches without a lock, writers hold nameCacheLock and either change single
+# entries in place or swap in a completely rebuilt dict
+nameCache = {}  # type: Dict[AnyStr, List[int]]
+sceneNameCache = {}  # type: Dict[AnyStr, List[int]]
 nameCacheLock = threading.Lock()
+# names of each (tvid, prodid) in nameCache and sceneNameCache, to change a show without scanning all names
+show_names = {}  # type: Dict[Tuple[int, int], Set[AnyStr]]
+show_scene_names = {}  # type: Dict[Tuple[int, int], Set[AnyStr]]
+
+
+def _build_index(cache):
+    # type: (Dict[AnyStr, List[int]]) -> Dict[Tuple[int, int], Set[AnyStr]]
+    """
+    :param cache: name cache
+    :return: names of each (tvid, prodid) in cache
+    """
+    index = {}
+    for cur_name, cur_value in iteritems(cache):
+        index.setdefault((int(cur_value[0]), int(cur_value[1])), set()).add(cur_name)
+    return index
+
+
+def _remove_show(cache, index, tvid, prodid):
+    # type: (Dict[AnyStr, List[int]], Dict[Tuple[int, int], Set[AnyStr]], int, int) -> None
+    """
+    remove names of a show from cache in place, must be called with nameCacheLock held
+
+    :param cache: name cache
+    :param index: names of each (tvid, prodid) in cache
+    :param tvid: tvid
+    :param prodid: prodid
+    """
+    for cur_name in index.pop((int(tvid), int(prodid)), []):
+        cur_value = cache.get(cur_name)
+        # a name can be replaced by another show, or the cache replaced without an index update
+        if cur_value and int(cur_value[0]) == tvid and int(cur_value[1]) == prodid:
+            cache.pop(cur_name, None)
+
+
+def _get_scene_names(show_ids):
+    # type: (Dict[int, List[int]]) -> Dict[AnyStr, List[int]]
+    """
+    :param show_ids: prodids to get scene exceptions for, keyed by tvid
+    :return: scene names from scene exceptions
+    """
+    my_db = db.DBConnection()
+    scene_names = {}
+    for t, s in iteritems(show_ids):
+        for cur_result in my_db.select(
+                'SELECT show_name, indexer AS tv_id, indexer_id AS prod_id, season'
+                ' FROM scene_exceptions'
+                ' WHERE indexer = %s AND indexer_id IN (%s)' % (t, ','.join(['%s' % i for i in s]))):
+            scene_names[full_sanitize_scene_name(cur_result['show_name'])] = [
+                int(cur_result['tv_id']), int(cur_result['prod_id']), try_int(cur_result['season'], -1)]
+    return scene_names
 
 
 def addNameToCache(name, tvid=0, prodid=0, season=-1):
@@ -44,13 +96,12 @@ def addNameToCache(name, tvid=0, prodid=0, season=-1):
     :param season: the season the the name exception belongs to. -1 for generic exception
     :type season: int
     """
-    global nameCache
-
     with nameCacheLock:
         # standardize the name we're using to account for small differences in providers
         name = full_sanitize_scene_name(name)
         if name not in nameCache:
             nameCache[name] = [int(tvid), int(prodid), season]
+            show_names.setdefault((int(tvid), int(prodid)), set()).add(name)
 
 
 def retrieveNameFromCache(name):
@@ -60,12 +111,11 @@ def retrieveNameFromCache(name):
     :param name: The show name to look up.
     :return: the tuple of (tvid, prodid) id resulting from a cache lookup or None if the show wasn't found
     """
-    global nameCache
-
     name = full_sanitize_scene_name(name)
     try:
-        if name in nameCache:
-            return int(nameCache[name][0]), int(nameCache[name][1])
+        cached = nameCache.get(name)
+        if cached:
+            return int(cached[0]), int(cached[1])
     except (BaseException, Exception):
         pass
     return None, None
@@ -78,59 +128,43 @@ def buildNameCache(show_obj=None, update_only_scene=False):
     :param show_obj : Only update name cache for this show object, otherwise update all
     :param update_only_scene: (optional) only update scene name cache
     """
-    global nameCache, sceneNameCache
+    global nameCache, sceneNameCache, show_names, show_scene_names
     with nameCacheLock:
 
-        if not update_only_scene:
-            if show_obj:
-                # search for only the requested show id and flush old show entries from namecache
-                show_ids = {show_obj.tvid: [show_obj.prodid]}
-                nameCache = dict([(k, v) for k, v in iteritems(nameCache)
-                                  if not (v[0] == show_obj.tvid and v[1] == show_obj.prodid)])
-                sceneNameCache = dict([(k, v) for k, v in iteritems(sceneNameCache)
-                                       if not (v[0] == show_obj.tvid and v[1] == show_obj.prodid)])
-
-                # add standard indexer name to namecache
-                nameCache[full_sanitize_scene_name(show_obj.unique_name or show_obj.name)] = [show_obj.tvid, show_obj.prodid, -1]
-            else:
-                # generate list of production ids to look up in cache.db
-                show_ids = {}
-                for cur_show_obj in sickgear.showList:
-                    show_ids.setdefault(cur_show_obj.tvid, []).append(cur_show_obj.prodid)
-
-                # add all standard show indexer names to namecache
-                nameCache = dict(
-                    [(full_sanitize_scene_name(cur_so.unique_name or cur_so.name), [cur_so.tvid, cur_so.prodid, -1])
-                     for cur_so in sickgear.showList if cur_so])
-                sceneNameCache = {}
-
-        cacheDB = db.DBConnection()
-
-        cache_results = []
-        if update_only_scene:
-            # generate list of production ids to look up in cache.db
-            show_ids = {}
-            for cur_show_obj in sickgear.showList:
-                show_ids.setdefault(cur_show_obj.tvid, []).append(cur_show_obj.prodid)
-            tmp_scene_name_cache = {}
-        else:
-            tmp_scene_name_cache = sceneNameCache.copy()
-
-        for t, s in iteritems(show_ids):
-            cache_results += cacheDB.select(
-                'SELECT show_name, indexer AS tv_id, indexer_id AS prod_id, season'
-                ' FROM scene_exceptions'
-                ' WHERE indexer = %s AND indexer_id IN (%s)' % (t, ','.join(['%s' % i for i in s])))
+        if show_obj and not update_only_scene:
+            # only apply the changes of the requested show id in place
+            tvid, prodid = int(show_obj.tvid), int(show_obj.prodid)
+            scene_names = _get_scene_names({tvid: [prodid]})
 
-        if cache_results:
-            for cache_result in cache_results:
-                tvid = int(cache_result['tv_id'])
-                prodid = int(cache_result['prod_id'])
-                season = try_int(cache_result['season'], -1)
-                name = full_sanitize_scene_name(cache_result['show_name'])
-                tmp_scene_name_cache[name] = [tvid, prodid, season]
+            _remove_show(nameCache, show_names, tvid, prodid)
+            _remove_show(sceneNameCache, show_scene_names, tvid, prodid)
 
-            sceneNameCache = tmp_scene_name_cache
+            # add standard indexer name to namecache
+            name = full_sanitize_scene_name(show_obj.unique_name or show_obj.name)
+            nameCache[name] = [tvid, prodid, -1]
+            show_names.setdefault((tvid, prodid), set()).add(name)
+
+            for cur_name, cur_value in iteritems(scene_names):
+                sceneNameCache[cur_name] = cur_value
+                show_scene_names.setdefault((tvid, prodid), set()).add(cur_name)
+            return
+
+        # generate list of production ids to look up in cache.db
+        show_ids = {}
+        for cur_show_obj in sickgear.showList:
+            show_ids.setdefault(cur_show_obj.tvid, []).append(cur_show_obj.prodid)
+
+        scene_names = _get_scene_names(show_ids)
+        if not update_only_scene:
+            # add all standard show indexer names to namecache
+            new_cache = dict(
+                [(full_sanitize_scene_name(cur_so.unique_name or cur_so.name), [cur_so.tvid, cur_so.prodid, -1])
+                 for cur_so in sickgear.showList if cur_so])
+            nameCache, show_names = new_cache, _build_index(new_cache)
+        elif not scene_names:
+            return
+
+        sceneNameCache, show_scene_names = scene_names, _build_index(scene_names)
 
 
 def remove_from_namecache(tvid, prodid):
@@ -141,8 +175,5 @@ def remove_from_namecache(tvid, prodid):
     :param prodid: tvdbid or rageid to be removed from the namecache
     :type prodid: int or long
     """
-    global nameCache
-
     with nameCacheLock:
-        if nameCache:
-            nameCache = dict([(k, v) for k, v in iteritems(nameCache) if not (v[0] == tvid and v[1] == prodid)])
+        _remove_show(nameCache, show_names, int(tvid), int(prodid))
@@ -21,6 +21,7 @@ import datetime
 import os
 import os.path
 import re
+import sys
 import time
 import threading
 
@@ -47,7 +48,7 @@ from six import iteritems, iterkeys, itervalues, PY2, string_types, text_type
 # noinspection PyUnreachableCode
 if False:
     # noinspection PyUnresolvedReferences
-    from typing import Any, AnyStr, Dict, List, Optional
+    from typing import Any, AnyStr, Dict, List, Optional, Set, Tuple, Union
     from ..tv import TVShow
 
 
@@ -66,6 +67,8 @@ class NameParser(object):
         self.naming_pattern = naming_pattern  # type: bool
         self.testing = testing  # type: bool
         self.indexer_lookup = indexer_lookup  # type: bool
+        # show and scene exception lookups shared by the names of a parse_many batch
+        self._batch_lookups = None  # type: Optional[Dict]
 
         if self.show_obj and not self.show_obj.is_anime:
             self.compiled_regexes = compiled_regexes[self.NORMAL_REGEX]
@@ -99,14 +102,47 @@ class NameParser(object):
                 try:
                     cur_pattern = strip_comment.sub('', cur_pattern)
                     cur_regex = re.compile('(?x)' + cur_pattern, re.VERBOSE | re.IGNORECASE)
+                    cur_prefilter = cur_pattern_name in regexes.prefilters \
+                        and re.compile(regexes.prefilters[cur_pattern_name], re.IGNORECASE) or None
                 except re.error as errormsg:
                     logger.log(u'WARNING: Invalid episode_pattern, %s. %s' % (errormsg, cur_pattern))
                 else:
-                    cls.compiled_regexes[index].append([cur_pattern_num, cur_pattern_name, cur_regex])
+                    cls.compiled_regexes[index].append([cur_pattern_num, cur_pattern_name, cur_regex, cur_prefilter])
             index += 1
 
         return cls.compiled_regexes
 
+    def _get_show(self, name, try_scene_exceptions=False):
+        # type: (AnyStr, bool) -> Optional[TVShow]
+        """
+        get show object for show with given name, the lookup is reused within a parse_many batch
+
+        :param name: name of show
+        :param try_scene_exceptions: check scene exceptions
+        :return: None or show object
+        """
+        if None is self._batch_lookups:
+            return helpers.get_show(name, try_scene_exceptions)
+        key = ('show', name, try_scene_exceptions)
+        if key not in self._batch_lookups:
+            self._batch_lookups[key] = helpers.get_show(name, try_scene_exceptions)
+        return self._batch_lookups[key]
+
+    def _get_scene_season(self, name):
+        # type: (AnyStr) -> Optional[int]
+        """
+        get scene exception season for name, the lookup is reused within a parse_many batch
+
+        :param name: name of show
+        :return: season or None
+        """
+        if None is self._batch_lookups:
+            return scene_exceptions.get_scene_exception_by_name(name)[2]
+        key = ('scene_season', name)
+        if key not in self._batch_lookups:
+            self._batch_lookups[key] = scene_exceptions.get_scene_exception_by_name(name)[2]
+        return self._batch_lookups[key]
+
     @staticmethod
     def clean_series_name(series_name):
         # type: (AnyStr) -> AnyStr
@@ -153,9 +189,19 @@ class NameParser(object):
 
         matches = []
         initial_best_result = None
+        # names with non release groups removed, keyed by is anime
+        clean_names = {}
         for reg_ex in self.compiled_regexes:
-            for (cur_regex_num, cur_regex_name, cur_regex) in self.compiled_regexes[reg_ex]:
-                new_name = helpers.remove_non_release_groups(name, 'anime' in cur_regex_name)
+            for (cur_regex_num, cur_regex_name, cur_regex, cur_prefilter) in self.compiled_regexes[reg_ex]:
+                is_anime_regex = 'anime' in cur_regex_name
+                new_name = clean_names.get(is_anime_regex)
+                if None is new_name:
+                    new_name = clean_names[is_anime_regex] = helpers.remove_non_release_groups(name, is_anime_regex)
+
+                # skip the full regex when a cheap search shows it cannot match
+                if None is not cur_prefilter and not cur_prefilter.search(new_name):
+                    continue
+
                 match = cur_regex.match(new_name)
 
                 if not match:
@@ -184,7 +230,7 @@ class NameParser(object):
                         result.score += 1
 
                 if 'anime' in cur_regex_name and not (self.show_obj and self.show_obj.is_anime):
-                    p_show_obj = helpers.get_show(result.series_name, True)
+                    p_show_obj = self._get_show(result.series_name, True)
                     if p_show_obj and self.show_obj and not (p_show_obj.tvid == self.show_obj.tvid and
                                                              p_show_obj.prodid == self.show_obj.prodid):
                         p_show_obj = None
@@ -212,7 +258,7 @@ class NameParser(object):
                             if hasattr(self.show_obj, 'get_episode'):
                                 _ep_obj = self.show_obj.get_episode(parse_result.season_number, ep_num)
                             else:
-                                tmp_show_obj = helpers.get_show(parse_result.series_name, True)
+                                tmp_show_obj = self._get_show(parse_result.series_name, True)
                                 if tmp_show_obj and hasattr(tmp_show_obj, 'get_episode'):
                                     _ep_obj = tmp_show_obj.get_episode(parse_result.season_number, ep_num)
                                 else:
@@ -300,7 +346,7 @@ class NameParser(object):
                 show_obj = None
                 if not self.naming_pattern:
                     # try and create a show object for this result
-                    show_obj = helpers.get_show(best_result.series_name, self.try_scene_exceptions)
+                    show_obj = self._get_show(best_result.series_name, self.try_scene_exceptions)
 
                 # confirm passed in show object tvid_prodid matches result show object tvid_prodid
                 if show_obj and not self.testing:
@@ -327,7 +373,9 @@ class NameParser(object):
                     return best_result
 
                 # get quality
-                new_name = helpers.remove_non_release_groups(name, show_obj.is_anime)
+                new_name = clean_names.get(bool(show_obj.is_anime))
+                if None is new_name:
+                    new_name = helpers.remove_non_release_groups(name, show_obj.is_anime)
                 best_result.quality = common.Quality.nameQuality(new_name, show_obj.is_anime)
 
                 new_episode_numbers = []
@@ -408,7 +456,7 @@ class NameParser(object):
                                 new_season_numbers.append(s)
 
                 elif show_obj.is_anime and len(best_result.ab_episode_numbers) and not self.testing:
-                    scene_season = scene_exceptions.get_scene_exception_by_name(best_result.series_name)[2]
+                    scene_season = self._get_scene_season(best_result.series_name)
                     for epAbsNo in best_result.ab_episode_numbers:
                         a = epAbsNo
 
@@ -654,6 +702,30 @@ class NameParser(object):
         logger.log(u'Parsed %s into %s' % (name, final_result), logger.DEBUG)
         return final_result
 
+    def parse_many(self, names, cache_result=True, release_group=None):
+        # type: (List[AnyStr], bool, AnyStr) -> List[Union[ParseResult, InvalidNameException, InvalidShowException]]
+        """
+        parse a batch of names, e.g. all items of a feed
+
+        show lookups and scene exception resolution are done once per series name for the whole batch
+
+        :param names: names to parse
+        :param cache_result: add results to the name parser cache
+        :param release_group: Name to use if anime and no group, otherwise pick_best_result will fail
+        :return: for each name in order, the parse result or the invalid name/show exception raised for it
+        """
+        results = []
+        self._batch_lookups = {}
+        try:
+            for cur_name in names:
+                try:
+                    results.append(self.parse(cur_name, cache_result=cache_result, release_group=release_group))
+                except (InvalidNameException, InvalidShowException) as e:
+                    results.append(e)
+        finally:
+            self._batch_lookups = None
+        return results
+
 
 compiled_regexes = {NameParser.NORMAL_REGEX: NameParser.compile_regexes(NameParser.NORMAL_REGEX),
                     NameParser.ANIME_REGEX: NameParser.compile_regexes(NameParser.ANIME_REGEX),
@@ -845,12 +917,69 @@ class ParseResult(LegacyParseResult):
 
 
 class NameParserCache(object):
-    def __init__(self):
+    def __init__(self, max_entries=None, max_bytes=None):
+        # type: (Optional[int], Optional[int]) -> None
+        """
+        cache of parse results with least recently used eviction, bounded by number of entries and approximate size
+
+        :param max_entries: maximum number of entries, None to use sickgear.NAME_PARSER_CACHE_SIZE
+        :param max_bytes: maximum approximate size in bytes, None to use sickgear.NAME_PARSER_CACHE_KB
+        """
         super(NameParserCache, self).__init__()
         self._previous_parsed = OrderedDefaultdict()  # type: Dict[AnyStr, ParseResult]
-        self._cache_size = 1000
+        self._sizes = {}  # type: Dict[AnyStr, int]
+        # names cached for a (tvid, prodid) to flush a show without scanning all entries
+        self._show_names = {}  # type: Dict[Tuple[int, int], Set[AnyStr]]
+        # the (tvid, prodid) of a name when it was cached, the ids of a show change with a switch of source
+        self._name_keys = {}  # type: Dict[AnyStr, Tuple[int, int]]
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.flushed = 0
         self.lock = threading.Lock()
 
+    @property
+    def max_entries(self):
+        # type: (...) -> int
+        return self._max_entries or sickgear.NAME_PARSER_CACHE_SIZE
+
+    @property
+    def max_bytes(self):
+        # type: (...) -> int
+        return self._max_bytes or sickgear.NAME_PARSER_CACHE_KB * 1024
+
+    @staticmethod
+    def _show_key(show_obj):
+        # type: (TVShow) -> Tuple[int, int]
+        return getattr(show_obj, 'tvid', None), getattr(show_obj, 'prodid', None)
+
+    @staticmethod
+    def _size_of(name, parse_result):
+        # type: (AnyStr, ParseResult) -> int
+        """
+        approximate size of a cache entry, the show object is shared and not counted
+        """
+        return sys.getsizeof(name) + sys.getsizeof(parse_result) + sys.getsizeof(parse_result.__dict__) + \
+            sum([sys.getsizeof(v) for v in itervalues(parse_result.__dict__)
+                 if isinstance(v, (string_types, list, datetime.date))])
+
+    def _remove(self, name):
+        # type: (AnyStr) -> None
+        """
+        remove entry for name, must be called with lock held
+        """
+        self._previous_parsed.pop(name)
+        self.size_bytes -= self._sizes.pop(name, 0)
+        show_key = self._name_keys.pop(name, None)
+        show_names = self._show_names.get(show_key)
+        if None is not show_names:
+            show_names.discard(name)
+            if not show_names:
+                del self._show_names[show_key]
+
     def add(self, name, parse_result):
         # type: (AnyStr, ParseResult) -> None
         """
@@ -861,16 +990,19 @@ class NameParserCache(object):
         :type parse_result: ParseResult
         """
         with self.lock:
+            if name in self._previous_parsed:
+                self._remove(name)
             self._previous_parsed[name] = parse_result
-            _current_cache_size = len(self._previous_parsed)
-            if _current_cache_size > self._cache_size:
-                key = None
-                for i in range(_current_cache_size - self._cache_size):
-                    try:
-                        key = self._previous_parsed.first_key()
-                        del self._previous_parsed[key]
-                    except KeyError:
-                        logger.log('Could not remove old NameParserCache entry: %s' % key, logger.DEBUG)
+            self._sizes[name] = self._size_of(name, parse_result)
+            self.size_bytes += self._sizes[name]
+            self._name_keys[name] = self._show_key(parse_result.show_obj)
+            self._show_names.setdefault(self._name_keys[name], set()).add(name)
+
+            max_entries, max_bytes = self.max_entries, self.max_bytes
+            while 1 < len(self._previous_parsed) and \
+                    (len(self._previous_parsed) > max_entries or self.size_bytes > max_bytes):
+                self._remove(self._previous_parsed.first_key())
+                self.evictions += 1
 
     def get(self, name):
         # type: (AnyStr) -> ParseResult
@@ -884,19 +1016,43 @@ class NameParserCache(object):
         with self.lock:
             if name in self._previous_parsed:
                 logger.log('Using cached parse result for: ' + name, logger.DEBUG)
+                self.hits += 1
                 self._previous_parsed.move_to_end(name)
                 return self._previous_parsed[name]
+            self.misses += 1
 
     def flush(self, show_obj):
         # type: (TVShow) -> None
         """
-        removes all entries corresponding to the given show_obj
+        removes all entries corresponding to the given show_obj, also those cached before a switch of its source
 
         :param show_obj: TVShow object
         """
         with self.lock:
-            self._previous_parsed = OrderedDefaultdict(None, [(k, v) for k, v in iteritems(self._previous_parsed)
-                                                       if v.show_obj != show_obj])
+            show_key = self._show_key(show_obj)
+            flush_names = list(self._show_names.get(show_key, []))
+            for cur_key, cur_names in iteritems(self._show_names):
+                # names of a key are cached for one show, so a single name tells if the key was used by show_obj
+                if cur_key != show_key and show_obj is self._previous_parsed[next(iter(cur_names))].show_obj:
+                    flush_names += [cur_name for cur_name in cur_names
+                                    if show_obj is self._previous_parsed[cur_name].show_obj]
+            for cur_name in flush_names:
+                self._remove(cur_name)
+                self.flushed += 1
+
+    def stats(self):
+        # type: (...) -> Dict[AnyStr, Union[int, float]]
+        """
+        get counters of the cache
+
+        :return: size, limits, hits, misses, evictions and flushed entries
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return dict(entries=len(self._previous_parsed), shows=len(self._show_names), bytes=self.size_bytes,
+                        max_entries=self.max_entries, max_bytes=self.max_bytes,
+                        hits=self.hits, misses=self.misses, evictions=self.evictions, flushed=self.flushed,
+                        hit_rate=lookups and round(100.0 * self.hits / lookups, 1) or 0.0)
 
 
 name_parser_cache = NameParserCache()
@@ -487,3 +487,38 @@ anime_regexes = [
      '''
      ),
 ]
+
+# cheap unanchored searches that must succeed on a name for the named regex to be able to match it,
+# a regex without a prefilter is always tried
+prefilters = {
+    'standard_repeat': r's\d+[. _-]*e\d+[. _-]+s\d+[. _-]*e\d',
+    'fov_repeat': r'\dx\d+[. _-]+\d+x\d',
+    'non_standard_multi_ep': r's\d+[. _-]*e\d+(?:[. _-]*and|&|to)\d',
+    'standard': r's\d+[. _-]*e\d',
+    'fov_non_standard_multi_ep': r'\dx\d+(?:[. _-]*and|&|to)\d',
+    'fov': r'\dx\d',
+    'scene_date_format': r'\d{4}[. _-]+\d{2}[. _-]+\d{2}',
+    'uk_date_format': r'\d{2}[. _-]+(?:\d{2}|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*[. _-]+\d{2}',
+    'stupid': r'-.*\d{3}$',
+    'verbose': r'season[. _-]+\d+[. _-]+episode[. _-]+\d',
+    'season_only': r's(?:eason[. _-])?\d',
+    'no_season_multi_ep': r'(?:e(?:p(?:isode)?)?|part|pt)[. _-]?[\divx]',
+    'no_season_general': r'(?:e(?:p(?:isode)?)?|part|pt)[. _-]?[\divx]',
+    'bare': r'[. _-]\d{3,4}(?:[. _-]|$)',
+    'no_season': r'\d',
+
+    'anime_ultimate': r'^\[.*\d{3}',
+    'anime_standard': r'\d[ ._-]+\[\d{3}',
+    'anime_standard_round': r'\d[ ._-]+\((?:CX[ ._-]?)?\d{3}',
+    'anime_ep_quality': r'\d.*[ ._-][sh]d',
+    'anime_quality_ep': r'[ ._-][sh]d.*\d',
+    'anime_slash': r'\d[ ._-]+\[\d{3,4}p',
+    'anime_standard_codec': r'\d.*\[',
+    'anime_and_normal': r's\d+[. _-]*e\d+.*[ ._-]\d',
+    'anime_and_normal_x': r'\d[. _-]*x\d+.*[ ._-]\d',
+    'anime_and_normal_reverse': r'\d[ ._-]+s\d+[. _-]*e\d',
+    'anime_and_normal_front': r'^\d.*s\d+[. _-]*e\d',
+    'anime_ep_name': r'^\[.*\d.*\[\w+\]',
+    'anime_bare_ep': r'[ ._-]{3}\d',
+    'anime_bare': r'[ ._-]\d{3}',
+}
@@ -0,0 +1,113 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+import threading
+import time
+
+import sickgear
+
+# noinspection PyUnreachableCode
+if False:
+    from typing import AnyStr, Dict, Hashable, Optional, Tuple
+
+# rendered pages are kept until a change of shows, episodes or config, pages that show a single show are only
+# dropped for changes of that show or config
+MAX_AGE = 60  # seconds a page is kept, for the parts of a page that change with time
+MAX_PAGES = 50
+
+cache_lock = threading.Lock()
+pages = OrderedDict()  # type: OrderedDict[Hashable, Tuple[Tuple, float, AnyStr]]
+# number of changes of anything, of config, and of each show
+generation = 0
+config_generation = 0
+show_generation = {}  # type: Dict[AnyStr, int]
+# counters for the page header, None until used after a change
+header_counts = None  # type: Optional[Tuple[int, int]]
+
+
+def invalidate(tvid_prodid=None):
+    # type: (Optional[AnyStr]) -> None
+    """
+    drop pages that show data changed by a show, its episodes, or by anything else if tvid_prodid is None
+
+    :param tvid_prodid: show id of a changed show
+    """
+    global generation, config_generation, header_counts
+    with cache_lock:
+        generation += 1
+        if None is tvid_prodid:
+            config_generation += 1
+        else:
+            show_generation[tvid_prodid] = 1 + show_generation.get(tvid_prodid, 0)
+        header_counts = None
+
+
+def stamp(tvid_prodid=None):
+    # type: (Optional[AnyStr]) -> Tuple
+    """
+    :param tvid_prodid: show id of a page that shows a single show, None for a page that shows any number of shows
+    :return: generations that a page depends on
+    """
+    if None is tvid_prodid:
+        return generation,
+    return config_generation, tvid_prodid, show_generation.get(tvid_prodid, 0)
+
+
+def get(key, tvid_prodid=None):
+    # type: (Hashable, Optional[AnyStr]) -> Optional[AnyStr]
+    """
+    :param key: page key
+    :param tvid_prodid: show id of a page that shows a single show
+    :return: page, or None if not cached or the page changed
+    """
+    with cache_lock:
+        page = pages.pop(key, None)
+        if page and page[0] == stamp(tvid_prodid) and MAX_AGE > time.time() - page[1]:
+            pages[key] = page
+            return page[2]
+
+
+def add(key, page_stamp, page):
+    # type: (Hashable, Tuple, AnyStr) -> None
+    """
+    :param key: page key
+    :param page_stamp: stamp taken before page data was read
+    :param page: rendered page
+    """
+    with cache_lock:
+        pages.pop(key, None)
+        pages[key] = (page_stamp, time.time(), page)
+        while MAX_PAGES < len(pages):
+            pages.popitem(last=False)
+
+
+def get_header_counts():
+    # type: (...) -> Tuple[int, int]
+    """
+    :return: number of shows not found at their source, and number of shows with any not found flag
+    """
+    global header_counts
+    counts = header_counts
+    if None is counts:
+        cur_generation = generation
+        not_found_counts = [cur_so.not_found_count for cur_so in sickgear.showList or []]
+        counts = (len([1 for cur_count in not_found_counts if 0 < cur_count]),
+                  len([1 for cur_count in not_found_counts if 0 != cur_count]))
+        with cache_lock:
+            if cur_generation == generation:
+                header_counts = counts
+    return counts
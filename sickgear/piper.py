@@ -169,7 +169,7 @@ def check_pip_env():
     py2_last = 'final py2 release'
     boost = 'performance boost'
     extra_info = dict({'Cheetah3': 'filled requirement', 'CT3': 'filled requirement',
-                       'lxml': boost, 'python-Levenshtein': boost})
+                       'lxml': boost, 'Pillow': 'smaller images', 'python-Levenshtein': boost})
     extra_info.update((dict(cryptography=py2_last, pip=py2_last, regex=py2_last,
                             scandir=boost, setuptools=py2_last),
                        dict(regex=boost))[not PY2])
@@ -1282,7 +1282,7 @@ class GenericProvider(object):
                 logger.log(u'Adding item from search to cache: ' + title, logger.DEBUG)
                 ci = self.cache.add_cache_entry(title, url, parse_result=parse_result)
                 if None is not ci:
-                    cl.append(ci)
+                    cl.extend(ci)
                 continue
 
             # make sure we want the episode
@@ -1208,11 +1208,12 @@ class NewznabCache(tvcache.TVCache):
                 self._clearCache()
 
                 # parse data
-                cl = []
+                entries = []
                 for item in items:
-                    ci = self._parseItem(n_spaces, item)
-                    if None is not ci:
-                        cl.append(ci)
+                    entry = self._parseItem(n_spaces, item)
+                    if None is not entry:
+                        entries.append(entry)
+                cl = self.add_cache_entries(entries)
 
                 if 0 < len(cl):
                     my_db = self.get_db()
@@ -1243,19 +1244,19 @@ class NewznabCache(tvcache.TVCache):
     def _parseItem(self,
                    ns,  # type: Dict
                    item  # type: etree.Element
-                   ):  # type: (...) -> Union[List[AnyStr, List[Any]], None]
+                   ):  # type: (...) -> Union[Tuple[AnyStr, AnyStr, Dict[int, int]], None]
         """
 
         :param ns:
         :param item:
-        :return:
+        :return: name, url and ids of the entry to add to cache by add_cache_entries
         """
         title, url = self._title_and_url(item)
 
         ids = self.parse_ids(item, ns)
 
         if title and url:
-            return self.add_cache_entry(title, url, tvid_prodid=ids)
+            return title, url, ids
 
         logger.log('Data returned from the %s feed is incomplete, this result is unusable' % self.provider.name,
                    logger.DEBUG)
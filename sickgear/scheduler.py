@@ -17,7 +17,6 @@
 from __future__ import division
 
 import datetime
-import time
 import threading
 import traceback
 
@@ -26,14 +25,18 @@ from exceptions_helper import ex
 
 
 class Scheduler(threading.Thread):
+    # most seconds that an idle queue action waits for a wake up, in case a change is made without one
+    idle_queue_wait = 60
+
     def __init__(self, action, cycleTime=datetime.timedelta(minutes=10), run_delay=datetime.timedelta(minutes=0),
                  start_time=None, threadName="ScheduledThread", silent=True, prevent_cycle_run=None, paused=False):
         super(Scheduler, self).__init__()
 
+        self._wake = threading.Event()
         self.lastRun = datetime.datetime.now() + run_delay - cycleTime
         self.action = action
-        self.cycleTime = cycleTime
-        self.start_time = start_time
+        self._cycle_time = cycleTime
+        self._start_time = start_time
         self.prevent_cycle_run = prevent_cycle_run
 
         self.name = threadName
@@ -43,13 +46,51 @@ class Scheduler(threading.Thread):
         if not paused:
             self._unpause.set()
         self.lock = threading.Lock()
-        self.force = False
+        self._force = False
+
+        # a queue action wakes the scheduler when an item is added or the queue is unpaused
+        if hasattr(self.action, 'wakeup'):
+            self.action.wakeup = self.wake
+
+    @property
+    def cycleTime(self):
+        return self._cycle_time
+
+    @cycleTime.setter
+    def cycleTime(self, value):
+        self._cycle_time = value
+        self.wake()
+
+    @property
+    def start_time(self):
+        return self._start_time
+
+    @start_time.setter
+    def start_time(self, value):
+        self._start_time = value
+        self.wake()
+
+    @property
+    def force(self):
+        return self._force
+
+    @force.setter
+    def force(self, value):
+        self._force = value
+        if value:
+            self.wake()
+
+    def wake(self):
+        """ Signal the thread to recheck when its action is due.
+        """
+        self._wake.set()
 
     def pause(self):
         self._unpause.clear()
 
     def unpause(self):
         self._unpause.set()
+        self.wake()
 
     def stopit(self):
         """ Stop the thread's activity.
@@ -74,6 +115,18 @@ class Scheduler(threading.Thread):
             return True
         return False
 
+    def _wait_time(self):
+        """
+        :return: seconds until the action is due
+        :rtype: float
+        """
+        if self.force:
+            return 0
+        time_left = max(0, self.timeLeft().total_seconds())
+        if time_left and getattr(self.action, 'is_idle', None) and self.action.is_idle():
+            return max(time_left, self.idle_queue_wait)
+        return time_left
+
     def run(self):
         self.set_paused_state()
 
@@ -87,7 +140,18 @@ class Scheduler(threading.Thread):
         # if self._unpause Event() is NOT set the loop pauses
         while self._unpause.wait() and not self._stopper.is_set():
 
+            self._wake.clear()
+            # a stop that woke the thread before the clear is not waited on
+            if self._stopper.is_set():
+                break
+
             if getattr(self.action, 'is_enabled', True):
+                # sleep until the action is due, or a wake up to recheck
+                wait_time = self._wait_time()
+                if wait_time:
+                    self._wake.wait(wait_time)
+                    continue
+
                 try:
                     current_time = datetime.datetime.now()
                     should_run = False
@@ -129,12 +193,10 @@ class Scheduler(threading.Thread):
 
                 finally:
                     if self.force:
-                        self.force = False
+                        self._force = False
             else:
                 # disabled schedulers will only be rechecked every 30 seconds until enabled
-                time.sleep(30)
-
-            time.sleep(1)
+                self._wake.wait(30)
 
         # exiting thread
         self._stopper.clear()
@@ -26,6 +26,7 @@ import traceback
 import encodingKludge as ek
 import exceptions_helper
 from exceptions_helper import ex
+from sg_futures import SgThreadPoolExecutor
 from sg_helpers import write_file
 
 import sickgear
@@ -41,7 +42,7 @@ from six import iteritems, itervalues, string_types
 
 # noinspection PyUnreachableCode
 if False:
-    from typing import AnyStr, Dict, List, Optional, Tuple, Union
+    from typing import Any, AnyStr, Dict, List, Optional, Tuple, Union
 
 
 def _download_result(result):
@@ -499,7 +500,7 @@ def get_aired_in_season(show_obj, return_sql=False):
             ep_count[cur_season] = ep_count.setdefault(cur_season, 0) + 1
             cur_scene_season = helpers.try_int(cur_result['scene_season'], -1)
             if -1 != cur_scene_season:
-                ep_count_scene[cur_scene_season] = ep_count.setdefault(cur_scene_season, 0) + 1
+                ep_count_scene[cur_scene_season] = ep_count_scene.setdefault(cur_scene_season, 0) + 1
 
     if return_sql:
         return ep_count, ep_count_scene, sql_result
@@ -528,13 +529,6 @@ def wanted_episodes(show_obj,  # type: TVShow
     else:
         sql_result = [s for s in sql_result_org if s['airdate'] > from_date_ord]
 
-    if make_dict:
-        wanted = {}
-    else:
-        wanted = []
-
-    total_wanted = total_replacing = total_unaired = 0
-
     if 0 < len(sql_result) and 2 < len(sql_result) - len(show_obj.sxe_ep_obj):
         my_db = db.DBConnection()
         ep_sql_result = my_db.select(
@@ -544,8 +538,40 @@ def wanted_episodes(show_obj,  # type: TVShow
     else:
         ep_sql_result = None
 
+    return _wanted_from_rows(show_obj, sql_result, ep_count, ep_count_scene, make_dict, unaired, ep_sql_result)
+
+
+def _wanted_from_rows(show_obj,  # type: TVShow
+                      sql_result,  # type: List
+                      ep_count,  # type: Dict[int, int]
+                      ep_count_scene,  # type: Dict[int, int]
+                      make_dict=False,  # type: bool
+                      unaired=False,  # type: bool
+                      ep_results=None  # type: Optional[Union[List, Dict[Tuple[int, int], List]]]
+                      ):  # type: (...) -> Union[List[TVEpisode], Dict[int, TVEpisode]]
+    """
+    get the episode objects of rows that are wanted
+
+    :param show_obj: tv show object
+    :param sql_result: episode rows with season, scene_season and episode
+    :param ep_count: aired episodes per season
+    :param ep_count_scene: aired episodes per scene season
+    :param make_dict: make dict result
+    :param unaired: include unaired episodes
+    :param ep_results: tv_episodes rows to create episode objects from, or a dict of rows keyed by season, episode
+    :return: list or dict of wanted episode objects
+    """
+    if make_dict:
+        wanted = {}
+    else:
+        wanted = []
+
+    total_wanted = total_replacing = total_unaired = 0
+
     for result in sql_result:
-        ep_obj = show_obj.get_episode(int(result['season']), int(result['episode']), ep_result=ep_sql_result)
+        season, episode = int(result['season']), int(result['episode'])
+        ep_result = ep_results.get((season, episode)) if isinstance(ep_results, dict) else ep_results
+        ep_obj = show_obj.get_episode(season, episode, ep_result=ep_result)
         cur_status, cur_quality = common.Quality.splitCompositeStatus(ep_obj.status)
         ep_obj.wanted_quality = get_wanted_qualities(ep_obj, cur_status, cur_quality, unaired=unaired)
         if not ep_obj.wanted_quality:
@@ -578,11 +604,195 @@ def wanted_episodes(show_obj,  # type: TVShow
     return wanted
 
 
+def wanted_episodes_all(show_list,  # type: List[TVShow]
+                        from_date,  # type: datetime.date
+                        unaired=False  # type: bool
+                        ):  # type: (...) -> List[Tuple[TVShow, List[TVEpisode]]]
+    """
+    get wanted episodes of all shows that are not paused with grouped queries instead of queries per show,
+    episode objects are only created for rows that are wanted
+
+    :param show_list: tv show objects
+    :param from_date: start date
+    :param unaired: include unaired episodes
+    :return: list of show object and its list of wanted episode objects, for shows with wanted episodes
+    """
+    shows = dict([((cur_so.tvid, cur_so.prodid), cur_so) for cur_so in show_list if not cur_so.paused])
+    if not shows:
+        return []
+
+    my_db = db.DBConnection()
+    tomorrow = (datetime.date.today() + datetime.timedelta(days=1)).toordinal()
+
+    ep_counts, ep_counts_scene = {}, {}
+    for ep_count_group, season_field in ((ep_counts, 'season'), (ep_counts_scene, 'scene_season')):
+        for cur_result in my_db.select(
+                'SELECT indexer, showid, %s AS count_season, COUNT(*) AS eps'
+                ' FROM tv_episodes'
+                ' WHERE season > 0 AND airdate > 1 AND airdate <= ?%s'
+                ' GROUP BY indexer, showid, %s'
+                % (season_field, ('', ' AND scene_season IS NOT NULL')['scene_season' == season_field],
+                   season_field), [tomorrow]):
+            count_season = helpers.try_int(cur_result['count_season'], -1)
+            if 'season' == season_field or -1 != count_season:
+                ep_count_group.setdefault((cur_result['indexer'], cur_result['showid']), {})[count_season] = \
+                    cur_result['eps']
+
+    # rows with a status that can never be wanted are not fetched
+    skip_status = [common.ARCHIVED, common.IGNORED, common.SKIPPED] + ([common.UNAIRED], [])[unaired]
+    candidates = {}
+    for cur_result in my_db.select(
+            'SELECT episode_id, indexer, showid, status, season, scene_season, episode, airdate'
+            ' FROM tv_episodes'
+            ' WHERE season > 0 AND (airdate > ?%s) AND status %% 100 NOT IN (%s)'
+            % (('', ' OR airdate = 1')[unaired], ','.join(['?'] * len(skip_status))),
+            [from_date.toordinal()] + skip_status):
+        show_obj = shows.get((cur_result['indexer'], cur_result['showid']))
+        if not show_obj:
+            continue
+        cur_status, cur_quality = common.Quality.splitCompositeStatus(cur_result['status'])
+        if sickgear.WANTEDLIST_CACHE.get_wantedlist(
+                show_obj.quality, show_obj.upgrade_once, cur_quality, cur_status, unaired):
+            candidates.setdefault((show_obj.tvid, show_obj.prodid), []).append(cur_result)
+
+    # fetch full rows of wanted episodes that do not have an episode object yet
+    load_ids = [cur_result['episode_id'] for cur_key, cur_rows in iteritems(candidates) for cur_result in cur_rows
+                if not shows[cur_key].get_episode(int(cur_result['season']), int(cur_result['episode']),
+                                                  no_create=True)]
+    ep_results = {}
+    for cur_offset in range(0, len(load_ids), 500):
+        batch_ids = load_ids[cur_offset:cur_offset + 500]
+        for cur_result in my_db.select(
+                'SELECT * FROM tv_episodes WHERE episode_id IN (%s)' % ','.join(['?'] * len(batch_ids)), batch_ids):
+            ep_results.setdefault((cur_result['indexer'], cur_result['showid']), {})[
+                (int(cur_result['season']), int(cur_result['episode']))] = [cur_result]
+
+    results = []
+    for cur_show_obj in show_list:
+        cur_key = (cur_show_obj.tvid, cur_show_obj.prodid)
+        if cur_key in candidates and shows.get(cur_key) is cur_show_obj:
+            wanted = _wanted_from_rows(cur_show_obj, candidates[cur_key], ep_counts.get(cur_key, {}),
+                                       ep_counts_scene.get(cur_key, {}), unaired=unaired,
+                                       ep_results=ep_results.get(cur_key, {}))
+            if wanted:
+                results.append((cur_show_obj, wanted))
+    return results
+
+
+provider_pool = None  # type: Optional[SgThreadPoolExecutor]
+provider_pool_workers = 0
+provider_pool_lock = threading.Lock()
+provider_search_locks = {}  # type: Dict[AnyStr, threading.Lock]
+
+
+def get_provider_pool():
+    # type: (...) -> SgThreadPoolExecutor
+    """
+    get the long-lived pool of workers that search providers, the pool is renewed if the number of workers is changed
+
+    :return: provider search pool
+    """
+    global provider_pool, provider_pool_workers
+    with provider_pool_lock:
+        if None is provider_pool or sickgear.SEARCH_PROVIDER_WORKERS != provider_pool_workers:
+            if None is not provider_pool:
+                provider_pool.shutdown(wait=False)
+            provider_pool_workers = sickgear.SEARCH_PROVIDER_WORKERS
+            provider_pool = SgThreadPoolExecutor(max_workers=provider_pool_workers)
+        return provider_pool
+
+
+def get_provider_search_lock(provider):
+    # type: (GenericProvider) -> threading.Lock
+    """
+    get the lock that limits a provider to one search at a time,
+    a search clears the provider cache and tracks request failures and limits on the provider
+
+    :param provider: provider
+    :return: provider search lock
+    """
+    with provider_pool_lock:
+        return provider_search_locks.setdefault(provider.get_id(), threading.Lock())
+
+
+def _search_provider_rss(cur_provider, ep_obj_list, orig_thread_name):
+    # type: (GenericProvider, List[TVEpisode], AnyStr) -> Optional[Dict[TVEpisode, Union[NZBSearchResult, ...]]]
+    """
+    match the recent data of a provider cache to episodes, and pick the best result per episode
+
+    :param cur_provider: provider
+    :param ep_obj_list: list of episode objects
+    :param orig_thread_name: name of the thread that runs the search
+    :return: the best result per episode, or None if the provider search failed
+    """
+    threading.current_thread().name = '%s :: [%s]' % (orig_thread_name, cur_provider.name)
+
+    try:
+        ep_obj_search_result_list = cur_provider.search_rss(ep_obj_list)
+    except (BaseException, Exception) as e:
+        logger.log(u'Error while matching recent data of %s: %s' % (cur_provider.name, ex(e)), logger.ERROR)
+        logger.log(traceback.format_exc(), logger.ERROR)
+        return
+
+    found_results = {}
+
+    # pick a single result for each episode
+    for cur_ep_obj in ep_obj_search_result_list:
+
+        if cur_ep_obj.show_obj.paused:
+            logger.debug(u'Show %s is paused, ignoring all RSS items for %s' %
+                         (cur_ep_obj.show_obj.unique_name, cur_ep_obj.pretty_name()))
+            continue
+
+        # find the best result for the current episode
+        best_result = pick_best_result(ep_obj_search_result_list[cur_ep_obj], cur_ep_obj.show_obj,
+                                       filter_rls=orig_thread_name)
+
+        # if all results were rejected move on to the next episode
+        if not best_result:
+            logger.log(u'All found results for %s were rejected.' % cur_ep_obj.pretty_name(), logger.DEBUG)
+            continue
+
+        found_results[cur_ep_obj] = best_result
+
+    return found_results
+
+
+def _fetch_provider_results(cur_provider, results, orig_thread_name):
+    # type: (GenericProvider, List[TorrentSearchResult], AnyStr) -> bool
+    """
+    fetch the torrent of each result from a provider, a result that fails to fetch is left without content
+
+    :param cur_provider: provider
+    :param results: list of torrent results of the provider
+    :param orig_thread_name: name of the thread that runs the search
+    :return: True if the provider is to skip, any results after it is found to skip are not fetched
+    """
+    threading.current_thread().name = '%s :: [%s]' % (orig_thread_name, cur_provider.name)
+
+    for cur_result in results:
+        try:
+            cur_result.content = cur_provider.get_url(cur_result.url, as_binary=True)
+        except (BaseException, Exception) as e:
+            logger.log(u'Error while fetching %s from %s: %s' % (cur_result.url, cur_provider.name, ex(e)),
+                       logger.ERROR)
+            cur_result.content = None
+        if cur_provider.should_skip():
+            cur_result.content = None
+            return True
+    return False
+
+
 def search_for_needed_episodes(ep_obj_list):
     # type: (List[TVEpisode]) -> List[Union[NZBDataSearchResult, NZBSearchResult, TorrentSearchResult]]
     """
     search for episodes in list
 
+    providers are matched concurrently on the provider pool, results are merged in provider order so that
+    a result is only replaced by a better quality, and a torrent is only fetched for a result that is taken.
+    torrents are fetched on the provider pool with one task per provider, the next result of an episode is
+    fetched in a following round if a fetch fails
+
     :param ep_obj_list: list of episode objects
     :return: list of found search results
     """
@@ -594,50 +804,66 @@ def search_for_needed_episodes(ep_obj_list):
 
     providers = filter_list(lambda x: x.is_active() and x.enable_recentsearch, sickgear.providers.sortedProviderList())
 
-    for cur_provider in providers:
-        threading.current_thread().name = '%s :: [%s]' % (orig_thread_name, cur_provider.name)
+    pool = get_provider_pool()
+    provider_results = [future.result() for future in [
+        pool.submit(_search_provider_rss, cur_provider, ep_obj_list, orig_thread_name) for cur_provider in providers]]
 
-        ep_obj_search_result_list = cur_provider.search_rss(ep_obj_list)
+    # results per episode, a result is only replaced by a better quality of a later provider
+    ep_candidates = {}
+    for cur_provider_results in provider_results:
+        if None is cur_provider_results:
+            continue
 
         search_done = True
 
-        # pick a single result for each episode, respecting existing results
-        for cur_ep_obj in ep_obj_search_result_list:
-
-            if cur_ep_obj.show_obj.paused:
-                logger.debug(u'Show %s is paused, ignoring all RSS items for %s' %
-                             (cur_ep_obj.show_obj.unique_name, cur_ep_obj.pretty_name()))
-                continue
-
-            # find the best result for the current episode
-            best_result = pick_best_result(ep_obj_search_result_list[cur_ep_obj], cur_ep_obj.show_obj,
-                                           filter_rls=orig_thread_name)
-
-            # if all results were rejected move on to the next episode
-            if not best_result:
-                logger.log(u'All found results for %s were rejected.' % cur_ep_obj.pretty_name(), logger.DEBUG)
-                continue
-
-            # if it's already in the list (from another provider) and the newly found quality is no better then skip it
-            if cur_ep_obj in found_results and best_result.quality <= found_results[cur_ep_obj].quality:
+        for cur_ep_obj, best_result in iteritems(cur_provider_results):
+            ep_candidates.setdefault(cur_ep_obj, []).append(best_result)
+
+    # take the best quality, in provider order for an equal quality, and fall back to the next on a failed fetch
+    for cur_ep_obj in ep_candidates:
+        ep_candidates[cur_ep_obj] = sorted(ep_candidates[cur_ep_obj], key=lambda r: r.quality, reverse=True)
+
+    skip_providers = set()
+    while ep_candidates:
+        # the next result of each episode, torrents are fetched concurrently with one task per provider
+        provider_fetches = {}
+        for cur_ep_obj, cur_candidates in list(iteritems(ep_candidates)):
+            while cur_candidates and cur_candidates[0].provider in skip_providers:
+                cur_candidates.pop(0)
+            if not cur_candidates:
+                del ep_candidates[cur_ep_obj]
                 continue
 
-            # filter out possible bad torrents from providers
+            best_result = cur_candidates[0]
             if 'torrent' == best_result.resultType and 'blackhole' != sickgear.TORRENT_METHOD:
                 best_result.content = None
                 if not best_result.url.startswith('magnet'):
-                    best_result.content = best_result.provider.get_url(best_result.url, as_binary=True)
-                    if best_result.provider.should_skip():
-                        break
-                    if not best_result.content:
-                        continue
+                    provider_fetches.setdefault(best_result.provider, []).append((cur_ep_obj, best_result))
+                    continue
 
             found_results[cur_ep_obj] = best_result
+            del ep_candidates[cur_ep_obj]
+
+        futures = dict([(cur_provider, pool.submit(
+            _fetch_provider_results, cur_provider, [r for _, r in cur_fetches], orig_thread_name))
+            for cur_provider, cur_fetches in iteritems(provider_fetches)])
+
+        for cur_provider, cur_fetches in iteritems(provider_fetches):
+            if futures[cur_provider].result():
+                skip_providers.add(cur_provider)
+            for cur_ep_obj, best_result in cur_fetches:
+                if best_result.content:
+                    found_results[cur_ep_obj] = best_result
+                    del ep_candidates[cur_ep_obj]
+                else:
+                    # filter out possible bad torrents from providers
+                    ep_candidates[cur_ep_obj].pop(0)
 
-            try:
-                cur_provider.save_list()
-            except (BaseException, Exception):
-                pass
+    for cur_provider in set([cur_result.provider for cur_result in itervalues(found_results)]):
+        try:
+            cur_provider.save_list()
+        except (BaseException, Exception):
+            pass
 
     threading.current_thread().name = orig_thread_name
 
@@ -761,6 +987,23 @@ def _search_provider_thread(provider, provider_results, show_obj, ep_obj_list, m
         logger.log('No suitable result at [%s]' % provider.name)
 
 
+def _search_provider_task(provider, thread_name, **kwargs):
+    # type: (GenericProvider, AnyStr, Any) -> None
+    """
+    perform a search on a provider from the provider pool, waiting for any running search on the same provider
+
+    :param provider: Provider to search
+    :param thread_name: name of the pool thread during the search
+    :param kwargs: passed thru to _search_provider_thread
+    """
+    threading.current_thread().name = thread_name
+    with get_provider_search_lock(provider):
+        # a limit or failures may have been reached by a search of another segment
+        if provider.should_skip():
+            return
+        _search_provider_thread(provider, **kwargs)
+
+
 def cache_torrent_file(
         search_result,  # type: Union[sickgear.classes.SearchResult, TorrentSearchResult]
         show_obj,  # type: TVShow
@@ -839,7 +1082,7 @@ def search_providers(
     final_results = []
 
     search_done = False
-    search_threads = []
+    search_futures = []
 
     orig_thread_name = threading.current_thread().name
 
@@ -848,7 +1091,8 @@ def search_providers(
                      (not torrent_only or GenericProvider.TORRENT == x.providerType) and
                      (not scheduled or getattr(x, 'enable_scheduled_backlog', None))]
 
-    # create a thread for each provider to search
+    # queue a search for each provider on the provider pool
+    pool = get_provider_pool()
     for cur_provider in provider_list:
         if cur_provider.anime_only and not show_obj.is_anime:
             logger.debug(u'%s is not an anime, skipping' % show_obj.unique_name)
@@ -857,21 +1101,19 @@ def search_providers(
         provider_id = cur_provider.get_id()
 
         found_results[provider_id] = {}
-        search_threads.append(threading.Thread(target=_search_provider_thread,
-                                               kwargs=dict(provider=cur_provider,
-                                                           provider_results=found_results[provider_id],
-                                                           show_obj=show_obj, ep_obj_list=ep_obj_list,
-                                                           manual_search=manual_search,
-                                                           try_other_searches=try_other_searches),
-                                               name='%s :: [%s]' % (orig_thread_name, cur_provider.name)))
-
-        # start the provider search thread
-        search_threads[-1].start()
+        search_futures.append(pool.submit(_search_provider_task, cur_provider,
+                                          '%s :: [%s]' % (orig_thread_name, cur_provider.name),
+                                          provider_results=found_results[provider_id],
+                                          show_obj=show_obj, ep_obj_list=ep_obj_list,
+                                          manual_search=manual_search, try_other_searches=try_other_searches))
         search_done = True
 
     # wait for all searches to finish
-    for s_t in search_threads:
-        s_t.join()
+    for s_f in search_futures:
+        try:
+            s_f.result()
+        except (BaseException, Exception) as e:
+            logger.error(u'Error while searching providers: %s' % ex(e))
 
     # now look in all the results
     for cur_provider in provider_list:
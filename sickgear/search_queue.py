@@ -31,14 +31,14 @@ from lib.dateutil import tz
 from . import common, db, failed_history, generic_queue, helpers, \
     history, logger, network_timezones, properFinder, search, ui
 from .classes import Proper, SimpleNamespace
-from .search import wanted_episodes, get_aired_in_season, set_wanted_aired
+from .search import get_aired_in_season, set_wanted_aired, wanted_episodes_all
 from .tv import TVEpisode
 
 from _23 import filter_list
 
 # noinspection PyUnreachableCode
 if False:
-    from typing import Any, AnyStr, Dict, List, Optional, Union
+    from typing import Any, AnyStr, Dict, List, Optional, Tuple, Union
     from .tv import TVShow
 
 
@@ -56,7 +56,9 @@ MANUAL_SEARCH_HISTORY_SIZE = 100
 
 class SearchQueue(generic_queue.GenericQueue):
     def __init__(self):
-        generic_queue.GenericQueue.__init__(self, cache_db_tables=['search_queue'])
+        # backlog items of different shows run at the same time, other search items run alone
+        generic_queue.GenericQueue.__init__(self, cache_db_tables=['search_queue'],
+                                            lanes=sickgear.SEARCH_BACKLOG_SEGMENTS)
         self.queue_name = 'SEARCHQUEUE'  # type: AnyStr
 
     def load_queue(self):
@@ -165,6 +167,7 @@ class SearchQueue(generic_queue.GenericQueue):
         # type: (...) -> None
         with self.lock:
             self.min_priority = 0
+        self._wakeup()
 
     def is_backlog_paused(self):
         # type: (...) -> bool
@@ -176,7 +179,7 @@ class SearchQueue(generic_queue.GenericQueue):
     def _is_in_progress(self, item_type):
         # type: (Any) -> bool
         with self.lock:
-            return any(1 for cur_item in self.queue + [self.currentItem] if isinstance(cur_item, item_type))
+            return any(1 for cur_item in self.queue + self._get_current_items() if isinstance(cur_item, item_type))
 
     def get_queued_manual(self, tvid_prodid):
         # type: (Optional[AnyStr]) -> List[BaseSearchQueueItem]
@@ -203,9 +206,10 @@ class SearchQueue(generic_queue.GenericQueue):
         :return: base info item of ManualSearchQueueItem or FailedQueueItem or None
         """
         with self.lock:
-            if self.currentItem and isinstance(self.currentItem, (ManualSearchQueueItem, FailedQueueItem)) \
-                    and (not tvid_prodid or tvid_prodid == str(self.currentItem.show_obj.tvid_prodid)):
-                return self.currentItem.base_info()
+            for cur_item in self.current_items:
+                if isinstance(cur_item, (ManualSearchQueueItem, FailedQueueItem)) \
+                        and (not tvid_prodid or tvid_prodid == str(cur_item.show_obj.tvid_prodid)):
+                    return cur_item.base_info()
 
     def is_backlog_in_progress(self):
         # type: (...) -> bool
@@ -218,20 +222,20 @@ class SearchQueue(generic_queue.GenericQueue):
     def is_propersearch_in_progress(self):
         # type: (...) -> bool
         with self.lock:
-            return any(1 for cur_item in self.queue + [self.currentItem]
+            return any(1 for cur_item in self.queue + self._get_current_items()
                        if isinstance(cur_item, ProperSearchQueueItem) and None is cur_item.propers)
 
     def is_standard_backlog_in_progress(self):
         # type: (...) -> bool
         with self.lock:
-            return any(1 for cur_item in self.queue + [self.currentItem]
+            return any(1 for cur_item in self.queue + self._get_current_items()
                        if isinstance(cur_item, BacklogQueueItem) and cur_item.standard_backlog)
 
     def type_of_backlog_in_progress(self):
         # type: (...) -> AnyStr
         limited = full = other = False
         with self.lock:
-            for cur_item in self.queue + [self.currentItem]:
+            for cur_item in self.queue + self._get_current_items():
                 if isinstance(cur_item, BacklogQueueItem):
                     if cur_item.standard_backlog:
                         if cur_item.limited_backlog:
@@ -254,9 +258,7 @@ class SearchQueue(generic_queue.GenericQueue):
         # type: (...) -> Dict[List]
         length = dict(backlog=[], recent=0, manual=[], failed=[], proper=[])
         with self.lock:
-            for cur_item in [self.currentItem] + self.queue:
-                if not cur_item:
-                    continue
+            for cur_item in self._get_current_items() + sorted(self.queue):
                 if isinstance(cur_item, RecentSearchQueueItem):
                     length['recent'] += 1
                 elif isinstance(cur_item, ProperSearchQueueItem):
@@ -286,7 +288,7 @@ class SearchQueue(generic_queue.GenericQueue):
         if show_obj:
             with self.lock:
                 to_remove = []
-                for c in ((self.currentItem and [self.currentItem]) or []) + self.queue:
+                for c in self._get_current_items() + self.queue:
                     if show_obj == getattr(c, 'show_obj', None):
                         try:
                             to_remove.append(c.uid)
@@ -345,12 +347,8 @@ class RecentSearchQueueItem(generic_queue.QueueItem):
             show_list = sickgear.showList
             from_date = datetime.date.fromordinal(1)
             needed = common.NeededQualities()
-            for cur_show_obj in show_list:
-                if cur_show_obj.paused:
-                    continue
-
-                wanted_eps = wanted_episodes(cur_show_obj, from_date, unaired=sickgear.SEARCH_UNAIRED)
-
+            for cur_show_obj, wanted_eps in wanted_episodes_all(show_list, from_date,
+                                                                unaired=sickgear.SEARCH_UNAIRED):
                 if wanted_eps:
                     if not needed.all_needed:
                         if not needed.all_types_needed:
@@ -723,6 +721,11 @@ class BacklogQueueItem(BaseSearchQueueItem):
         self.forced = forced  # type: bool
         self.torrent_only = torrent_only  # type: bool
 
+    @property
+    def lane_key(self):
+        # type: (...) -> Tuple
+        return self.show_obj.tvid, self.show_obj.prodid
+
     def run(self):
         generic_queue.QueueItem.run(self)
 
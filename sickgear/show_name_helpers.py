@@ -35,7 +35,7 @@ from six import iterkeys, itervalues
 
 # noinspection PyUnreachableCode
 if False:
-    from typing import AnyStr, List, Optional, Set, Union
+    from typing import AnyStr, Dict, List, Optional, Set, Tuple, Union
     from .tv import TVShow
     # noinspection PyUnresolvedReferences
     from re import Pattern
@@ -155,8 +155,12 @@ def contains_any(subject,  # type: AnyStr
              then True for first pattern that does not match, or False
     :rtype: Union(NoneType, bool)
     """
-    compiled_words = compile_word_list(lookup_words, rx=rx, **kwargs)
+    matcher = get_word_matcher(lookup_words, rx=rx, **kwargs)
+    compiled_words = matcher.patterns
     if subject and compiled_words:
+        if not (matcher.missed_any(subject) if invert else matcher.found_any(subject)):
+            return False
+        # the combined expression only tells the outcome, find the pattern to log
         for rc_filter in compiled_words:
             match = rc_filter.search(subject)
             if (match and not invert) or (not match and invert):
@@ -168,6 +172,80 @@ def contains_any(subject,  # type: AnyStr
     return None
 
 
+class WordMatcher(object):
+    """
+    Lookup words compiled into single expressions that test if any or all words are found in a subject
+    """
+    __slots__ = ('patterns', 'any_rx', 'all_rx')
+
+    def __init__(self, patterns):
+        # type: (List[Pattern[AnyStr]]) -> None
+        """
+        :param patterns: compiled word patterns from compile_word_list
+        """
+        self.patterns = patterns
+        self.any_rx = self.all_rx = None  # type: Optional[Pattern[AnyStr]]
+        # a backreference number in a word would refer to a different group in a combined expression
+        if 1 < len(patterns) and not any(re.search(r'\\\d|\(\?P=', p.pattern) for p in patterns):
+            words = [p.pattern[len('(?i)'):] for p in patterns]
+            try:
+                self.any_rx = re.compile('(?i)%s' % '|'.join(['(?:%s)' % w for w in words]))
+                self.all_rx = re.compile('(?i)^%s' % ''.join([r'(?=[\s\S]*?(?:%s))' % w for w in words]))
+            except (BaseException, Exception):
+                self.any_rx = self.all_rx = None
+
+    def found_any(self, subject):
+        # type: (AnyStr) -> bool
+        """
+        :return: True if any word pattern is found in subject
+        """
+        if self.any_rx:
+            return bool(self.any_rx.search(subject))
+        return any(p.search(subject) for p in self.patterns)
+
+    def missed_any(self, subject):
+        # type: (AnyStr) -> bool
+        """
+        :return: True if any word pattern is not found in subject
+        """
+        if self.all_rx:
+            return not self.all_rx.match(subject)
+        return any(not p.search(subject) for p in self.patterns)
+
+
+# matchers keyed by lookup words and options, changed word lists or config produce a new key
+word_matchers = {}  # type: Dict[Tuple, WordMatcher]
+
+
+def get_word_matcher(lookup_words,  # type: Union[AnyStr, Set[AnyStr], List[AnyStr]]
+                     re_prefix=r'(^|[\W_])',  # type: AnyStr
+                     re_suffix=r'($|[\W_])',  # type: AnyStr
+                     rx=None
+                     ):  # type: (...) -> WordMatcher
+    """
+    Get lookup words compiled once into a matcher, reused until the words or options change
+
+    :param lookup_words: List or comma separated string of words to search
+    :param re_prefix: insert string to all lookup words
+    :param re_suffix: append string to all lookup words
+    :param rx: lookup_words are regex
+    :return: matcher of lookup words
+    """
+    words_key = lookup_words
+    if isinstance(lookup_words, (set, frozenset)):
+        words_key = frozenset(lookup_words)
+    elif isinstance(lookup_words, list):
+        words_key = tuple(lookup_words)
+    key = (words_key, re_prefix, re_suffix, rx)
+    matcher = word_matchers.get(key)
+    if None is matcher:
+        if 1000 < len(word_matchers):
+            word_matchers.clear()
+        matcher = word_matchers[key] = WordMatcher(
+            compile_word_list(lookup_words, re_prefix=re_prefix, re_suffix=re_suffix, rx=rx))
+    return matcher
+
+
 def compile_word_list(lookup_words,  # type: Union[AnyStr, Set[AnyStr]]
                       re_prefix=r'(^|[\W_])',  # type: AnyStr
                       re_suffix=r'($|[\W_])',  # type: AnyStr
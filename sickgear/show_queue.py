@@ -29,10 +29,10 @@ import exceptions_helper
 from exceptions_helper import ex
 
 import sickgear
-from . import logger, ui, db, generic_queue, name_cache
+from . import logger, ui, db, generic_queue, name_cache, page_cache
 from .anime import AniGroupList
 from .common import SKIPPED, WANTED, UNAIRED, Quality, statusStrings
-from .helpers import should_delete_episode, find_show_by_id
+from .helpers import find_show_by_id, index_show_mapped_ids, should_delete_episode
 from .indexermapper import clean_show_name, map_indexers_to_show
 from .indexers.indexer_config import TVINFO_TVDB, TVINFO_TVRAGE
 from .name_parser.parser import NameParser
@@ -64,12 +64,18 @@ def bool_none(val):
 
 class ShowQueue(generic_queue.GenericQueue):
     def __init__(self):
-        generic_queue.GenericQueue.__init__(self, cache_db_tables=['show_queue'], main_db_tables=['tv_src_switch'])
+        generic_queue.GenericQueue.__init__(self, cache_db_tables=['show_queue'], main_db_tables=['tv_src_switch'],
+                                            lanes=sickgear.SHOW_QUEUE_LANES)
         self.queue_name = 'SHOWQUEUE'
         self.daily_update_running = False
         if not db.DBConnection().has_flag('kodi_nfo_uid'):
             self.add_event(DAILY_SHOW_UPDATE_FINISHED_EVENT, sickgear.metadata.kodi.set_nfo_uid_updated)
 
+    def is_idle(self):
+        # type: (...) -> bool
+        # events are checked until the end of a daily update is noticed
+        return not self.daily_update_running and generic_queue.GenericQueue.is_idle(self)
+
     def check_events(self):
         if self.daily_update_running and \
                 not (self.isShowUpdateRunning() or sickgear.show_update_scheduler.action.amActive):
@@ -265,9 +271,7 @@ class ShowQueue(generic_queue.GenericQueue):
         :rtype: bool
         """
         with self.lock:
-            return None is not self.currentItem \
-                   and show_obj == self.currentItem.show_obj \
-                   and self.currentItem.action_id in actions
+            return any(1 for x in self.current_items if show_obj == x.show_obj and x.action_id in actions)
 
     def isInUpdateQueue(self, show_obj):
         # type: (TVShow) -> bool
@@ -377,7 +381,7 @@ class ShowQueue(generic_queue.GenericQueue):
         :rtype: bool
         """
         with self.lock:
-            return any(1 for x in self.queue + [self.currentItem]
+            return any(1 for x in self.queue + self._get_current_items()
                        if isinstance(x, ShowQueueItem) and x.scheduled_update)
 
     def is_show_being_switched(self, show_obj):
@@ -401,7 +405,7 @@ class ShowQueue(generic_queue.GenericQueue):
     def is_switch_running(self):
         # type: (...) -> bool
         with self.lock:
-            return any(1 for x in self.queue + [self.currentItem] if isinstance(x, QueueItemSwitchSource))
+            return any(1 for x in self.queue + self._get_current_items() if isinstance(x, QueueItemSwitchSource))
 
     def _getLoadingShowList(self):
         """
@@ -410,7 +414,7 @@ class ShowQueue(generic_queue.GenericQueue):
         :rtype: List
         """
         with self.lock:
-            return [x for x in self.queue + [self.currentItem] if None is not x and x.isLoading]
+            return [x for x in self.queue + self._get_current_items() if x.isLoading]
 
     def queue_length(self):
         # type: (...) -> Dict[AnyStr, List[AnyStr, Dict]]
@@ -421,9 +425,7 @@ class ShowQueue(generic_queue.GenericQueue):
         length = {'add': [], 'update': [], 'forceupdate': [], 'forceupdateweb': [], 'refresh': [], 'rename': [],
                   'subtitle': [], 'switch': []}
         with self.lock:
-            for cur_item in [self.currentItem] + self.queue:  # type: ShowQueueItem
-                if not cur_item:
-                    continue
+            for cur_item in self._get_current_items() + sorted(self.queue):  # type: ShowQueueItem
                 result_item = {'name': cur_item.show_name, 'scheduled_update': cur_item.scheduled_update,
                                'uid': cur_item.uid}
                 if isinstance(cur_item, QueueItemAdd):
@@ -638,7 +640,7 @@ class ShowQueue(generic_queue.GenericQueue):
         # type: (TVShow) -> None
         if show_obj:
             with self.lock:
-                for c in ((self.currentItem and [self.currentItem]) or []) + self.queue:
+                for c in self._get_current_items() + self.queue:
                     if show_obj == getattr(c, 'show_obj', None):
                         try:
                             self.remove_from_queue([c.uid])
@@ -762,8 +764,16 @@ class ShowQueueItem(generic_queue.QueueItem):
         """
         :rtype: bool
         """
-        return self in sickgear.show_queue_scheduler.action.queue + [
-            sickgear.show_queue_scheduler.action.currentItem]
+        return self in sickgear.show_queue_scheduler.action.queue + \
+            sickgear.show_queue_scheduler.action.current_items
+
+    @property
+    def lane_key(self):
+        # type: (...) -> Optional[Tuple]
+        """
+        actions on different shows run at the same time
+        """
+        return self.show_obj and (self.show_obj.tvid, self.show_obj.prodid) or None
 
     def _getName(self):
         """
@@ -776,6 +786,19 @@ class ShowQueueItem(generic_queue.QueueItem):
     def _isLoading(self):
         return False
 
+    def _invalidate_pages(self):
+        # pages show the task of a show, and adding a show changes the show list
+        page_cache.invalidate(None if ShowQueueActions.ADD == self.action_id or not self.show_obj
+                              else self.show_obj.tvid_prodid)
+
+    def run(self):
+        generic_queue.QueueItem.run(self)
+        self._invalidate_pages()
+
+    def finish(self):
+        generic_queue.QueueItem.finish(self)
+        self._invalidate_pages()
+
     def __str__(self):
         return '<%s (%s)>' % (self.__class__.__name__, (self.show_obj and self.show_obj.name))
 
@@ -864,6 +887,14 @@ class QueueItemAdd(ShowQueueItem):
 
         self.priority = generic_queue.QueuePriorities.VERYHIGH
 
+    @property
+    def lane_key(self):
+        # type: (...) -> None
+        """
+        adding a show runs alone
+        """
+        return None
+
     def _getName(self):
         """
         :return: the show name if there is a show object created, if not returns
@@ -1085,6 +1116,7 @@ class QueueItemAdd(ShowQueueItem):
             # add it to the show list if not already in it
             sickgear.showList.append(self.show_obj)
             sickgear.showDict[self.show_obj.sid_int] = self.show_obj
+            index_show_mapped_ids(self.show_obj)
             sickgear.webserve.Home.make_showlist_unique_names()
             sickgear.MEMCACHE['history_tab'] = sickgear.webserve.History.menu_tab(
                 sickgear.MEMCACHE['history_tab_limit'])
@@ -1214,8 +1246,8 @@ class QueueItemAdd(ShowQueueItem):
 
 class QueueItemRefresh(ShowQueueItem):
     def __init__(self, show_obj=None, force=False, scheduled_update=False, priority=generic_queue.QueuePriorities.HIGH,
-                 force_image_cache=False, uid=None, switch=False, **kwargs):
-        # type: (TVShow, bool, bool, integer_types, bool, integer_types, bool, Any) -> None
+                 force_image_cache=False, uid=None, switch=False, dir_unchanged=False, **kwargs):
+        # type: (TVShow, bool, bool, integer_types, bool, integer_types, bool, bool, Any) -> None
         """
 
         :param show_obj: show object
@@ -1230,6 +1262,7 @@ class QueueItemRefresh(ShowQueueItem):
         :type force_image_cache: bool
         :param uid:
         :param switch: switching show
+        :param dir_unchanged: show dir is unchanged since the last refresh, only upkeep metadata, images, and XEM
         :param kwargs:
         """
         ShowQueueItem.__init__(self, ShowQueueActions.REFRESH, show_obj, scheduled_update, uid=uid)
@@ -1244,14 +1277,19 @@ class QueueItemRefresh(ShowQueueItem):
 
         self.switch = switch  # type: bool
 
+        self.dir_unchanged = dir_unchanged  # type: bool
+
         self.kwargs = kwargs
 
     def run(self):
         ShowQueueItem.run(self)
 
-        logger.log('Performing refresh on %s' % self.show_obj.unique_name)
+        if self.dir_unchanged:
+            logger.log('Performing upkeep of metadata and images on %s' % self.show_obj.unique_name)
+        else:
+            logger.log('Performing refresh on %s' % self.show_obj.unique_name)
 
-        self.show_obj.refresh_dir()
+            self.show_obj.refresh_dir()
         self.show_obj.write_metadata(force=self.force)
         # if self.force:
         #    self.show_obj.update_metadata()
@@ -1575,6 +1613,14 @@ class QueueItemSwitchSource(ShowQueueItem):
         self.resume = resume  # type: bool
         self.kwargs = kwargs  # type: Dict
 
+    @property
+    def lane_key(self):
+        # type: (...) -> None
+        """
+        switching the source of a show runs alone
+        """
+        return None
+
     def _set_switch_tbl_status(self, status=TVSWITCH_NORMAL):
         # type: (integer_types) -> None
         """
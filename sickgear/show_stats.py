@@ -0,0 +1,175 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+from array import array
+from bisect import bisect_left, bisect_right
+import threading
+
+from . import db
+from .common import FAILED, SKIPPED, WANTED, Quality
+
+from six import iteritems
+
+# noinspection PyUnreachableCode
+if False:
+    from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# tv_episodes triggers add one to the version of a show in tv_show_stats for each change of episode status or airdate,
+# the stats of a show are loaded again when its version differs from the version they were loaded at
+SHOW_STATS_SQL = [
+    'CREATE TABLE IF NOT EXISTS tv_show_stats'
+    ' (indexer NUMERIC NOT NULL, showid NUMERIC NOT NULL, version NUMERIC NOT NULL DEFAULT 0,'
+    ' PRIMARY KEY (indexer, showid))',
+    'INSERT OR IGNORE INTO tv_show_stats (indexer, showid) SELECT DISTINCT indexer, showid FROM tv_episodes',
+    'CREATE TRIGGER IF NOT EXISTS tv_show_stats_insert AFTER INSERT ON tv_episodes BEGIN'
+    ' INSERT OR IGNORE INTO tv_show_stats (indexer, showid) VALUES (NEW.indexer, NEW.showid);'
+    ' UPDATE tv_show_stats SET version = version + 1 WHERE indexer = NEW.indexer AND showid = NEW.showid;'
+    ' END',
+    'CREATE TRIGGER IF NOT EXISTS tv_show_stats_update AFTER UPDATE OF indexer, showid, season, episode, status, airdate'
+    ' ON tv_episodes WHEN OLD.status IS NOT NEW.status OR OLD.airdate IS NOT NEW.airdate'
+    ' OR OLD.season IS NOT NEW.season OR OLD.episode IS NOT NEW.episode'
+    ' OR OLD.indexer IS NOT NEW.indexer OR OLD.showid IS NOT NEW.showid BEGIN'
+    ' INSERT OR IGNORE INTO tv_show_stats (indexer, showid) VALUES (NEW.indexer, NEW.showid);'
+    ' UPDATE tv_show_stats SET version = version + 1 WHERE indexer = OLD.indexer AND showid = OLD.showid;'
+    ' UPDATE tv_show_stats SET version = version + 1 WHERE indexer = NEW.indexer AND showid = NEW.showid;'
+    ' END',
+    'CREATE TRIGGER IF NOT EXISTS tv_show_stats_delete AFTER DELETE ON tv_episodes BEGIN'
+    ' UPDATE tv_show_stats SET version = version + 1 WHERE indexer = OLD.indexer AND showid = OLD.showid;'
+    ' END',
+]
+
+SNATCHED_ANY = frozenset(Quality.SNATCHED_ANY)
+DOWNLOADED_ANY = frozenset(Quality.DOWNLOADED + Quality.ARCHIVED)
+# load stats of all shows in one query when more than this number of shows changed
+MAX_SHOW_QUERIES = 20
+
+stats_lock = threading.Lock()
+# (tvid, prodid): (version, stats)
+show_stats = {}  # type: Dict[Tuple[int, int], Tuple[int, ShowStats]]
+
+
+def status_group(status):
+    # type: (int) -> Union[int, str]
+    """
+    :param status: composite episode status
+    :return: 'snatched' for any snatched, 'downloaded' for any downloaded or archived, otherwise the status
+    """
+    return ('downloaded' if status in DOWNLOADED_ANY else status, 'snatched')[status in SNATCHED_ANY]
+
+
+class ShowStats(object):
+    """
+    sorted episode airdates of a show by (regular episode, status group), to count episodes aired up to any day
+    """
+    __slots__ = ('airdates',)
+
+    def __init__(self, rows=()):
+        # type: (Iterable[Tuple[int, int, int, int]]) -> None
+        """
+        :param rows: season, episode, status, airdate
+        """
+        airdates = {}  # type: Dict[Tuple[bool, Union[int, str]], List[int]]
+        for season, episode, status, airdate in rows:
+            airdates.setdefault((0 < season and 0 < episode, status_group(status or 0)), []).append(airdate or 1)
+        self.airdates = dict([(k, array('l', sorted(v))) for k, v in iteritems(airdates)])  # type: Dict
+
+    def count(self, groups=None, regular=True, after=None, until=None):
+        # type: (Optional[Iterable[Union[int, str]]], Optional[bool], Optional[int], Optional[int]) -> int
+        """
+        :param groups: status groups to count, None for all
+        :param regular: True to count regular episodes, False for specials, None for all
+        :param after: count episodes with an airdate after this ordinal
+        :param until: count episodes with an airdate up to and including this ordinal
+        :return: number of episodes
+        """
+        num = 0
+        for (cur_regular, cur_group), cur_airdates in iteritems(self.airdates):
+            if (None is regular or regular == cur_regular) and (None is groups or cur_group in groups):
+                num += (len(cur_airdates) if None is until else bisect_right(cur_airdates, until)) \
+                       - (0 if None is after else bisect_right(cur_airdates, after))
+        return max(0, num)
+
+    def episode_counts(self, today, wanted_status=(SKIPPED, WANTED, FAILED)):
+        # type: (int, Iterable[int]) -> Tuple[int, int, int]
+        """
+        :param today: ordinal of today
+        :param wanted_status: status of episodes that count to the total when aired
+        :return: number of snatched, downloaded, and total regular episodes with an airdate
+        """
+        ep_snatched = self.count(('snatched',), after=1)
+        ep_downloaded = self.count(('downloaded',), after=1)
+        return ep_snatched, ep_downloaded, ep_snatched + ep_downloaded + self.count(wanted_status, after=1, until=today)
+
+    def next_airdate(self, groups, since):
+        # type: (Iterable[Union[int, str]], int) -> Optional[int]
+        """
+        :param groups: status groups of episodes, of any season
+        :param since: ordinal of first day
+        :return: earliest airdate ordinal from since, or None if no episode airs
+        """
+        airdates = []
+        for (_, cur_group), cur_airdates in iteritems(self.airdates):
+            if cur_group in groups:
+                index = bisect_left(cur_airdates, since)
+                if index < len(cur_airdates):
+                    airdates.append(cur_airdates[index])
+        return airdates and min(airdates) or None
+
+
+def get_show_stats():
+    # type: (...) -> Dict[Tuple[int, int], ShowStats]
+    """
+    load the stats of shows with changed episodes
+
+    :return: stats by (tvid, prodid)
+    """
+    with stats_lock:
+        my_db = db.DBConnection()
+        # read versions before episodes, a change made in between is loaded again at the next call
+        versions = dict([((int(cur_row['indexer']), int(cur_row['showid'])), int(cur_row['version']))
+                         for cur_row in my_db.select('SELECT indexer, showid, version FROM tv_show_stats')])
+        for cur_key in [cur_key for cur_key in show_stats if cur_key not in versions]:
+            del show_stats[cur_key]
+        changed = [cur_key for cur_key, cur_version in iteritems(versions)
+                   if cur_version != show_stats.get(cur_key, (None,))[0]]
+        if changed:
+            sql = 'SELECT indexer, showid, season, episode, status, airdate FROM tv_episodes'
+            if MAX_SHOW_QUERIES < len(changed):
+                sql_result = my_db.select(sql)
+            else:
+                sql_result = []
+                for cur_tvid, cur_prodid in changed:
+                    sql_result += my_db.select('%s WHERE indexer = ? AND showid = ?' % sql, [cur_tvid, cur_prodid])
+            rows = dict([(cur_key, []) for cur_key in changed])
+            for cur_row in sql_result:
+                cur_rows = rows.get((int(cur_row['indexer']), int(cur_row['showid'])))
+                if None is not cur_rows:
+                    cur_rows.append((cur_row['season'], cur_row['episode'], cur_row['status'], cur_row['airdate']))
+            for cur_key, cur_rows in iteritems(rows):
+                show_stats[cur_key] = (versions[cur_key], ShowStats(cur_rows))
+
+        return dict([(cur_key, cur_stats) for cur_key, (_, cur_stats) in iteritems(show_stats)])
+
+
+def sum_count(stats, **kwargs):
+    # type: (Iterable[ShowStats], ...) -> int
+    """
+    :param stats: stats of shows
+    :param kwargs: ShowStats.count parameters
+    :return: number of episodes of all shows
+    """
+    return sum([cur_stats.count(**kwargs) for cur_stats in stats])
+
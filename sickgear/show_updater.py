@@ -16,18 +16,23 @@
 
 import datetime
 import os
+import threading
+import time
 import traceback
 
 import exceptions_helper
 from exceptions_helper import ex
 # noinspection PyPep8Naming
 import encodingKludge as ek
+from sg_futures import SgThreadPoolExecutor
 
 import sickgear
-from . import db, logger, network_timezones, properFinder, ui
+from . import db, generic_queue, logger, network_timezones, properFinder, ui
 
 # noinspection PyUnreachableCode
 if False:
+    from typing import AnyStr, Dict, List, Optional, Tuple
+    from sickgear.show_queue import ShowQueueItem
     from sickgear.tv import TVShow
 
 
@@ -56,9 +61,111 @@ def clean_ignore_require_words():
         pass
 
 
+class TVInfoPrefetch(object):
+    """
+    fetch show and episode data of shows queued for update into the tvinfo cache ahead of their queue items,
+    concurrently with per source limits of workers and time between fetches
+    """
+    def __init__(self, window=None):
+        # type: (int) -> None
+        """
+        :param window: maximum number of fetched shows that wait for their queue item to start
+        """
+        self.window = max(1, window or sickgear.SHOW_UPDATE_PREFETCH)  # type: int
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.src_workers = {}  # type: Dict[int, threading.Semaphore]
+        self.src_next_fetch = {}  # type: Dict[int, float]
+        self.fetched = 0  # type: int
+        self.failed = 0  # type: int
+
+    @staticmethod
+    def src_limits(tvid):
+        # type: (int) -> Tuple[int, float]
+        """
+        :return: number of concurrent fetches, minimum seconds between the start of fetches for a source
+        """
+        tvinfo_config = sickgear.TVInfoAPI(tvid).config
+        return max(1, tvinfo_config.get('prefetch_workers', 1)), \
+            max(0.0, tvinfo_config.get('prefetch_interval', 1.0))
+
+    @staticmethod
+    def is_started(queue_item):
+        # type: (ShowQueueItem) -> bool
+        return queue_item.inProgress or None is not queue_item.ident
+
+    def _wait_turn(self, tvid, interval):
+        # type: (int, float) -> None
+        with self.lock:
+            now = time.time()
+            start = max(now, self.src_next_fetch.get(tvid, now))
+            self.src_next_fetch[tvid] = start + interval
+        if start > now:
+            self.stop.wait(start - now)
+
+    @staticmethod
+    def _get_show(show_obj):
+        # type: (TVShow) -> None
+        """
+        load show data the way TVShow.load_from_tvinfo does, so that the update uses the cached show data
+        """
+        tvinfo_config = sickgear.TVInfoAPI(show_obj.tvid).api_params.copy()
+        if show_obj.lang:
+            tvinfo_config['language'] = show_obj.lang
+        if 0 != show_obj.dvdorder:
+            tvinfo_config['dvdorder'] = True
+        t = sickgear.TVInfoAPI(show_obj.tvid).setup(**tvinfo_config)
+        t.get_show(show_obj.prodid, actors=True, language=show_obj.lang)
+
+    def _fetch(self, show_obj, queue_item):
+        # type: (TVShow, ShowQueueItem) -> None
+        with self.src_workers[show_obj.tvid]:
+            self._wait_turn(show_obj.tvid, self.src_limits(show_obj.tvid)[1])
+            if self.stop.is_set() or self.is_started(queue_item):
+                return
+            try:
+                self._get_show(show_obj)
+                with self.lock:
+                    self.fetched += 1
+            except (BaseException, Exception) as e:
+                with self.lock:
+                    self.failed += 1
+                logger.debug('Failed to prefetch show data for %s: %s' % (show_obj.unique_name, ex(e)))
+
+    def run(self, update_list):
+        # type: (List[Tuple[TVShow, ShowQueueItem]]) -> None
+        """
+        :param update_list: shows and their update queue item in order of queue
+        """
+        for cur_tvid in set(cur_show_obj.tvid for cur_show_obj, _ in update_list):
+            self.src_workers[cur_tvid] = threading.Semaphore(self.src_limits(cur_tvid)[0])
+
+        waiting = []  # type: List[ShowQueueItem]
+        with SgThreadPoolExecutor(max_workers=sum(self.src_limits(cur_tvid)[0] for cur_tvid in self.src_workers)
+                                  or 1) as executor:
+            for cur_show_obj, cur_queue_item in update_list:
+                # keep fetched data close to the queue, as cached shows expire from the tvinfo cache
+                while not self.stop.is_set():
+                    waiting = [cur_item for cur_item in waiting if not self.is_started(cur_item)]
+                    if self.window > len(waiting):
+                        break
+                    self.stop.wait(1)
+                if self.stop.is_set():
+                    break
+                if self.is_started(cur_queue_item):
+                    continue
+                executor.submit(self._fetch, cur_show_obj, cur_queue_item)
+                waiting.append(cur_queue_item)
+
+        logger.log('Prefetched show data for %s of %s shows due for update%s' % (
+            self.fetched, len(update_list), ('', ', %s failed' % self.failed)[0 < self.failed]))
+
+
 class ShowUpdater(object):
     def __init__(self):
         self.amActive = False
+        self.prefetch = None  # type: Optional[TVInfoPrefetch]
+        self.update_counts = {}  # type: Dict[AnyStr, int]
 
     def run(self):
 
@@ -147,7 +254,6 @@ class ShowUpdater(object):
             # add missing mapped ids
             if not sickgear.background_mapping_task.is_alive():
                 logger.log(u'Updating the TV info mappings')
-                import threading
                 try:
                     sickgear.background_mapping_task = threading.Thread(
                         name='MAPPINGSUPDATER', target=sickgear.indexermapper.load_mapped_ids, kwargs={'update': True})
@@ -198,33 +304,72 @@ class ShowUpdater(object):
                 t = sickgear.TVInfoAPI(src).setup(**tvinfo_config)
                 show_updates.update({src: t.get_updated_shows()})
 
+            # the show dir times of the last refresh of shows, to skip shows unchanged at source and on disk
+            dir_mtimes = {}
+            if sickgear.SHOW_UPDATE_DELTA:
+                my_db = db.DBConnection('cache.db')
+                sql_result = my_db.select('SELECT indexer || ? || indexer_id AS tvid_prodid, dir_mtime'
+                                          ' FROM show_updates', [TVidProdid.glue])
+                dir_mtimes = dict([(cur_result['tvid_prodid'], cur_result['dir_mtime']) for cur_result in sql_result])
+
             pi_list = []
+            update_list = []
+            update_counts = dict(updated=0, refreshed=0, unchanged=0)
             for cur_show_obj in sickgear.showList:  # type: sickgear.tv.TVShow
 
                 try:
+                    last_indexer_change = show_updates.get(cur_show_obj.tvid, {}).get(cur_show_obj.prodid)
                     # if should_update returns True (not 'Ended') or show is selected stale 'Ended' then update,
                     # otherwise just refresh
-                    if cur_show_obj.should_update(update_date=update_date,
-                                                  last_indexer_change=show_updates.get(cur_show_obj.tvid, {}).
-                                                          get(cur_show_obj.prodid)) \
+                    if cur_show_obj.should_update(update_date=update_date, last_indexer_change=last_indexer_change) \
                             or cur_show_obj.tvid_prodid in stale_should_update:
                         cur_queue_item = sickgear.show_queue_scheduler.action.updateShow(cur_show_obj,
                                                                                           scheduled_update=True)
+                        if sickgear.TVInfoAPI(cur_show_obj.tvid).config.get('active'):
+                            update_list.append((cur_show_obj, cur_queue_item))
+                        update_counts['updated'] += 1
+                    elif cur_show_obj.is_src_unchanged(last_indexer_change) \
+                            and None is not dir_mtimes.get(cur_show_obj.tvid_prodid) \
+                            and cur_show_obj.get_dir_mtime() == dir_mtimes.get(cur_show_obj.tvid_prodid):
+                        # skip the show dir scan, but still write missing metadata, fetch missing images,
+                        # and refresh XEM scene numbering that can change without a change at source
+                        logger.debug(u'Not updating or refreshing show %s because it\'s unchanged at source and'
+                                     u' in show dir, only upkeep is queued' % cur_show_obj.unique_name)
+                        cur_queue_item = sickgear.show_queue_scheduler.action.refreshShow(
+                            cur_show_obj, scheduled_update=True, priority=generic_queue.QueuePriorities.LOW,
+                            dir_unchanged=True)
+                        update_counts['unchanged'] += 1
                     else:
                         logger.debug(u'Not updating episodes for show %s because it\'s marked as ended and last/next'
                                      u' episode is not within the grace period.' % cur_show_obj.unique_name)
                         cur_queue_item = sickgear.show_queue_scheduler.action.refreshShow(cur_show_obj, True, True)
+                        update_counts['refreshed'] += 1
 
                     pi_list.append(cur_queue_item)
 
                 except (exceptions_helper.CantUpdateException, exceptions_helper.CantRefreshException) as e:
                     logger.log(u'Automatic update failed: ' + ex(e), logger.ERROR)
 
+            self.update_counts = update_counts
+            logger.log(u'Daily update of shows, %(updated)s to update, %(refreshed)s to refresh,'
+                       u' %(unchanged)s unchanged' % update_counts)
+
             if len(pi_list):
                 sickgear.show_queue_scheduler.action.daily_update_running = True
 
             ui.ProgressIndicators.setIndicator('dailyUpdate', ui.QueueProgressIndicator('Daily Update', pi_list))
 
+            # fetch show data for the queued updates
+            if None is not self.prefetch:
+                self.prefetch.stop.set()
+            self.prefetch = None
+            if len(update_list) and 0 < sickgear.SHOW_UPDATE_PREFETCH:
+                self.prefetch = TVInfoPrefetch()
+                prefetch_task = threading.Thread(name='SHOWUPDATER-PREFETCH', target=self.prefetch.run,
+                                                 args=(update_list,))
+                prefetch_task.daemon = True
+                prefetch_task.start()
+
             logger.log(u'Added all shows to show queue for full update')
 
         finally:
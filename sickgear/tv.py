@@ -26,6 +26,7 @@ from weakref import ReferenceType
 import datetime
 import glob
 import inspect
+import operator
 import os.path
 import re
 import requests
@@ -43,7 +44,7 @@ from exceptions_helper import ex
 
 import sickgear
 from . import db, helpers, history, image_cache, indexermapper, logger, \
-    name_cache, network_timezones, notifiers, postProcessor, subtitles
+    name_cache, network_timezones, notifiers, page_cache, postProcessor, subtitles
 from .anime import AniGroupList
 from .classes import weakList
 from .common import Quality, statusStrings, \
@@ -65,7 +66,7 @@ from lib.tvinfo_base import RoleTypes, TVINFO_FACEBOOK, TVINFO_INSTAGRAM, TVINFO
 from lib.tvinfo_base.exceptions import *
 from sg_helpers import calc_age, int_to_time, remove_file_perm, time_to_int
 
-from _23 import filter_iter, filter_list, list_keys
+from _23 import filter_iter, filter_list, list_keys, scandir
 from six import integer_types, iteritems, itervalues, moves, PY2, string_types
 
 # noinspection PyUnreachableCode
@@ -1308,6 +1309,76 @@ class Character(Referential):
     __nonzero__ = __bool__
 
 
+class TVEpisodeRecord(object):
+    """
+    compact read only episode data from a tv_episodes row for read paths that don't need a TVEpisode object
+    """
+    __slots__ = ('show_obj', 'season', 'episode', 'status', 'quality', 'airdate', 'location')
+
+    def __init__(self, show_obj, row):
+        # type: (TVShow, Row) -> None
+        self.show_obj = show_obj  # type: TVShow
+        self.season = int(row['season'])  # type: int
+        self.episode = int(row['episode'])  # type: int
+        self.status = int(row['status'] or UNKNOWN)  # type: int
+        self.quality = Quality.splitCompositeStatus(self.status)[1]  # type: int
+        self.airdate = datetime.date.fromordinal(int(row['airdate'] or 1))  # type: datetime.date
+        self.location = row['location'] or ''  # type: AnyStr
+
+    def get_episode(self):
+        # type: (...) -> Optional[TVEpisode]
+        """
+        :return: TVEpisode object of this episode, to use where more episode data is needed or data is changed
+        """
+        return self.show_obj.get_episode(self.season, self.episode)
+
+    def __repr__(self):
+        return '<TVEpisodeRecord %s %sx%s>' % (self.show_obj.tvid_prodid, self.season, self.episode)
+
+
+class TVEpisodeCache(object):
+    """
+    limit the number of TVEpisode objects kept by all shows, the least recently used idle objects are released
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ep_objs = OrderedDict()  # type: OrderedDict[int, TVEpisode]
+
+    def touch(self, ep_obj):
+        # type: (TVEpisode) -> None
+        """
+        set episode object as most recently used, and release least recently used objects over cache size
+        """
+        with self.lock:
+            self.ep_objs[id(ep_obj)] = self.ep_objs.pop(id(ep_obj), ep_obj)
+            num_release = len(self.ep_objs) - sickgear.EPISODE_CACHE_SIZE
+            if 0 >= num_release:
+                return
+            in_use = []
+            for _ in range(num_release):
+                cur_id, cur_ep_obj = self.ep_objs.popitem(last=False)
+                if cur_ep_obj.dirty or not cur_ep_obj.lock.acquire(False):
+                    # keep objects that are in use
+                    in_use.append((cur_id, cur_ep_obj))
+                    continue
+                try:
+                    cur_ep_obj.show_obj.release_episode(cur_ep_obj)
+                finally:
+                    cur_ep_obj.lock.release()
+            self.ep_objs.update(in_use)
+
+    def remove(self, ep_obj):
+        # type: (TVEpisode) -> None
+        with self.lock:
+            self.ep_objs.pop(id(ep_obj), None)
+
+    def __len__(self):
+        return len(self.ep_objs)
+
+
+episode_cache = TVEpisodeCache()
+
+
 class TVShow(TVShowBase):
     __slots__ = (
         'path',
@@ -1347,16 +1418,19 @@ class TVShow(TVShowBase):
         # noinspection PyTypeChecker
         self.release_groups = None  # type: AniGroupList
         self.sxe_ep_obj = {}  # type: Dict
+        # episode objects released by episode_cache that may still be referenced elsewhere
+        self.released_ep_obj = weakref.WeakValueDictionary()  # type: weakref.WeakValueDictionary
 
         self.load_from_db(show_result=show_result, imdb_info_result=imdb_info_result)
 
     def _get_end_episode(self, last=False, exclude_specials=False):
         # type: (bool, bool) -> Optional[TVEpisode]
-        eps = self.get_all_episodes()
-        if eps:
-            ed = datetime.date(1900, 1, 1)
-            return next(iter(sorted((ep for ep in eps if ep.airdate > ed and (not exclude_specials or ep.season != 0)),
-                                    key=lambda a: a.airdate, reverse=last)), None)
+        ed = datetime.date(1900, 1, 1)
+        ep_record = next(iter(sorted((
+            rec for rec in self.get_episode_records() if rec.airdate > ed and (not exclude_specials or rec.season != 0)),
+            key=lambda a: a.airdate, reverse=last)), None)
+        if ep_record:
+            return ep_record.get_episode()
 
     @property
     def first_aired_episode(self):
@@ -1543,6 +1617,7 @@ class TVShow(TVShowBase):
                          dict(fail_count=v, last_check=last_check, last_success=self._last_found_on_indexer),
                          dict(indexer=self.tvid, indexer_id=self.prodid))
             self._not_found_count = v
+            page_cache.invalidate(self.tvid_prodid)
 
     @property
     def last_found_on_indexer(self):
@@ -1613,6 +1688,8 @@ class TVShow(TVShowBase):
                         not isinstance(v.get('date'), datetime.date):
                     return
             self.internal_ids = value
+            if sickgear.showDict.get(self.sid_int) is self:
+                helpers.index_show_mapped_ids(self)
 
     @property
     def is_anime(self):
@@ -1661,7 +1738,47 @@ class TVShow(TVShowBase):
                 # noinspection PyUnusedLocal
                 ep_obj = self.sxe_ep_obj[cur_season_number][cur_ep_number]
                 self.sxe_ep_obj[cur_season_number][cur_ep_number] = None
+                if None is not ep_obj:
+                    episode_cache.remove(ep_obj)
                 del ep_obj
+        self.released_ep_obj.clear()
+
+    def get_episode_records(self, season=None, has_location=False):
+        # type: (Optional[integer_types], bool) -> List[TVEpisodeRecord]
+        """
+        get compact episode data without creating TVEpisode objects
+
+        :param season: None or season number
+        :param has_location: return only with location
+        :return: List of TVEpisodeRecord objects ordered by season, episode
+        """
+        sql_selection = 'SELECT season, episode, status, airdate, location' \
+                        ' FROM tv_episodes WHERE indexer = ? AND showid = ?'
+        sql_parameter = [self.tvid, self.prodid]
+
+        if None is not season:
+            sql_selection += ' AND season = ?'
+            sql_parameter += [season]
+
+        if has_location:
+            sql_selection += ' AND location != "" '
+
+        sql_selection += ' ORDER BY season ASC, episode ASC'
+
+        my_db = db.DBConnection()
+        return [TVEpisodeRecord(self, cur_row) for cur_row in my_db.select(sql_selection, sql_parameter)]
+
+    def release_episode(self, ep_obj):
+        # type: (TVEpisode) -> None
+        """
+        drop the reference to an episode object, it is reused by get_episode while it is referenced elsewhere
+
+        :param ep_obj: episode object
+        """
+        season, episode = ep_obj.season, ep_obj.episode
+        if ep_obj is self.sxe_ep_obj.get(season, {}).get(episode):
+            self.released_ep_obj[(season, episode)] = ep_obj
+            self.sxe_ep_obj[season][episode] = None
 
     def get_all_episodes(self, season=None, has_location=False, check_related_eps=True):
         # type: (Optional[integer_types], bool, bool) -> List[TVEpisode]
@@ -1672,19 +1789,7 @@ class TVShow(TVShowBase):
         :param check_related_eps: get related episodes
         :return: List of TVEpisode objects
         """
-        sql_selection = 'SELECT *'
-
-        if check_related_eps:
-            # subselection to detect multi-episodes early, share_location > 0
-            sql_selection += """
-            , (SELECT COUNT (*)
-               FROM tv_episodes
-               WHERE showid = tve.showid AND indexer = tve.indexer AND season = tve.season AND location != ''
-               AND location = tve.location AND episode != tve.episode
-            ) AS share_location
-            """
-
-        sql_selection += ' FROM tv_episodes tve WHERE indexer = ? AND showid = ?'
+        sql_selection = 'SELECT * FROM tv_episodes WHERE indexer = ? AND showid = ?'
         sql_parameter = [self.tvid, self.prodid]
 
         if None is not season:
@@ -1701,30 +1806,22 @@ class TVShow(TVShowBase):
         sql_result = my_db.select(sql_selection, sql_parameter)
 
         ep_obj_list = []
+        # episodes of a season that share a location are a multi-episode, grouped in episode order
+        location_ep_obj = {}  # type: Dict[Tuple[int, AnyStr], List[TVEpisode]]
         for cur_row in sql_result:
             ep_obj = self.get_episode(int(cur_row['season']), int(cur_row['episode']), ep_result=[cur_row])
             if ep_obj:
                 ep_obj.related_ep_obj = []
-                if check_related_eps and ep_obj.location:
-                    # if there is a location, check if it's a multi-episode (share_location > 0)
-                    # and put into related_ep_obj
-                    if 0 < cur_row['share_location']:
-                        # noinspection SqlRedundantOrderingDirection
-                        related_ep_sql_result = my_db.select(
-                            """
-                            SELECT * 
-                            FROM tv_episodes
-                            WHERE indexer = ? AND showid = ? AND season = ? AND location = ? AND episode != ? 
-                            ORDER BY episode ASC
-                            """, [self.tvid, self.prodid, ep_obj.season, ep_obj.location, ep_obj.episode])
-                        for cur_ep_row in related_ep_sql_result:
-                            related_ep_obj = self.get_episode(int(cur_ep_row['season']),
-                                                              int(cur_ep_row['episode']),
-                                                              ep_result=[cur_ep_row])
-                            if related_ep_obj not in ep_obj.related_ep_obj:
-                                ep_obj.related_ep_obj.append(related_ep_obj)
+                if check_related_eps and cur_row['location']:
+                    location_ep_obj.setdefault((ep_obj.season, cur_row['location']), []).append(ep_obj)
                 ep_obj_list.append(ep_obj)
 
+        for cur_ep_obj_list in itervalues(location_ep_obj):
+            if 1 < len(cur_ep_obj_list):
+                for cur_ep_obj in cur_ep_obj_list:
+                    if cur_ep_obj.location:
+                        cur_ep_obj.related_ep_obj = [ep_obj for ep_obj in cur_ep_obj_list if ep_obj is not cur_ep_obj]
+
         return ep_obj_list
 
     def get_episode(self,
@@ -1775,22 +1872,28 @@ class TVShow(TVShowBase):
         if season not in self.sxe_ep_obj:
             self.sxe_ep_obj[season] = {}
 
-        if episode not in self.sxe_ep_obj[season] or None is self.sxe_ep_obj[season][episode]:
-            if no_create:
-                return
+        # read the entry once, as episode_cache may release it from another thread at any time
+        ep_obj = self.sxe_ep_obj[season].get(episode)
+        if None is ep_obj:
+            ep_obj = self.released_ep_obj.pop((season, episode), None)
+            if None is ep_obj:
+                if no_create:
+                    return
 
-            # logger.log('%s: An object for episode %sx%s did not exist in the cache, trying to create it' %
-            #            (self.tvid_prodid, season, episode), logger.DEBUG)
+                # logger.log('%s: An object for episode %sx%s did not exist in the cache, trying to create it' %
+                #            (self.tvid_prodid, season, episode), logger.DEBUG)
 
-            if path and not existing_only:
-                ep_obj = TVEpisode(self, season, episode, path, show_result=ep_result)
-            else:
-                ep_obj = TVEpisode(self, season, episode, show_result=ep_result, existing_only=existing_only)
+                if path and not existing_only:
+                    ep_obj = TVEpisode(self, season, episode, path, show_result=ep_result)
+                else:
+                    ep_obj = TVEpisode(self, season, episode, show_result=ep_result, existing_only=existing_only)
 
             if None is not ep_obj:
                 self.sxe_ep_obj[season][episode] = ep_obj
 
-        return self.sxe_ep_obj[season][episode]
+        if None is not ep_obj:
+            episode_cache.touch(ep_obj)
+        return ep_obj
 
     def _load_cast_from_db(self):
         # type: (...) -> List[Character]
@@ -2047,6 +2150,40 @@ class TVShow(TVShowBase):
         # update shows without an airdate for the last episode for update_days_limit days every 7 days
         return last_airdate_unknown and airdate_diff <= ended_limit and last_update_diff >= datetime.timedelta(days=7)
 
+    def is_src_unchanged(self, last_indexer_change=None):
+        # type: (integer_types) -> bool
+        """
+        :param last_indexer_change: timestamp of the last change to show at the tv info source
+        :return: True if show data loaded from the tv info source is the last change
+        """
+        return bool(last_indexer_change and self._src_update_time and last_indexer_change <= self._src_update_time)
+
+    def get_dir_mtime(self):
+        # type: (...) -> Optional[float]
+        """
+        a new, removed, or renamed file in show dir or in one of its folders changes the returned time
+        :return: latest modified time of show dir and its folders, None if show dir is not found
+        """
+        try:
+            dir_mtime = ek.ek(os.path.getmtime, self._location)
+            for cur_entry in ek.ek(scandir, self._location):
+                if cur_entry.is_dir():
+                    dir_mtime = max(dir_mtime, cur_entry.stat().st_mtime)
+            return dir_mtime
+        except (BaseException, Exception):
+            pass
+
+    def save_dir_mtime(self, dir_mtime):
+        # type: (Optional[float]) -> None
+        """
+        :param dir_mtime: time from get_dir_mtime of show dir refreshed to the database
+        """
+        my_db = db.DBConnection('cache.db')
+        if None is dir_mtime:
+            my_db.action('DELETE FROM show_updates WHERE indexer = ? AND indexer_id = ?', [self.tvid, self.prodid])
+        else:
+            my_db.upsert('show_updates', dict(dir_mtime=dir_mtime), dict(indexer=self.tvid, indexer_id=self.prodid))
+
     def write_show_nfo(self, force=False):
         # type: (bool) -> bool
 
@@ -2301,6 +2438,36 @@ class TVShow(TVShowBase):
             VALUES (?,?,?,?,?,?,?)
             """, [old_tvid, old_prodid, self.tvid, self.prodid, season, episode, reason]]
 
+    def get_episodes_sql(self, ep_values, db_rows):
+        # type: (List[Tuple[int, int, Dict[AnyStr, Any]]], Dict[Tuple[int, int], Row]) -> List[Tuple[AnyStr, List]]
+        """
+        compare episode values with the database rows of show to get the queries for only new and changed episodes
+
+        :param ep_values: season, episode, and TVEpisode.get_db_values() of episodes to save
+        :param db_rows: tv_episodes rows of show by season, episode
+        :return: queries with a list of args each to use with executemany
+        """
+        if not ep_values:
+            return []
+
+        columns = sorted(ep_values[0][2])
+        get_columns = operator.itemgetter(*columns)
+        update_args, insert_args = [], []
+        for season, episode, values in ep_values:
+            cur_row = db_rows.get((season, episode))
+            new_values = get_columns(values)
+            if None is cur_row:
+                insert_args.append(new_values + (self.prodid, season, episode))
+            elif get_columns(cur_row) != new_values:
+                update_args.append(new_values + (cur_row['episode_id'],))
+
+        return [
+            ('UPDATE tv_episodes SET %s WHERE episode_id = ?' % ', '.join(['%s = ?' % cur_col for cur_col in columns]),
+             update_args),
+            ('INSERT OR IGNORE INTO tv_episodes (%s, showid, season, episode) VALUES (%s)' % (
+                ', '.join(columns), ', '.join(['?'] * (3 + len(columns)))),
+             insert_args)]
+
     def load_episodes_from_tvinfo(self, cache=True, update=False, tvinfo_data=None, switch=False, old_tvid=None,
                                   old_prodid=None):
         # type: (bool, bool, TVInfoShow, bool, int, integer_types) -> Optional[Dict[int, Dict[int, TVEpisode]]]
@@ -2350,15 +2517,18 @@ class TVShow(TVShowBase):
             FROM tv_episodes 
             WHERE indexer = ? AND showid = ?
             """, [self.tvid, self.prodid])
+        db_rows = dict([((int(cur_row['season']), int(cur_row['episode'])), cur_row) for cur_row in sql_result])
         sql_l = []
+        ep_values = []
         for season in show_obj:
             scanned_eps[season] = {}
             for episode in show_obj[season]:
                 # need some examples of wtf episode 0 means to decide if we want it or not
                 if 0 == episode:
                     continue
+                cur_row = db_rows.get((season, episode))
                 try:
-                    ep_obj = self.get_episode(season, episode, ep_result=sql_result)  # type: TVEpisode
+                    ep_obj = self.get_episode(season, episode, ep_result=cur_row and [cur_row])  # type: TVEpisode
                 except exceptions_helper.EpisodeNotFoundException:
                     logger.log('%s: %s object for %sx%s from [%s] is incomplete, skipping this episode' %
                                (self.tvid_prodid, sickgear.TVInfoAPI(self.tvid).name, season, episode, self._name))
@@ -2379,15 +2549,16 @@ class TVShow(TVShowBase):
                                             switch=switch, old_tvid=old_tvid, old_prodid=old_prodid,
                                             switch_list=sql_l)
 
-                    result = ep_obj.get_sql()
-                    if None is not result:
-                        sql_l.append(result)
+                    if ep_obj.dirty:
+                        ep_values.append((season, episode, ep_obj.get_db_values()))
+                        ep_obj.dirty = False
 
                 scanned_eps[season][episode] = True
 
-        if 0 < len(sql_l):
-            my_db = db.DBConnection()
-            my_db.mass_action(sql_l)
+        # write new and changed episodes in one transaction
+        my_db = db.DBConnection()
+        my_db.mass_action_many([(cur_query, [cur_args]) for cur_query, cur_args in sql_l]
+                               + self.get_episodes_sql(ep_values, db_rows))
 
         # Done updating save last update date
         self.last_update_indexer = datetime.date.today().toordinal()
@@ -3234,6 +3405,7 @@ class TVShow(TVShowBase):
         except (BaseException, Exception):
             pass
         sql_l = [['DELETE FROM tv_episodes WHERE indexer = ? AND showid = ?', [self.tvid, self.prodid]],
+                 ['DELETE FROM tv_show_stats WHERE indexer = ? AND showid = ?', [self.tvid, self.prodid]],
                  ['DELETE FROM tv_shows WHERE indexer = ? AND indexer_id = ?', [self.tvid, self.prodid]],
                  ['DELETE FROM imdb_info WHERE indexer = ? AND indexer_id = ?', [self.tvid, self.prodid]],
                  ['DELETE FROM xem_refresh WHERE indexer = ? AND indexer_id = ?', [self.tvid, self.prodid]],
@@ -3263,8 +3435,10 @@ class TVShow(TVShowBase):
             del sickgear.showDict[self.sid_int]
         except (BaseException, Exception):
             pass
+        helpers.unindex_show_mapped_ids(self.sid_int)
         sickgear.webserve.Home.make_showlist_unique_names()
         sickgear.MEMCACHE['history_tab'] = sickgear.webserve.History.menu_tab(sickgear.MEMCACHE['history_tab_limit'])
+        page_cache.invalidate()
 
         try:
             tvid_prodid = self.tvid_prodid
@@ -3328,6 +3502,9 @@ class TVShow(TVShowBase):
         if not ek.ek(os.path.isdir, self._location) and not sickgear.CREATE_MISSING_SHOW_DIRS:
             return False
 
+        # time of show dir before it is loaded, so that changes during the refresh are found by the next refresh
+        dir_mtime = self.get_dir_mtime()
+
         # load from dir
         self.load_episodes_from_dir()
 
@@ -3421,6 +3598,8 @@ class TVShow(TVShowBase):
             my_db = db.DBConnection()
             my_db.mass_action(sql_l)
 
+        self.save_dir_mtime(dir_mtime)
+
     def download_subtitles(self, force=False):
         # type: (bool) -> None
         """
@@ -3518,6 +3697,7 @@ class TVShow(TVShowBase):
                 pass
             self._cast_list = None
             self.sxe_ep_obj = {}
+            self.released_ep_obj.clear()
             self.ids[old_tvid]['status'] = MapStatus.NONE
             self.ids[self.tvid]['status'] = MapStatus.SOURCE
             self.ids[self.tvid]['id'] = self.prodid
@@ -3551,7 +3731,9 @@ class TVShow(TVShowBase):
                     del sickgear.showDict[old_sid_int]
                 except (BaseException, Exception):
                     pass
+                helpers.unindex_show_mapped_ids(old_sid_int)
                 sickgear.showDict[self.sid_int] = self
+            helpers.index_show_mapped_ids(self)
 
             self.save_to_db()
             if update_show:
@@ -3574,6 +3756,7 @@ class TVShow(TVShowBase):
             return
 
         logger.log('%s: Saving show info to database' % self.tvid_prodid, logger.DEBUG)
+        page_cache.invalidate(self.tvid_prodid)
 
         new_value_dict = dict(
             air_by_date=self._air_by_date,
@@ -3675,10 +3858,11 @@ class TVShow(TVShowBase):
 
         if not multi_ep:
             try:
-                wq = getattr(self.sxe_ep_obj.get(season, {}).get(episode, {}), 'wanted_quality', None)
+                ep_obj = self.sxe_ep_obj.get(season, {}).get(episode)
+                wq = getattr(ep_obj, 'wanted_quality', None)
                 if None is not wq:
                     if quality in wq:
-                        cur_status, cur_quality = Quality.splitCompositeStatus(self.sxe_ep_obj[season][episode].status)
+                        cur_status, cur_quality = Quality.splitCompositeStatus(ep_obj.status)
                         if cur_status in (WANTED, UNAIRED, SKIPPED, FAILED):
                             logger.log('Existing episode status is wanted/unaired/skipped/failed,'
                                        ' getting found episode', logger.DEBUG)
@@ -3781,10 +3965,12 @@ class TVShow(TVShowBase):
     def __getstate__(self):
         d = dict(self.__dict__)
         del d['lock']
+        d.pop('released_ep_obj', None)
         return d
 
     def __setstate__(self, d):
         d['lock'] = threading.RLock()
+        d['released_ep_obj'] = weakref.WeakValueDictionary()
         self.__dict__.update(d)
 
     def __bool__(self):
@@ -4666,6 +4852,8 @@ class TVEpisode(TVEpisodeBase):
         if self.show_obj.get_episode(self._season, self._episode, no_create=True) == self:
             logger.log('Removing myself from my show\'s list', logger.DEBUG)
             del self.show_obj.sxe_ep_obj[self._season][self._episode]
+        self.show_obj.released_ep_obj.pop((self._season, self._episode), None)
+        episode_cache.remove(self)
 
         # delete myself from the DB
         logger.log('Deleting myself from the database', logger.DEBUG)
@@ -4694,6 +4882,7 @@ class TVEpisode(TVEpisodeBase):
             return
 
         self.dirty = False
+        page_cache.invalidate(self._show_obj.tvid_prodid)
         return [
             """
             INSERT OR REPLACE INTO tv_episodes
@@ -4741,23 +4930,12 @@ class TVEpisode(TVEpisodeBase):
                   self._show_obj.tvid, self._show_obj.prodid, self._season, self._episode,
                   self._show_obj.tvid, self._show_obj.prodid, self._season, self._episode]]
 
-    def save_to_db(self, force_save=False):
+    def get_db_values(self):
+        # type: (...) -> Dict[AnyStr, Any]
         """
-        Saves this episode to the database if any of its data has been changed since the last save.
-
-        :param force_save: If True it will save to the database even if no data has been changed since the
-        last save (aka if the record is not dirty).
+        :return: tv_episodes column values of this episode, except showid, season, and episode
         """
-
-        if not self.dirty and not force_save:
-            logger.log('%s: Not saving episode to db - record is not dirty' % self._show_obj.tvid_prodid, logger.DEBUG)
-            return
-
-        logger.log('%s: Saving episode details to database' % self._show_obj.tvid_prodid, logger.DEBUG)
-
-        logger.log('STATUS IS %s' % statusStrings[self._status], logger.DEBUG)
-
-        new_value_dict = dict(
+        return dict(
             absolute_number=self._absolute_number,
             airdate=self._airdate.toordinal(),
             airtime=time_to_int(self._airtime),
@@ -4787,6 +4965,25 @@ class TVEpisode(TVEpisodeBase):
             version=self._version,
         )
 
+    def save_to_db(self, force_save=False):
+        """
+        Saves this episode to the database if any of its data has been changed since the last save.
+
+        :param force_save: If True it will save to the database even if no data has been changed since the
+        last save (aka if the record is not dirty).
+        """
+
+        if not self.dirty and not force_save:
+            logger.log('%s: Not saving episode to db - record is not dirty' % self._show_obj.tvid_prodid, logger.DEBUG)
+            return
+
+        logger.log('%s: Saving episode details to database' % self._show_obj.tvid_prodid, logger.DEBUG)
+        page_cache.invalidate(self._show_obj.tvid_prodid)
+
+        logger.log('STATUS IS %s' % statusStrings[self._status], logger.DEBUG)
+
+        new_value_dict = self.get_db_values()
+
         control_value_dict = dict(
             indexer=self.show_obj.tvid, showid=self.show_obj.prodid, season=self.season, episode=self.episode)
 
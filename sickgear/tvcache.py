@@ -17,7 +17,6 @@
 from __future__ import with_statement
 
 import datetime
-import itertools
 import time
 
 from exceptions_helper import AuthException, ex, MultipleShowObjectsException
@@ -31,11 +30,12 @@ from .sgdatetime import timestamp_near
 from .tv import TVEpisode
 
 from _23 import filter_list, map_iter
-from six import PY2, text_type
+from six import iteritems, itervalues, PY2, string_types, text_type
 
 # noinspection PyUnreachableCode
 if False:
-    from typing import Any, AnyStr, Dict, List, Tuple, Union
+    from typing import Any, AnyStr, Dict, List, Optional, Tuple, Union
+    from .tv import TVShow
 
 
 class CacheDBConnection(db.DBConnection):
@@ -116,12 +116,13 @@ class TVCache(object):
                 self._clearCache()
 
             # parse data
-            cl = []
+            entries = []
             for item in data or []:
                 title, url = self._title_and_url(item)
-                ci = self._parseItem(title, url)
-                if None is not ci:
-                    cl.append(ci)
+                entry = self._parseItem(title, url)
+                if None is not entry:
+                    entries.append(entry)
+            cl = self.add_cache_entries(entries)
 
             if 0 < len(cl):
                 my_db = self.get_db()
@@ -165,8 +166,8 @@ class TVCache(object):
         :type title: AnyStr
         :param url: url
         :type url: AnyStr
-        :return:
-        :rtype: None or List[AnyStr, List[Any]]
+        :return: name, url and tvid_prodid of the entry to add to cache by add_cache_entries
+        :rtype: None or Tuple[AnyStr, AnyStr, None]
         """
         self._checkItemAuth(title, url)
 
@@ -174,7 +175,7 @@ class TVCache(object):
             title = self._translateTitle(title)
             url = self._translateLinkURL(url)
 
-            return self.add_cache_entry(title, url)
+            return title, url, None
 
         logger.log('Data returned from the %s feed is incomplete, this result is unusable' % self.provider.name,
                    logger.DEBUG)
@@ -269,45 +270,18 @@ class TVCache(object):
                         url,  # type: AnyStr
                         parse_result=None,  # type: ParseResult
                         tvid_prodid=None  # type: Union[AnyStr, None]
-                        ):  # type: (...) -> Union[List[AnyStr, List[Any]], None]
+                        ):  # type: (...) -> Union[List[List[AnyStr, List[Any]]], None]
         """
 
         :param name: name
         :param url: url
         :param parse_result: parse result
         :param tvid_prodid: tvid_prodid
-        :return:
+        :return: sql statements to add the entry and its episodes to cache
         """
         # check if we passed in a parsed result or should we try and create one
         if not parse_result:
-
-            # create show_obj from tvid_prodid if available
-            show_obj = None
-            if tvid_prodid:
-                try:
-                    show_obj = helpers.find_show_by_id(tvid_prodid, no_mapped_ids=False, check_multishow=True)
-                except MultipleShowObjectsException:
-                    return
-
-            try:
-                parser = NameParser(show_obj=show_obj, convert=True, indexer_lookup=False)
-                parse_result = parser.parse(name)
-            except InvalidNameException:
-                logger.log('Unable to parse the filename %s into a valid episode' % name, logger.DEBUG)
-                return
-            except InvalidShowException:
-                return
-
-            if not parse_result or not parse_result.series_name:
-                return
-
-            if None is show_obj and parse_result.show_obj.is_anime:
-                t_show_obj = helpers.get_show(parse_result.show_obj.name, True)
-                post_parser = NameParser(False, show_obj=t_show_obj, convert=True, indexer_lookup=False)
-                try:
-                    parse_result = post_parser.parse(name, release_group=self.get_id())
-                except(BaseException, Exception):
-                    return
+            return self.add_cache_entries([(name, url, tvid_prodid)]) or None
 
         # if we made it this far then lets add the parsed result to cache for usage later on
         season_number = parse_result.season_number if parse_result.season_number else 1
@@ -332,19 +306,89 @@ class TVCache(object):
             # get version
             version = parse_result.version
 
+            # get proper level, stored so that cache hits do not need to parse the name again
+            extra_info_no_name = parse_result.extra_info_no_name()
+            is_repack, proper_level = Quality.get_proper_level(extra_info_no_name, version, parse_result.is_anime,
+                                                               check_is_repack=True)
+
             logger.log('Add to cache: [%s]' % name, logger.DEBUG)
 
             return [
-                'INSERT OR IGNORE INTO provider_cache'
-                ' (provider, name, season, episodes,'
-                ' indexerid,'
-                ' url, time, quality, release_group, version,'
-                ' indexer)'
-                ' VALUES (?,?,?,?,?,?,?,?,?,?,?)',
-                [self.providerID, name, season_number, episode_text,
-                 parse_result.show_obj.prodid,
-                 url, cur_timestamp, quality, release_group, version,
-                 parse_result.show_obj.tvid]]
+                ['INSERT OR IGNORE INTO provider_cache'
+                 ' (provider, name, season, episodes,'
+                 ' indexerid,'
+                 ' url, time, quality, release_group, version,'
+                 ' indexer, extra_info, is_repack, proper_level)'
+                 ' VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)',
+                 [self.providerID, name, season_number, episode_text,
+                  parse_result.show_obj.prodid,
+                  url, cur_timestamp, quality, release_group, version,
+                  parse_result.show_obj.tvid, extra_info_no_name, int(is_repack), proper_level]],
+                # index each episode of the entry, the cache row is used for values to keep both tables consistent
+                ['INSERT OR IGNORE INTO provider_cache_episodes'
+                 ' (provider, indexer, indexerid, season, episode, url)'
+                 ' SELECT provider, indexer, indexerid, season, ep.episode, url'
+                 ' FROM provider_cache, (%s) ep WHERE url = ?'
+                 % ' UNION ALL '.join(['SELECT ? AS episode'] * len(episode_numbers)),
+                 list(episode_numbers) + [url]]]
+
+    def add_cache_entries(self,
+                          entries  # type: List[Tuple[AnyStr, AnyStr, Union[AnyStr, Dict, None]]]
+                          ):  # type: (...) -> List[List[AnyStr, List[Any]]]
+        """
+        parse a batch of entries, e.g. all items of a feed, and get the sql to add them to cache
+
+        entries are parsed with one parser per show, so that show lookups and scene exception
+        resolution are shared by all names in a feed
+
+        :param entries: name, url and tvid_prodid of each entry
+        :return: sql statements to add the entries and their episodes to cache
+        """
+        # group entries by the show_obj created from tvid_prodid if available
+        groups = {}  # type: Dict[Any, Tuple[Optional[TVShow], List[Tuple[AnyStr, AnyStr]]]]
+        shows_by_id = {}
+        for name, url, tvid_prodid in entries:
+            show_obj = None
+            if tvid_prodid:
+                id_key = tvid_prodid if isinstance(tvid_prodid, string_types) \
+                    else tuple(sorted(iteritems(tvid_prodid)))
+                if id_key not in shows_by_id:
+                    try:
+                        shows_by_id[id_key] = helpers.find_show_by_id(
+                            tvid_prodid, no_mapped_ids=False, check_multishow=True)
+                    except MultipleShowObjectsException:
+                        shows_by_id[id_key] = False
+                show_obj = shows_by_id[id_key]
+                if False is show_obj:
+                    continue
+            groups.setdefault(getattr(show_obj, 'tvid_prodid', None), (show_obj, []))[1].append((name, url))
+
+        cl = []
+        post_parsers = {}
+        for show_obj, group in itervalues(groups):
+            parser = NameParser(show_obj=show_obj, convert=True, indexer_lookup=False)
+            for (name, url), parse_result in zip(group, parser.parse_many([name for name, _ in group])):
+                if isinstance(parse_result, InvalidNameException):
+                    logger.log('Unable to parse the filename %s into a valid episode' % name, logger.DEBUG)
+                    continue
+                if isinstance(parse_result, InvalidShowException) or not parse_result.series_name:
+                    continue
+
+                if None is show_obj and parse_result.show_obj.is_anime:
+                    show_name = parse_result.show_obj.name
+                    if show_name not in post_parsers:
+                        post_parsers[show_name] = NameParser(False, show_obj=helpers.get_show(show_name, True),
+                                                             convert=True, indexer_lookup=False)
+                    try:
+                        parse_result = post_parsers[show_name].parse(name, release_group=self.providerID)
+                    except (BaseException, Exception):
+                        continue
+
+                ci = self.add_cache_entry(name, url, parse_result=parse_result)
+                if None is not ci:
+                    cl.extend(ci)
+
+        return cl
 
     def searchCache(self,
                     episode,  # type: TVEpisode
@@ -378,6 +422,59 @@ class TVCache(object):
 
         return filter_list(lambda x: x['indexerid'] != 0, my_db.select(sql, [self.providerID]))
 
+    def _select_needed(self, my_db, ep_obj_list):
+        # type: (db.DBConnection, List[TVEpisode]) -> List
+        """
+        select cache entries of this provider for all episodes with one query per batch of seasons
+
+        :param my_db: db connection
+        :param ep_obj_list: list of episode objects
+        :return: cache rows with a wanted quality for at least one of the episodes
+        """
+        wanted_quality = {}
+        seasons = {}
+        for ep_obj in ep_obj_list:
+            season_key = (ep_obj.show_obj.tvid, ep_obj.show_obj.prodid, ep_obj.season)
+            wanted_quality[season_key + (ep_obj.episode,)] = set(ep_obj.wanted_quality)
+            seasons.setdefault(season_key, set()).add(ep_obj.episode)
+
+        # keep within the max number of sql variables (999) supported by older sqlite versions,
+        # a season with more episodes than fit in a batch is split over batches
+        max_params = 900
+        batches = []
+        where, params = [], [self.providerID]
+        for (tvid, prodid, season), episodes in iteritems(seasons):
+            episodes = sorted(episodes)
+            while episodes:
+                if max_params < len(params) + 4:
+                    batches.append((where, params))
+                    where, params = [], [self.providerID]
+                num_episodes = max_params - len(params) - 3
+                cur_episodes, episodes = episodes[:num_episodes], episodes[num_episodes:]
+                where.append('(pce.indexer = ? AND pce.indexerid = ? AND pce.season = ? AND pce.episode IN (%s))'
+                             % ','.join(['?'] * len(cur_episodes)))
+                params += [tvid, prodid, season] + cur_episodes
+        if where:
+            batches.append((where, params))
+
+        sql_result = []
+        urls = set()
+        for where, params in batches:
+            for cur_result in my_db.select(
+                    'SELECT pce.episode AS needed_episode, pc.*'
+                    ' FROM provider_cache_episodes pce'
+                    ' INNER JOIN provider_cache pc ON pc.url = pce.url'
+                    ' WHERE pce.provider = ? AND (%s)' % ' OR '.join(where), params):
+                if cur_result['url'] in urls \
+                        or int(cur_result['quality']) not in wanted_quality.get(
+                            (int(cur_result['indexer']), int(cur_result['indexerid']),
+                             int(cur_result['season']), int(cur_result['needed_episode'])), ()):
+                    continue
+                urls.add(cur_result['url'])
+                sql_result.append(cur_result)
+
+        return sql_result
+
     def findNeededEpisodes(self, ep_obj_list, manual_search=False):
         # type: (Union[TVEpisode, List[TVEpisode]], bool) -> Dict[TVEpisode, SearchResult]
         """
@@ -386,26 +483,12 @@ class TVCache(object):
         :param manual_search: manual search
         """
         neededEps = {}
-        cl = []
 
         my_db = self.get_db()
         if type(ep_obj_list) != list:
             ep_obj_list = [ep_obj_list]
 
-        for ep_obj in ep_obj_list:
-            cl.append([
-                'SELECT *'
-                + ' FROM provider_cache'
-                + ' WHERE provider = ?'
-                + ' AND indexer = ? AND indexerid = ?'
-                + ' AND season = ? AND episodes LIKE ?'
-                + ' AND quality IN (%s)' % ','.join([str(x) for x in ep_obj.wanted_quality]),
-                [self.providerID,
-                 ep_obj.show_obj.tvid, ep_obj.show_obj.prodid,
-                 ep_obj.season, '%|' + str(ep_obj.episode) + '|%']])
-        sql_result = my_db.mass_action(cl)
-        if sql_result:
-            sql_result = list(itertools.chain(*sql_result))
+        sql_result = self._select_needed(my_db, ep_obj_list)
 
         if not sql_result:
             self.setLastSearch()
@@ -465,18 +548,22 @@ class TVCache(object):
             result.release_group = release_group
             result.version = version
             result.content = None
-            np = NameParser(False, show_obj=show_obj)
-            try:
-                parsed_result = np.parse(title)
-                extra_info_no_name = parsed_result.extra_info_no_name()
-                version = parsed_result.version
-                is_anime = parsed_result.is_anime
-            except (BaseException, Exception):
-                extra_info_no_name = None
-                version = -1
-                is_anime = False
-            result.is_repack, result.properlevel = Quality.get_proper_level(extra_info_no_name, version, is_anime,
-                                                                            check_is_repack=True)
+            if None is not cur_result['proper_level']:
+                result.is_repack, result.properlevel = bool(cur_result['is_repack']), int(cur_result['proper_level'])
+            else:
+                # entry was cached before proper level was stored
+                np = NameParser(False, show_obj=show_obj)
+                try:
+                    parsed_result = np.parse(title)
+                    extra_info_no_name = parsed_result.extra_info_no_name()
+                    version = parsed_result.version
+                    is_anime = parsed_result.is_anime
+                except (BaseException, Exception):
+                    extra_info_no_name = None
+                    version = -1
+                    is_anime = False
+                result.is_repack, result.properlevel = Quality.get_proper_level(extra_info_no_name, version, is_anime,
+                                                                                check_is_repack=True)
 
             # add it to the list
             if ep_obj not in neededEps:
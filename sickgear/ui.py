@@ -164,8 +164,8 @@ class QueueProgressIndicator(object):
         return len([x for x in self.queueItemList if x.isInQueue()])
 
     def nextName(self):
-        for curItem in [
-                           sickgear.show_queue_scheduler.action.currentItem] + sickgear.show_queue_scheduler.action.queue:
+        for curItem in sickgear.show_queue_scheduler.action.current_items + \
+                sickgear.show_queue_scheduler.action.queue:
             if curItem in self.queueItemList:
                 return curItem.name
 
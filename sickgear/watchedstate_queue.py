@@ -31,7 +31,7 @@ class WatchedStateQueue(generic_queue.GenericQueue):
 
     def is_in_queue(self, itemtype):
         with self.lock:
-            for cur_item in self.queue + [self.currentItem]:
+            for cur_item in self.queue + self._get_current_items():
                 if isinstance(cur_item, itemtype):
                     return True
             return False
@@ -40,7 +40,7 @@ class WatchedStateQueue(generic_queue.GenericQueue):
     def queue_length(self):
         length = {'emby': 0, 'plex': 0}
         with self.lock:
-            for cur_item in [self.currentItem] + self.queue:
+            for cur_item in self._get_current_items() + self.queue:
                 if isinstance(cur_item, EmbyWatchedStateQueueItem):
                     length['emby'] += 1
                 elif isinstance(cur_item, PlexWatchedStateQueueItem):
@@ -19,7 +19,6 @@
 from __future__ import with_statement
 
 # noinspection PyProtectedMember
-from mimetypes import MimeTypes
 from random import randint
 
 import datetime
@@ -41,10 +40,11 @@ from tornado.concurrent import run_on_executor
 from lib import subliminal
 
 import sickgear
-from . import classes, db, helpers, history, image_cache, logger, network_timezones, processTV, search_queue, ui
+from . import classes, db, helpers, history, image_cache, logger, network_timezones, processTV, search_queue, \
+    show_stats, ui
 from .common import ARCHIVED, DOWNLOADED, FAILED, IGNORED, SKIPPED, SNATCHED, SNATCHED_ANY, SNATCHED_BEST, \
     SNATCHED_PROPER, UNAIRED, UNKNOWN, WANTED, Quality, qualityPresetStrings, statusStrings
-from .name_parser.parser import NameParser
+from .name_parser.parser import name_parser_cache, NameParser
 from .helpers import starify
 from .indexers import indexer_api, indexer_config
 from .indexers.indexer_config import *
@@ -247,7 +247,11 @@ class Api(webserve.BaseHandler):
             outputCallback = outputCallbackDict[outDict['outputType']]
         else:
             outputCallback = outputCallbackDict['default']
-        self.finish(outputCallback(outDict))
+        result = outputCallback(outDict)
+        if isinstance(result, webserve.ImageFile):
+            yield self.send_file(result.path)
+            result = None
+        self.finish(result)
 
     @run_on_executor
     def async_call(self, function, ag):
@@ -2209,6 +2213,34 @@ class CMD_SickGearSearchQueue(ApiCall):
         return _responds(RESULT_SUCCESS, sickgear.search_queue_scheduler.action.queue_length())
 
 
+class CMD_SickGearDbStats(ApiCall):
+    _help = {'desc': 'get counters of the database connection pool'}
+
+    def __init__(self, handler, args, kwargs):
+        # required
+        # optional
+        # super, missing, help
+        ApiCall.__init__(self, handler, args, kwargs)
+
+    def run(self):
+        """ get counters of the database connection pool """
+        return _responds(RESULT_SUCCESS, db.connection_stats())
+
+
+class CMD_SickGearNameParserStats(ApiCall):
+    _help = {'desc': 'get counters of the name parser cache'}
+
+    def __init__(self, handler, args, kwargs):
+        # required
+        # optional
+        # super, missing, help
+        ApiCall.__init__(self, handler, args, kwargs)
+
+    def run(self):
+        """ get counters of the name parser cache """
+        return _responds(RESULT_SUCCESS, name_parser_cache.stats())
+
+
 class CMD_SickGearGetDefaults(ApiCall):
     _help = {"desc": "get various sickgear default system values"}
 
@@ -3934,11 +3966,8 @@ class CMD_SickGearShowGetFanart(ApiCall):
                     used_fanart = fanartsorted[random_fanart][1]
 
         if fanartfile and ek.ek(os.path.isfile, fanartfile):
-            with ek.ek(open, fanartfile, 'rb') as f:
-                mime_type, encoding = MimeTypes().guess_type(fanartfile)
-                self.handler.set_header('X-Fanartname', used_fanart)
-                self.handler.set_header('Content-Type', mime_type)
-                return {'outputType': 'image', 'image': f.read()}
+            self.handler.set_header('X-Fanartname', used_fanart)
+            return {'outputType': 'image', 'image': self.handler.image_file(fanartfile)}
 
         # we should never get here
         return _responds(RESULT_FAILURE, msg='No Fanart found')
@@ -4486,6 +4515,8 @@ class CMD_SickGearShows(ApiCall):
     def run(self):
         """ display_is_int_multi( self.prodid ) shows in sickgear """
         shows = {}
+        all_stats = show_stats.get_show_stats()
+        today = datetime.date.today().toordinal()
 
         for cur_show_obj in sickgear.showList:
 
@@ -4545,9 +4576,11 @@ class CMD_SickGearShows(ApiCall):
             timezone, showDict['timezone'] = network_timezones.get_network_timezone(showDict['network'],
                                                                                     return_name=True)
 
-            if cur_show_obj.next_episode():
+            cur_stats = all_stats.get((cur_show_obj.tvid, cur_show_obj.prodid))
+            next_airdate = cur_stats and cur_stats.next_airdate((UNAIRED, WANTED, FAILED), today)
+            if next_airdate:
                 dtEpisodeAirs = SGDatetime.convert_to_setting(
-                    network_timezones.parse_date_time(cur_show_obj.nextaired, cur_show_obj.airs, timezone))
+                    network_timezones.parse_date_time(next_airdate, cur_show_obj.airs, timezone))
                 showDict['next_ep_airdate'] = SGDatetime.sbfdate(dtEpisodeAirs, d_preset=dateFormat)
             else:
                 showDict['next_ep_airdate'] = ''
@@ -4692,9 +4725,7 @@ class CMD_SickGearShowsStats(ApiCall):
         """ get the global shows and episode stats """
         stats = {}
 
-        indexer_limit = ('', ' AND indexer = %s' % TVINFO_TVDB)[self.sickbeard_call]
-        my_db = db.DBConnection()
-        today = str(datetime.date.today().toordinal())
+        today = datetime.date.today().toordinal()
 
         stats["shows_total"] = (len(sickgear.showList),
                                 len([cur_so for cur_so in sickgear.showList
@@ -4706,15 +4737,15 @@ class CMD_SickGearShowsStats(ApiCall):
              and (not self.sickbeard_call
                   or TVINFO_TVDB == cur_so.tvid)])
 
-        stats["ep_downloaded"] = my_db.select("SELECT COUNT(*) FROM tv_episodes WHERE status IN (" + ",".join(
-            [str(status) for status in
-             Quality.DOWNLOADED + Quality.ARCHIVED]) + ") AND season != 0 and episode != 0 AND airdate <= " + today +
-                                             indexer_limit)[0][0]
+        all_stats = [cur_stats for (cur_tvid, _), cur_stats in iteritems(show_stats.get_show_stats())
+                     if not self.sickbeard_call or TVINFO_TVDB == cur_tvid]
+
+        stats["ep_downloaded"] = show_stats.sum_count(all_stats, groups=('downloaded',), until=today)
 
-        stats["ep_total"] = my_db.select(
-            "SELECT COUNT(*) FROM tv_episodes WHERE season != 0 AND episode != 0 AND (airdate != 1 OR status IN (" +
-            ",".join([str(status) for status in Quality.SNATCHED_ANY + Quality.DOWNLOADED + Quality.ARCHIVED]) +
-            ")) AND airdate <= " + today + " AND status != " + str(IGNORED) + indexer_limit)[0][0]
+        # episodes without airdate are only counted if snatched or downloaded
+        stats["ep_total"] = show_stats.sum_count(all_stats, groups=('snatched', 'downloaded'), until=1) \
+            + show_stats.sum_count(all_stats, after=1, until=today) \
+            - show_stats.sum_count(all_stats, groups=(IGNORED,), after=1, until=today)
 
         return _responds(RESULT_SUCCESS, stats)
 
@@ -4776,6 +4807,8 @@ _functionMaper = {"help": CMD_Help,
                   "sb.forcesearch": CMD_SickBeardForceSearch,
                   "sg.forcesearch": CMD_SickGearForceSearch,
                   "sg.searchqueue": CMD_SickGearSearchQueue,
+                  "sg.dbstats": CMD_SickGearDbStats,
+                  "sg.nameparserstats": CMD_SickGearNameParserStats,
                   "sb.getdefaults": CMD_SickBeardGetDefaults,
                   "sg.getdefaults": CMD_SickGearGetDefaults,
                   "sb.getmessages": CMD_SickBeardGetMessages,
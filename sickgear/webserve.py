@@ -23,6 +23,7 @@ from mimetypes import MimeTypes
 import base64
 import copy
 import datetime
+import email.utils
 import glob
 import hashlib
 import io
@@ -45,7 +46,8 @@ from sg_helpers import remove_file, scantree, is_virtualenv
 
 import sickgear
 from . import classes, clients, config, db, helpers, history, image_cache, logger, name_cache, naming, \
-    network_timezones, notifiers, nzbget, processTV, sab, scene_exceptions, search_queue, subtitles, ui
+    network_timezones, notifiers, nzbget, page_cache, processTV, sab, scene_exceptions, search_queue, show_stats, \
+    subtitles, ui
 from .anime import AniGroupList, pull_anidb_groups, short_group_names
 from .browser import folders_at_path
 from .common import ARCHIVED, DOWNLOADED, FAILED, IGNORED, SKIPPED, SNATCHED, SNATCHED_ANY, UNAIRED, UNKNOWN, WANTED, \
@@ -122,10 +124,7 @@ class PageTemplate(Template):
 
         self.log_num_errors = len(classes.ErrorViewer.errors)
         if None is not sickgear.showList:
-            self.log_num_not_found_shows = len([cur_so for cur_so in sickgear.showList
-                                                if 0 < cur_so.not_found_count])
-            self.log_num_not_found_shows_all = len([cur_so for cur_so in sickgear.showList
-                                                    if 0 != cur_so.not_found_count])
+            self.log_num_not_found_shows, self.log_num_not_found_shows_all = page_cache.get_header_counts()
         self.sbPID = str(sickgear.PID)
         self.menu = [
             {'title': 'Home', 'key': 'home'},
@@ -143,8 +142,36 @@ class PageTemplate(Template):
             self.history_compact = sickgear.MEMCACHE.get('history_tab')
             self.tvinfo_switch_running = sickgear.show_queue_scheduler.action.is_switch_running()
 
+        self.page_uri = web_handler.request.uri
+        self.page_key = self.page_stamp = None
+
         super(PageTemplate, self).__init__(*args, **kwargs)
 
+    def get_cached_page(self, tvid_prodid=None):
+        # type: (Optional[AnyStr]) -> Optional[AnyStr]
+        """
+        get a page rendered for the same request and header, to return instead of rendering the page again
+
+        :param tvid_prodid: show id of a page that shows a single show, None for any other page
+        :return: cached page, or None when the page is to be rendered and given to cache_page
+        """
+        self.page_key = (self.page_uri, self.sbHost, self.sbHttpsPort, self.sbHttpsEnabled, self.sbThemeName,
+                         self.log_num_errors, getattr(self, 'log_num_not_found_shows', 0),
+                         getattr(self, 'log_num_not_found_shows_all', 0), self.addtab_limit,
+                         str(getattr(self, 'history_compact', None)), getattr(self, 'tvinfo_switch_running', None))
+        self.page_stamp = page_cache.stamp(tvid_prodid)
+        return page_cache.get(self.page_key, tvid_prodid)
+
+    def cache_page(self, page):
+        # type: (AnyStr) -> AnyStr
+        """
+        :param page: page rendered after get_cached_page
+        :return: page
+        """
+        if None is not self.page_key:
+            page_cache.add(self.page_key, self.page_stamp, page)
+        return page
+
     def compile(self, *args, **kwargs):
         if not os.path.exists(os.path.join(sickgear.CACHE_DIR, 'cheetah')):
             os.mkdir(os.path.join(sickgear.CACHE_DIR, 'cheetah'))
@@ -154,6 +181,30 @@ class PageTemplate(Template):
         return super(PageTemplate, self).compile(*args, **kwargs)
 
 
+class ImageFile(object):
+    """
+    an image file that a handler sends in chunks once the method that found the file returns
+    """
+    __slots__ = ('path',)
+
+    def __init__(self, path):
+        # type: (AnyStr) -> None
+        self.path = path
+
+
+def image_etag(image_file, stat=None):
+    # type: (AnyStr, Optional[os.stat_result]) -> AnyStr
+    """
+    get an etag from the file size and time, that changes with any new image saved to the file
+
+    :param image_file: file path
+    :param stat: file stat if already known
+    :return: etag value including quotes
+    """
+    stat = stat or ek.ek(os.stat, image_file)
+    return '"%x-%x"' % (stat.st_size, int(stat.st_mtime * 1000000))
+
+
 class BaseStaticFileHandler(StaticFileHandler):
 
     def write_error(self, status_code, **kwargs):
@@ -182,9 +233,14 @@ class BaseStaticFileHandler(StaticFileHandler):
 
     def set_extra_headers(self, path):
         self.set_header('X-Robots-Tag', 'noindex, nofollow, noarchive, nocache, noodp, noydir, noimageindex, nosnippet')
-        self.set_header('Cache-Control', 'no-cache, max-age=0')
-        self.set_header('Pragma', 'no-cache')
-        self.set_header('Expires', '0')
+        if 'v' in self.request.arguments:
+            # a versioned url is never used for another version of a file
+            self.set_header('Cache-Control', 'max-age=%s, immutable' % self.CACHE_MAX_AGE)
+            self.clear_header('Pragma')
+        else:
+            self.set_header('Cache-Control', 'no-cache, max-age=0')
+            self.set_header('Pragma', 'no-cache')
+            self.set_header('Expires', '0')
         if sickgear.SEND_SECURITY_HEADERS:
             self.set_header('X-Frame-Options', 'SAMEORIGIN')
 
@@ -244,8 +300,42 @@ class RouteHandler(LegacyBaseHandler):
             else:
                 filter_kwargs = dict(filter_iter(lambda kv: kv[0] in method_args, iteritems(request_kwargs)))
                 result = yield self.async_call(method, filter_kwargs)  # method(**filter_kwargs)
+            if isinstance(result, ImageFile):
+                yield self.send_file(result.path)
+                result = None
             self.finish(result)
 
+    @gen.coroutine
+    def send_file(self, path):
+        """
+        write a file in chunks instead of reading the whole file into memory, chunks are read on the executor
+
+        :param path: file path
+        """
+        file_obj = yield self.read_file(None, path)
+        try:
+            while True:
+                chunk = yield self.read_file(file_obj)
+                if not chunk:
+                    break
+                self.write(chunk)
+                yield self.flush()
+        except iostream.StreamClosedError:
+            pass
+        finally:
+            file_obj.close()
+
+    @run_on_executor
+    def read_file(self, file_obj, path=None):
+        """
+        :param file_obj: open file to read the next chunk from, or None to open path
+        :param path: file path to open
+        :return: next chunk of data, empty at the end of the file, or the opened file
+        """
+        if None is file_obj:
+            return ek.ek(io.open, path, 'rb')
+        return file_obj.read(65536)
+
     @run_on_executor
     def async_call(self, function, kw):
         try:
@@ -280,14 +370,64 @@ class BaseHandler(RouteHandler):
             return self.get_secure_cookie('sickgear-session-%s' % helpers.md5_for_text(sickgear.WEB_PORT))
         return True
 
+    def image_file(self, image_file):
+        # type: (AnyStr) -> Optional[ImageFile]
+        """
+        set headers to send an image file, with validators for a browser to use its copy if the image is unchanged,
+        a request url with a `v` version arg is never used for another image and so is cached as immutable
+
+        :param image_file: file path
+        :return: image file to send, or None if a 304 not modified response is set
+        """
+        stat = ek.ek(os.stat, image_file)
+        etag = image_etag(image_file, stat)
+        modified = SGDatetime.from_timestamp(int(stat.st_mtime), local_time=False)
+        mime_type, encoding = MimeTypes().guess_type(image_file)
+        if not mime_type and image_file.endswith('.webp'):
+            # not known to older mime type lists
+            mime_type = 'image/webp'
+        self.set_header('Content-Type', mime_type)
+        self.set_header('Etag', etag)
+        self.set_header('Last-Modified', modified)
+        if 'v' in self.request.arguments:
+            self.set_header('Cache-Control', 'private, max-age=31536000, immutable')
+        else:
+            self.set_header('Cache-Control', 'private, no-cache')
+        self.clear_header('Pragma')
+        self.clear_header('Expires')
+
+        if self.request.headers.get('If-None-Match'):
+            not_modified = self.check_etag_header()
+        else:
+            not_modified = False
+            date_tuple = email.utils.parsedate(self.request.headers.get('If-Modified-Since') or '')
+            if None is not date_tuple:
+                not_modified = datetime.datetime(*date_tuple[:6]) >= modified
+        if not_modified:
+            self.set_status(304)
+            return
+
+        self.set_header('Content-Length', stat.st_size)
+        return ImageFile(image_file)
+
     def get_image(self, image):
         if ek.ek(os.path.isfile, image):
-            mime_type, encoding = MimeTypes().guess_type(image)
-            self.set_header('Content-Type', mime_type)
-            with ek.ek(open, image, 'rb') as img:
-                return img.read()
+            return self.image_file(image)
 
-    def show_poster(self, tvid_prodid=None, which=None, api=None):
+    def resized_image(self, image_file, width):
+        # type: (AnyStr, Optional[AnyStr]) -> AnyStr
+        """
+        :param image_file: image file
+        :param width: requested width or None
+        :return: image made smaller to the requested width, in webp format if the browser accepts it
+        """
+        if not width:
+            return image_file
+        webp = 'image/webp' in self.request.headers.get('Accept', '')
+        self.set_header('Vary', 'Accept')
+        return image_cache.ImageCache().resized_path(image_file, width, webp=webp)
+
+    def show_poster(self, tvid_prodid=None, which=None, api=None, width=None):
         # Redirect initial poster/banner thumb to default images
         if 'poster' == which[0:6]:
             default_image_name = 'poster.png'
@@ -325,15 +465,19 @@ class BaseHandler(RouteHandler):
             if static_image_path.startswith('/images'):
                 used_file = 'default'
                 static_image_path = ek.ek(os.path.join, sickgear.PROG_DIR, 'gui', 'slick', static_image_path[1:])
-            mime_type, encoding = MimeTypes().guess_type(static_image_path)
-            self.set_header('Content-Type', mime_type)
+            else:
+                static_image_path = self.resized_image(static_image_path, width)
             self.set_header('X-Filename', used_file)
-            with ek.ek(open, static_image_path, 'rb') as img:
-                return img.read()
+            return self.image_file(static_image_path)
         else:
+            version = ''
+            if not static_image_path.startswith('/images'):
+                # a new image of a show is a new url that cached copies of the old image are not used for
+                version = '?v=%s' % int(ek.ek(os.path.getmtime, static_image_path))
+                static_image_path = self.resized_image(static_image_path, width)
             static_image_path = os.path.normpath(static_image_path.replace(sickgear.CACHE_DIR, '/cache'))
             static_image_path = static_image_path.replace('\\', '/')
-            self.redirect(static_image_path)
+            self.redirect(static_image_path + version)
 
 
 class LoginHandler(BaseHandler):
@@ -1000,6 +1144,7 @@ class MainHandler(WebHandler):
             layout = 'poster'
 
         sickgear.HOME_LAYOUT = layout
+        page_cache.invalidate()
 
         self.redirect('/view-shows/')
 
@@ -1219,6 +1364,10 @@ class MainHandler(WebHandler):
     def daily_schedule(self, layout='None'):
         """ display the episodes """
         t = PageTemplate(web_handler=self, file='episodeView.tmpl')
+        page = t.get_cached_page()
+        if None is not page:
+            return page
+
         sql_result, t.fanart, sorts, next_week_dt, today, next_week = self.get_daily_schedule()
         # Allow local overriding of layout parameter
         if layout and layout in ('banner', 'daybyday', 'list', 'poster'):
@@ -1240,7 +1389,7 @@ class MainHandler(WebHandler):
         t.today = datetime.datetime.now(network_timezones.SG_TIMEZONE)
         t.sql_results = sql_result
 
-        return t.respond()
+        return t.cache_page(t.respond())
 
     @staticmethod
     def live_panel(**kwargs):
@@ -1456,6 +1605,7 @@ r.close()
 
     def toggle_specials_view_show(self, tvid_prodid):
         sickgear.DISPLAY_SHOW_SPECIALS = not sickgear.DISPLAY_SHOW_SPECIALS
+        page_cache.invalidate()
 
         self.redirect('/home/view-show?tvid_prodid=%s' % tvid_prodid)
 
@@ -1469,6 +1619,7 @@ r.close()
                 layout = 'detailed'
 
         sickgear.HISTORY_LAYOUT = layout
+        page_cache.invalidate()
 
         self.redirect('/history/')
 
@@ -1551,6 +1702,10 @@ class Home(MainHandler):
 
     def view_shows(self):
         t = PageTemplate(web_handler=self, file='home.tmpl')
+        page = t.get_cached_page()
+        if None is not page:
+            return page
+
         t.showlists = []
         index = 0
         if 'custom' == sickgear.SHOWLIST_TAGVIEW:
@@ -1598,40 +1753,16 @@ class Home(MainHandler):
         t.layout = sickgear.HOME_LAYOUT
 
         # Get all show snatched / downloaded / next air date stats
-        my_db = db.DBConnection()
         today = datetime.date.today().toordinal()
-        status_quality = ','.join([str(x) for x in Quality.SNATCHED_ANY])
-        status_download = ','.join([str(x) for x in Quality.DOWNLOADED + Quality.ARCHIVED])
-        status_total = '%s, %s, %s' % (SKIPPED, WANTED, FAILED)
-
-        sql_result = my_db.select(
-            'SELECT indexer AS tvid, showid as prodid, '
-            + '(SELECT COUNT(*) FROM tv_episodes'
-              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
-              ' AND season > 0 AND episode > 0 AND airdate > 1 AND status IN (%s)) AS ep_snatched,'
-              ' (SELECT COUNT(*) FROM tv_episodes'
-              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
-              ' AND season > 0 AND episode > 0 AND airdate > 1 AND status IN (%s)) AS ep_downloaded,'
-              ' (SELECT COUNT(*) FROM tv_episodes'
-              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
-              ' AND season > 0 AND episode > 0 AND airdate > 1'
-              ' AND ('
-              '(airdate <= %s AND (status IN (%s)))'
-              ' OR (status IN (%s)) OR (status IN (%s)))) AS ep_total,'
-              ' (SELECT airdate FROM tv_episodes'
-              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
-              ' AND airdate >= %s AND (status = %s  OR status = %s)'
-              ' ORDER BY airdate ASC LIMIT 1) AS ep_airs_next'
-              ' FROM tv_episodes tv_eps GROUP BY indexer, showid'
-            % (status_quality, status_download, today, status_total,
-               status_quality, status_download, today, UNAIRED, WANTED))
 
         t.show_stat = {}
 
-        for cur_result in sql_result:
-            t.show_stat[TVidProdid({cur_result['tvid']: cur_result['prodid']})()] = cur_result
+        for (cur_tvid, cur_prodid), cur_stats in iteritems(show_stats.get_show_stats()):
+            t.show_stat[TVidProdid({cur_tvid: cur_prodid})()] = dict(
+                zip(('ep_snatched', 'ep_downloaded', 'ep_total'), cur_stats.episode_counts(today)),
+                ep_airs_next=cur_stats.next_airdate((UNAIRED, WANTED), today))
 
-        return t.respond()
+        return t.cache_page(t.respond())
 
     def test_sabnzbd(self, host=None, username=None, password=None, apikey=None):
         self.set_header('Cache-Control', 'max-age=0,no-cache,no-store')
@@ -2131,6 +2262,10 @@ class Home(MainHandler):
             return self._generic_message('Error', 'Show not in show list')
 
         t = PageTemplate(web_handler=self, file='displayShow.tmpl')
+        page = t.get_cached_page(show_obj.tvid_prodid)
+        if None is not page:
+            return page
+
         t.submenu = [{'title': 'Edit', 'path': 'home/edit-show?tvid_prodid=%s' % tvid_prodid}]
 
         try:
@@ -2392,7 +2527,7 @@ class Home(MainHandler):
         t.xem_numbering = get_xem_numbering_for_show(show_obj.tvid, show_obj.prodid)
         t.xem_absolute_numbering = get_xem_absolute_numbering_for_show(show_obj.tvid, show_obj.prodid)
 
-        return t.respond()
+        return t.cache_page(t.respond())
 
     @staticmethod
     def make_showlist_unique_names():
@@ -7176,6 +7311,7 @@ class ShowTasks(Manage):
             hour=sickgear.show_update_scheduler.start_time.hour)
         t.show_update_running = sickgear.show_queue_scheduler.action.isShowUpdateRunning() \
             or sickgear.show_update_scheduler.action.amActive
+        t.update_counts = sickgear.show_update_scheduler.action.update_counts
 
         my_db = db.DBConnection(row_type='dict')
         sql_result = my_db.select('SELECT n.indexer || ? ||  n.indexer_id AS tvid_prodid,'
@@ -9571,11 +9707,6 @@ class Cache(MainHandler):
 
 
 class CachedImages(MainHandler):
-    def set_default_headers(self):
-        super(CachedImages, self).set_default_headers()
-        self.set_header('Cache-Control', 'no-cache, max-age=0')
-        self.set_header('Pragma', 'no-cache')
-        self.set_header('Expires', '0')
 
     @staticmethod
     def should_try_image(filename, source, days=1, minutes=0):
@@ -9616,7 +9747,7 @@ class CachedImages(MainHandler):
         for f in ['tmdb', 'tvdb', 'tvmaze']:
             CachedImages.delete_dummy_image('%s.%s.dummy' % (ek.ek(os.path.splitext, filename)[0], f))
 
-    def index(self, path='', source=None, filename=None, tmdbid=None, tvdbid=None, trans=True):
+    def index(self, path='', source=None, filename=None, tmdbid=None, tvdbid=None, trans=True, width=None):
 
         path = path.strip('/')
         file_name = ''
@@ -9675,7 +9806,7 @@ class CachedImages(MainHandler):
         else:
             helpers.set_file_timestamp(image_file, min_age=3, new_time=None)
 
-        return self.image_data(image_file)
+        return self.image_data(image_file, width=width)
 
     @staticmethod
     def should_load_image(filename, days=7):
@@ -9698,7 +9829,7 @@ class CachedImages(MainHandler):
             if cur_item.has_ref_id(ref_id):
                 return cur_item
 
-    def character(self, rid=None, tvid_prodid=None, thumb=True, pid=None, prefer_person=False, **kwargs):
+    def character(self, rid=None, tvid_prodid=None, thumb=True, pid=None, prefer_person=False, width=None, **kwargs):
         """
 
         :param rid:
@@ -9706,6 +9837,7 @@ class CachedImages(MainHandler):
         :param thumb: return thumb or normal as fallback
         :param pid: optional person_id
         :param prefer_person: prefer person image if person_id is set and character has more then 1 person assigned
+        :param width: optional width to return a smaller image
         """
         _ = kwargs.get('oid')  # suppress pyc non used var highlight, oid (original id) is a visual ui key
         show_obj = tvid_prodid and helpers.find_show_by_id(tvid_prodid)
@@ -9744,13 +9876,13 @@ class CachedImages(MainHandler):
                 image_file = fallback
 
         elif person_id:
-            return self.person(rid=char_id, pid=person_id, show_obj=show_obj, thumb=thumb)
+            return self.person(rid=char_id, pid=person_id, show_obj=show_obj, thumb=thumb, width=width)
         elif char_obj.person and (char_obj.person[0].thumb_url or char_obj.person[0].image_url):
-            return self.person(rid=char_id, pid=char_obj.person[0].id, show_obj=show_obj, thumb=thumb)
+            return self.person(rid=char_id, pid=char_obj.person[0].id, show_obj=show_obj, thumb=thumb, width=width)
 
-        return self.image_data(image_file, cast_default=True)
+        return self.image_data(image_file, cast_default=True, width=width)
 
-    def person(self, rid=None, pid=None, tvid_prodid=None, show_obj=None, thumb=True, **kwargs):
+    def person(self, rid=None, pid=None, tvid_prodid=None, show_obj=None, thumb=True, width=None, **kwargs):
         _ = kwargs.get('oid')  # suppress pyc non used var highlight, oid (original id) is a visual ui key
         show_obj = show_obj or tvid_prodid and helpers.find_show_by_id(tvid_prodid)
         char_id = usable_id(rid)
@@ -9781,21 +9913,19 @@ class CachedImages(MainHandler):
             elif ek.ek(os.path.isfile, fallback):
                 image_file = fallback
 
-        return self.image_data(image_file, cast_default=True)
+        return self.image_data(image_file, cast_default=True, width=width)
 
-    def image_data(self, image_file, cast_default=False):
-        # type: (Optional[AnyStr], bool) -> Optional[Any]
+    def image_data(self, image_file, cast_default=False, width=None):
+        # type: (Optional[AnyStr], bool, Optional[AnyStr]) -> Optional[ImageFile]
         """
-        return image file binary data
+        return image file to send
 
         :param image_file: file path
         :param cast_default: if required, use default cast file path if None is image_file
-        :return: binary image data or None
+        :param width: optional width to send a smaller image
+        :return: image file to send, or None if the browser copy is unchanged
         """
         if cast_default and None is image_file:
             image_file = ek.ek(os.path.join, sickgear.PROG_DIR, 'gui', 'slick', 'images', 'poster-person.jpg')
 
-        mime_type, encoding = MimeTypes().guess_type(image_file)
-        self.set_header('Content-Type', mime_type)
-        with open(image_file, 'rb') as io_stream:
-            return io_stream.read()
+        return self.image_file(self.resized_image(image_file, width))
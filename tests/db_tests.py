@@ -17,6 +17,7 @@
 # along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import print_function
+import threading
 import unittest
 import test_lib as test
 from sickgear import cache_db, mainDB, failed_db
@@ -71,6 +72,47 @@ class DBBasicTests(test.SickbeardTestDBCase):
             self.assertEqual(str(result[-1][0][f]), str(insert_para[i]),
                              msg='Field %s: %s != %s' % (f, result[-1][0][f], insert_para[i]))
 
+    def test_connection_pool(self):
+        stats = test.db.connection_stats()
+        my_db = test.db.DBConnection()
+        self.assertIs(self.db.connection, my_db.connection)
+        self.assertLess(stats['reuses'], test.db.connection_stats()['reuses'])
+
+        other = []
+        t = threading.Thread(target=lambda: other.append(test.db.DBConnection().connection))
+        t.start()
+        t.join()
+        self.assertIsNot(self.db.connection, other[0])
+
+        my_db.close()
+        opens = test.db.connection_stats()['opens']
+        self.db.select('SELECT 1')
+        self.assertEqual(opens + 1, test.db.connection_stats()['opens'])
+
+    def test_db_lock(self):
+        cache_db_conn = test.db.DBConnection('cache.db')
+        self.assertIsNot(self.db.db_lock, cache_db_conn.db_lock)
+        self.assertIs(self.db.db_lock, test.db.DBConnection().db_lock)
+
+        result = []
+        with self.db.db_lock:
+            t = threading.Thread(target=lambda: result.append(
+                test.db.DBConnection().select('SELECT * FROM tv_episodes')))
+            t.start()
+            t.join(10)
+        self.assertEqual([[]], result)
+
+        # a select that is not a read waits for the writer lock
+        result = []
+        with self.db.db_lock:
+            t = threading.Thread(target=lambda: result.append(
+                test.db.DBConnection().select('DELETE FROM tv_episodes')))
+            t.start()
+            t.join(0.5)
+            self.assertEqual([], result)
+        t.join(10)
+        self.assertEqual([[]], result)
+
 
 if '__main__' == __name__:
     print('==================')
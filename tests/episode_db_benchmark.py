@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Benchmark of saving the episodes of a synthetic show to the database
+
+Compares the previous save, which runs an upsert query for every loaded episode, with the current save, which compares
+the episodes with the database rows of the show and runs executemany for only new and changed episodes.
+
+usage: python episode_db_benchmark.py [episodes] [percent of episodes changed by update]
+"""
+
+from __future__ import print_function
+import datetime
+import sys
+import time
+import warnings
+
+warnings.filterwarnings('ignore', module=r'.*fuz.*', message='.*Sequence.*')
+
+import test_lib as test
+
+from sickgear import db
+from sickgear.tv import TVEpisode, TVShow
+
+
+def make_episodes(show_obj, num_episodes, changed_every=0):
+    ep_obj_list = []
+    for cur_num in range(num_episodes):
+        season, episode = divmod(cur_num, 1000)
+        ep_obj = TVEpisode(show_obj, 1 + season, 1 + episode)
+        ep_obj.epid = 1 + cur_num
+        ep_obj.tvid = show_obj.tvid
+        ep_obj.name = 'Episode %s' % cur_num
+        if changed_every and not cur_num % changed_every:
+            ep_obj.name += ' (changed)'
+        ep_obj.description = 'Description of episode %s' % cur_num
+        ep_obj.airdate = datetime.date(2000, 1, 1) + datetime.timedelta(days=cur_num)
+        ep_obj.absolute_number = 1 + cur_num
+        ep_obj.dirty = True
+        ep_obj_list.append(ep_obj)
+    return ep_obj_list
+
+
+def save_previous(show_obj, ep_obj_list):
+    """
+    :return: seconds spent writing to the database
+    """
+    # the rows of show were also selected by the previous load of episodes
+    db.DBConnection().select('SELECT * FROM tv_episodes WHERE indexer = ? AND showid = ?',
+                             [show_obj.tvid, show_obj.prodid])
+    sql_l = [ep_obj.get_sql() for ep_obj in ep_obj_list]
+    start = time.time()
+    db.DBConnection().mass_action(sql_l)
+    return time.time() - start
+
+
+def save_current(show_obj, ep_obj_list):
+    """
+    :return: seconds spent writing to the database
+    """
+    sql_result = db.DBConnection().select('SELECT * FROM tv_episodes WHERE indexer = ? AND showid = ?',
+                                          [show_obj.tvid, show_obj.prodid])
+    db_rows = dict([((int(cur_row['season']), int(cur_row['episode'])), cur_row) for cur_row in sql_result])
+    ep_values = [(ep_obj.season, ep_obj.episode, ep_obj.get_db_values()) for ep_obj in ep_obj_list]
+    queries = show_obj.get_episodes_sql(ep_values, db_rows)
+    start = time.time()
+    db.DBConnection().mass_action_many(queries)
+    return time.time() - start
+
+
+def bench(func, num_episodes, changed_every):
+    test.setup_test_db()
+    try:
+        show_obj = TVShow(1, 1, 'en')
+
+        times = []
+        for cur_changed_every in (0, changed_every):
+            ep_obj_list = make_episodes(show_obj, num_episodes, cur_changed_every)
+            start = time.time()
+            write_time = func(show_obj, ep_obj_list)
+            times += [time.time() - start, write_time]
+
+        sql_result = db.DBConnection().select('SELECT COUNT(*) AS num, SUM(name LIKE \'%changed%\') AS changed'
+                                              ' FROM tv_episodes WHERE showid = ?', [show_obj.prodid])
+        return tuple(times) + (sql_result[0]['num'], sql_result[0]['changed'])
+    finally:
+        test.teardown_test_db()
+
+
+if '__main__' == __name__:
+    num_eps = 1 < len(sys.argv) and int(sys.argv[1]) or 10000
+    percent_changed = 2 < len(sys.argv) and float(sys.argv[2]) or 1.0
+    changed = max(1, int(100 / percent_changed))
+    test.create_test_cache_folder()
+
+    print('%s episodes, %s%% changed by update' % (num_eps, percent_changed))
+    for cur_name, cur_func in (('previous', save_previous), ('current ', save_current)):
+        result = bench(cur_func, num_eps, changed)
+        print('%s: add %.2f sec (db write %.2f sec), update %.2f sec (db write %.2f sec), %s rows, %s changed'
+              % ((cur_name,) + result))
+    test.remove_test_cache_folder()
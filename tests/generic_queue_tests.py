@@ -0,0 +1,110 @@
+# coding=utf-8
+import warnings
+warnings.filterwarnings('ignore', module=r'.*fuz.*', message='.*Sequence.*')
+
+import threading
+import time
+import unittest
+import test_lib as test
+
+import sys
+import os.path
+sys.path.insert(1, os.path.abspath('..'))
+
+from sickgear import generic_queue
+from sickgear.generic_queue import QueuePriorities
+
+
+class _Item(generic_queue.QueueItem):
+    def __init__(self, name, key, started, priority=QueuePriorities.NORMAL):
+        super(_Item, self).__init__(name)
+        self.label = name
+        self.key = key
+        self.priority = priority
+        self.started = started
+        self.done = threading.Event()
+
+    @property
+    def lane_key(self):
+        return self.key
+
+    def run(self):
+        self.started.append(self.label)
+        self.done.wait(5)
+        self.finish()
+
+
+class GenericQueueTests(test.SickbeardTestDBCase):
+
+    def setUp(self):
+        super(GenericQueueTests, self).setUp()
+        self.started = []
+        self.items = {}
+
+    def tearDown(self):
+        for cur_item in self.items.values():
+            cur_item.done.set()
+        super(GenericQueueTests, self).tearDown()
+
+    def _add(self, queue, name, key, priority=QueuePriorities.NORMAL):
+        self.items[name] = queue.add_item(_Item(name, key, self.started, priority=priority), add_to_db=False)
+
+    def _finish(self, queue, *names):
+        for cur_name in names:
+            self.items[cur_name].done.set()
+            self.items[cur_name].join()
+        self._tick(queue)
+
+    @staticmethod
+    def _tick(queue):
+        queue.run()
+        time.sleep(0.1)
+
+    def test_single_lane_priority(self):
+        queue = generic_queue.GenericQueue()
+        for name, priority in (('A', QueuePriorities.LOW), ('B', QueuePriorities.HIGH), ('C', QueuePriorities.LOW),
+                               ('D', QueuePriorities.HIGH), ('E', QueuePriorities.VERYHIGH)):
+            self._add(queue, name, (name,), priority)
+
+        self._tick(queue)
+        for name in 'EBDAC':
+            self.assertEqual(name, self.started[-1])
+            self.assertEqual(self.items[name], queue.currentItem)
+            self._finish(queue, name)
+        self.assertEqual([], queue.current_items)
+
+    def test_lanes(self):
+        queue = generic_queue.GenericQueue(lanes=3)
+        for name, key in (('A', 1), ('B', 1), ('C', 2), ('D', None), ('E', 3), ('F', 4)):
+            self._add(queue, name, key)
+
+        # B waits for A with the same key, D runs alone so no later item may pass it
+        self._tick(queue)
+        self.assertEqual(['A', 'C'], sorted(self.started))
+        self._finish(queue, 'A')
+        self.assertEqual('B', self.started[-1])
+        self._finish(queue, 'B', 'C')
+        self.assertEqual('D', self.started[-1])
+        self._add(queue, 'G', 5, QueuePriorities.HIGH)
+        self._tick(queue)
+        self.assertEqual(['D'], [cur_item.label for cur_item in queue.current_items])
+        self._finish(queue, 'D')
+        self.assertEqual(['E', 'F', 'G'], sorted(self.started[4:]))
+        self.assertEqual(3, len(queue.current_items))
+
+        queue.pause()
+        self._add(queue, 'H', 6)
+        self._finish(queue, 'E', 'F', 'G')
+        self.assertEqual(7, len(self.started))
+        queue.unpause()
+        self._tick(queue)
+        self.assertEqual('H', self.started[-1])
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - Generic Queue TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(GenericQueueTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -289,6 +289,21 @@ class TestCase(unittest.TestCase):
         re_extras.update(kwargs)
         return show_name_helpers.not_contains_any(name, csv_words, *args, **re_extras)
 
+    def test_word_matcher(self):
+        words = {'sub(bed|ed|pack|s)', 'sample', r'(\w)\1x', 'dub(bed)?'}
+        matcher = show_name_helpers.get_word_matcher(words, rx=True)
+        self.assertTrue(matcher is show_name_helpers.get_word_matcher(set(words), rx=True))
+        self.assertTrue(None is matcher.any_rx)
+        words.discard(r'(\w)\1x')
+        combined = show_name_helpers.get_word_matcher(words, rx=True)
+        self.assertFalse(matcher is combined)
+        self.assertTrue(None is not combined.any_rx)
+        for name in ('Show.Name.S01E01.Subbed.Sample.Dub', 'Show.Name.S01E01.Subbed', 'Show.Name.S01E01.sub',
+                     'Show.Name.S01E01.Dubbed.Sample.Subs', 'Show.Name.S01E01'):
+            for cur_matcher in (matcher, combined):
+                self.assertEqual(any(p.search(name) for p in cur_matcher.patterns), cur_matcher.found_any(name))
+                self.assertEqual(any(not p.search(name) for p in cur_matcher.patterns), cur_matcher.missed_any(name))
+
 
 if '__main__' == __name__:
     unittest.main()
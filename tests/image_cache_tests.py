@@ -0,0 +1,157 @@
+# coding=utf-8
+import warnings
+warnings.filterwarnings('ignore', module=r'.*fuz.*', message='.*Sequence.*')
+
+import glob
+import os
+import struct
+import time
+import unittest
+import test_lib as test
+
+import sys
+import os.path
+sys.path.insert(1, os.path.abspath('..'))
+
+import sickgear
+from sickgear import image_cache
+from lib.hachoir.parser import createParser
+from lib.hachoir.metadata import extractMetadata
+
+
+class ImageResizeTests(unittest.TestCase):
+
+    def setUp(self):
+        test.remove_test_cache_folder()
+        test.create_test_cache_folder()
+        image_cache.resized_files = None
+        image_cache.unresized.clear()
+        self.cache_mb = sickgear.IMAGE_RESIZE_CACHE_MB
+        self.resized_dir = os.path.join(sickgear.CACHE_DIR, 'images', 'resized')
+
+    def tearDown(self):
+        sickgear.IMAGE_RESIZE_CACHE_MB = self.cache_mb
+        image_cache.resized_files = None
+        test.remove_test_cache_folder()
+
+    def _image(self, name, size):
+        image_file = os.path.join(sickgear.CACHE_DIR, name)
+        image_cache.Image.new('RGB', size, (200, 100, 50)).save(image_file, 'jpeg')
+        return image_file
+
+    def test_resize_width(self):
+        for width, expected in ((None, None), ('x', None), (0, None), ('1', 160), (160, 160), ('161', 320),
+                                (5000, 1280)):
+            self.assertEqual(expected, image_cache.ImageCache.resize_width(width))
+
+    def test_use_resized(self):
+        os.makedirs(self.resized_dir)
+        files = []
+        for cur_num in range(4):
+            cur_file = os.path.join(self.resized_dir, '%s.jpg' % cur_num)
+            with open(cur_file, 'wb') as f:
+                f.write(b'x' * 400 * 1024)
+            os.utime(cur_file, (time.time() - 10 + cur_num, time.time() - 10 + cur_num))
+            files += [cur_file]
+
+        # files are loaded in order of file time, a use moves a file to the end
+        sickgear.IMAGE_RESIZE_CACHE_MB = 1
+        image_cache._use_resized(self.resized_dir, files[0])
+        self.assertEqual([files[3], files[0]], list(image_cache.resized_files))
+        self.assertEqual([True, False, False, True], [os.path.isfile(cur_file) for cur_file in files])
+        self.assertEqual(800 * 1024, image_cache.resized_total)
+
+        # a new file with the name of a used file replaces its size
+        image_cache._use_resized(self.resized_dir, files[3], 100 * 1024)
+        self.assertEqual([files[0], files[3]], list(image_cache.resized_files))
+        self.assertEqual(500 * 1024, image_cache.resized_total)
+
+    @unittest.skipIf(None is image_cache.Image, 'Pillow not installed')
+    def test_resized_path(self):
+        image_file = self._image('poster.jpg', (680, 1000))
+        cache_obj = image_cache.ImageCache()
+        self.assertEqual(image_file, cache_obj.resized_path(image_file, None))
+        # not wider than the image
+        self.assertEqual(image_file, cache_obj.resized_path(image_file, 700))
+
+        resized_file = cache_obj.resized_path(image_file, 300)
+        self.assertTrue(resized_file.startswith(self.resized_dir) and resized_file.endswith('.jpg'))
+        with image_cache.Image.open(resized_file) as img:
+            self.assertEqual((320, 471), img.size)
+        self.assertEqual(resized_file, cache_obj.resized_path(image_file, 320))
+
+        webp_file = cache_obj.resized_path(image_file, 300, webp=True)
+        self.assertTrue(webp_file.endswith('.webp'))
+        self.assertEqual([resized_file, webp_file], list(image_cache.resized_files))
+
+        # a changed image is resized again
+        time.sleep(0.01)
+        self._image('poster.jpg', (500, 500))
+        self.assertNotEqual(resized_file, cache_obj.resized_path(image_file, 300))
+
+        sickgear.NO_RESIZE = True
+        try:
+            self.assertEqual(image_file, cache_obj.resized_path(image_file, 300))
+        finally:
+            sickgear.NO_RESIZE = False
+
+
+class ImageDimensionsTests(unittest.TestCase):
+
+    def setUp(self):
+        test.remove_test_cache_folder()
+        test.create_test_cache_folder()
+        image_cache.img_dimensions.clear()
+
+    def tearDown(self):
+        test.remove_test_cache_folder()
+
+    def test_headers(self):
+        riff = b'RIFF\0\0\0\0WEBP'
+        for data, size in (
+                (b'\x89PNG\r\n\x1a\n\0\0\0\x0dIHDR' + struct.pack('>II', 680, 1000) + b'\x08\x02\0\0\0', (680, 1000)),
+                (b'GIF89a' + struct.pack('<HH', 758, 140) + b'\0' * 20, (758, 140)),
+                (riff + b'VP8 \0\0\0\0\0\0\0\x9d\x01\x2a' + struct.pack('<HH', 1920, 1080), (1920, 1080)),
+                (riff + b'VP8L\0\0\0\0\x2f' + struct.pack('<I', 1279 | (719 << 14)) + b'\0' * 5, (1280, 720)),
+                (riff + b'VP8X\x0a\0\0\0\0\0\0\0' + struct.pack('<I', 1279)[0:3] + struct.pack('<I', 719)[0:3],
+                 (1280, 720)),
+                # an exif segment larger than a header read, then a quantization table before the frame
+                (b'\xff\xd8\xff\xe1' + struct.pack('>H', 2002) + b'\0' * 2000 + b'\xff\xdb' + struct.pack('>H', 67)
+                 + b'\0' * 65 + b'\xff\xff\xc0' + struct.pack('>HBHH', 17, 8, 1000, 680) + b'\0' * 12, (680, 1000))):
+            self.assertEqual(size + (float(size[0]) / size[1],),
+                             image_cache.ImageCache.get_img_dimensions(data, is_binary=True))
+
+        self.assertIsNone(image_cache.ImageCache.get_img_dimensions(b'\xff\xd8\xff\xe1\x10', is_binary=True))
+        self.assertIsNone(image_cache.ImageCache.get_img_dimensions(b'unknown image data', is_binary=True))
+
+    def test_image_files(self):
+        image_files = []
+        for cur_ext in ('jpg', 'png', 'gif'):
+            image_files += glob.glob(os.path.join(sickgear.PROG_DIR, 'gui', 'slick', 'images', '*.%s' % cur_ext))
+        self.assertTrue(image_files)
+        for cur_file in image_files:
+            img_parser = createParser(cur_file)
+            img_metadata = extractMetadata(img_parser)
+            # noinspection PyProtectedMember
+            img_parser.stream._input.close()
+            self.assertEqual((img_metadata.get('width'), img_metadata.get('height')),
+                             image_cache.ImageCache.get_img_dimensions(cur_file)[0:2], msg=cur_file)
+
+    def test_memo(self):
+        image_file = os.path.join(sickgear.CACHE_DIR, 'poster.png')
+        for cur_size in ((680, 1000), (1000, 680)):
+            with open(image_file, 'wb') as f:
+                f.write(b'\x89PNG\r\n\x1a\n\0\0\0\x0dIHDR' + struct.pack('>II', *cur_size)
+                        + b'\0' * (0, 100)[680 == cur_size[1]])
+            self.assertEqual(cur_size, image_cache.ImageCache.get_img_dimensions(image_file)[0:2])
+            self.assertEqual(cur_size, image_cache.img_dimensions[image_file][2][0:2])
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - Image Cache TESTS')
+    print('==================')
+    print('######################################################################')
+    for cur_case in (ImageResizeTests, ImageDimensionsTests):
+        suite = unittest.TestLoader().loadTestsFromTestCase(cur_case)
+        unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# coding=UTF-8
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Benchmark of the NameParser regex matcher over the names of name_parser_tests
+
+Compares the previous matcher, which cleaned the name and ran every regex for each pattern, with the current
+matcher, which cleans each name once per anime/non anime variant and skips regexes rejected by a prefilter.
+
+usage: python name_parser_benchmark.py [rounds]
+"""
+
+from __future__ import print_function
+import os.path
+import sys
+import time
+import warnings
+
+warnings.filterwarnings('ignore', module=r'.*fuz.*', message='.*Sequence.*')
+
+import name_parser_tests as npt
+
+from sickgear import helpers
+from sickgear.name_parser import parser
+from six import itervalues
+
+
+def get_names():
+    names = [n.split('/')[-1] for section in itervalues(npt.simple_test_cases) for n in section] + \
+            [os.path.basename(c[0]) for c in npt.combination_test_cases] + npt.failure_cases
+    return names + ['%s.mkv' % n for n in names]
+
+
+def match_previous(name, compiled):
+    matches = []
+    for cur_regex_num, cur_regex_name, cur_regex, cur_prefilter in compiled:
+        new_name = helpers.remove_non_release_groups(name, 'anime' in cur_regex_name)
+        match = cur_regex.match(new_name)
+        if match:
+            matches.append(cur_regex_name)
+    return matches
+
+
+def match_current(name, compiled):
+    matches = []
+    clean_names = {}
+    for cur_regex_num, cur_regex_name, cur_regex, cur_prefilter in compiled:
+        is_anime_regex = 'anime' in cur_regex_name
+        new_name = clean_names.get(is_anime_regex)
+        if None is new_name:
+            new_name = clean_names[is_anime_regex] = helpers.remove_non_release_groups(name, is_anime_regex)
+        if None is not cur_prefilter and not cur_prefilter.search(new_name):
+            continue
+        match = cur_regex.match(new_name)
+        if match:
+            matches.append(cur_regex_name)
+    return matches
+
+
+def bench(func, names, compiled, rounds):
+    start = time.time()
+    for _ in range(rounds):
+        for cur_name in names:
+            func(cur_name, compiled)
+    return (len(names) * rounds) / (time.time() - start)
+
+
+def bench_parse(names, rounds):
+    np = parser.NameParser(False, testing=True)
+    start = time.time()
+    for _ in range(rounds):
+        for cur_name in names:
+            try:
+                np.parse(cur_name, cache_result=False)
+            except (BaseException, Exception):
+                pass
+    return (len(names) * rounds) / (time.time() - start)
+
+
+if '__main__' == __name__:
+    num_rounds = 1 < len(sys.argv) and int(sys.argv[1]) or 20
+    test_names = get_names()
+    all_regexes = parser.compiled_regexes[parser.NameParser.ALL_REGEX]
+    compiled_list = all_regexes[0] + all_regexes[1]
+
+    for cur_test_name in test_names:
+        if match_previous(cur_test_name, compiled_list) != match_current(cur_test_name, compiled_list):
+            print('Mismatch of matched regexes for: %s' % cur_test_name)
+            sys.exit(1)
+
+    print('%s names, %s rounds' % (len(test_names), num_rounds))
+    print('regex matcher, previous: %.0f names/sec' % bench(match_previous, test_names, compiled_list, num_rounds))
+    print('regex matcher, current:  %.0f names/sec' % bench(match_current, test_names, compiled_list, num_rounds))
+    print('NameParser.parse:        %.0f names/sec' % bench_parse(test_names, num_rounds))
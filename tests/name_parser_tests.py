@@ -9,9 +9,10 @@ sys.path.insert(1, os.path.abspath('..'))
 sys.path.insert(1, os.path.abspath('../lib'))
 
 import sickgear
-from sickgear import db, name_cache, tv
+from sickgear import db, helpers, name_cache, tv
 from sickgear.classes import OrderedDefaultdict
 from sickgear.name_parser import parser
+from six import itervalues
 
 sickgear.SYS_ENCODING = 'UTF-8'
 
@@ -844,6 +845,91 @@ class BasicTests(unittest.TestCase):
         self._test_names(np, 'anime_bare')
 
 
+class PrefilterTests(unittest.TestCase):
+    def test_prefilters(self):
+        # a prefilter must never reject a name that its regex matches
+        names = [n.split('/')[-1] for section in itervalues(simple_test_cases) for n in section] + \
+                [os.path.basename(c[0]).replace('\\', '/').split('/')[-1] for c in combination_test_cases] + \
+                [c[0] for c in unicode_test_cases] + failure_cases + [c[0] for c in invalid_cases]
+        for cur_name in names + ['%s.avi' % n for n in names]:
+            for cur_num, cur_regex_name, cur_regex, cur_prefilter in \
+                    parser.compiled_regexes[parser.NameParser.ALL_REGEX][0] + \
+                    parser.compiled_regexes[parser.NameParser.ALL_REGEX][1]:
+                new_name = helpers.remove_non_release_groups(cur_name, 'anime' in cur_regex_name)
+                if None is not cur_prefilter and cur_regex.match(new_name):
+                    self.assertTrue(cur_prefilter.search(new_name),
+                                    msg='prefilter of %s rejects: %s' % (cur_regex_name, new_name))
+
+
+class ParseManyTests(unittest.TestCase):
+    def test_parse_many(self):
+        names = [n.split('/')[-1] for section in itervalues(simple_test_cases) for n in section]
+        np = parser.NameParser(False, testing=True)
+        for cur_name, cur_result in zip(names, np.parse_many(names, cache_result=False)):
+            try:
+                self.assertEqual(cur_result, np.parse(cur_name, cache_result=False))
+            except parser.InvalidNameException:
+                self.assertTrue(isinstance(cur_result, parser.InvalidNameException))
+
+    def test_parse_many_failures(self):
+        results = parser.NameParser(True).parse_many(failure_cases + failure_cases, cache_result=False)
+        self.assertEqual(2 * len(failure_cases), len(results))
+        for cur_result in results:
+            self.assertTrue(isinstance(cur_result, (parser.InvalidNameException, parser.InvalidShowException)))
+
+
+class NameParserCacheTests(unittest.TestCase):
+    def test_cache(self):
+        show_a, show_b = TVShowTest(name='show a', prodid=1), TVShowTest(name='show b', prodid=2)
+        npc = parser.NameParserCache(max_entries=3, max_bytes=1024 * 1024)
+        for cur_num, cur_show in enumerate([show_a, show_b, show_a, show_b]):
+            npc.add('name %s' % cur_num, parser.ParseResult('name %s' % cur_num, show_obj=cur_show))
+        self.assertEqual(None, npc.get('name 0'))
+        self.assertTrue(npc.get('name 1'))
+        stats = npc.stats()
+        self.assertEqual((3, 1, 1, 1), (stats['entries'], stats['hits'], stats['misses'], stats['evictions']))
+
+        npc.flush(show_b)
+        self.assertEqual((None, None), (npc.get('name 1'), npc.get('name 3')))
+        self.assertTrue(npc.get('name 2'))
+        stats = npc.stats()
+        self.assertEqual((1, 1, 2), (stats['entries'], stats['shows'], stats['flushed']))
+
+        npc.flush(show_a)
+        self.assertEqual((0, 0), (npc.stats()['entries'], npc.stats()['bytes']))
+
+    def test_cache_switched_show(self):
+        show_a, show_b = TVShowTest(name='show a', prodid=1), TVShowTest(name='show b', prodid=2)
+        npc = parser.NameParserCache(max_entries=3, max_bytes=1024 * 1024)
+        npc.add('name 0', parser.ParseResult('name 0', show_obj=show_a))
+        npc.add('name 1', parser.ParseResult('name 1', show_obj=show_b))
+        # an in place switch of source changes the ids of the show object
+        show_a.tvid, show_a.prodid = 3, 10
+        npc.add('name 2', parser.ParseResult('name 2', show_obj=show_a))
+
+        npc.flush(show_a)
+        self.assertEqual((None, None), (npc.get('name 0'), npc.get('name 2')))
+        self.assertTrue(npc.get('name 1'))
+        self.assertEqual((1, 1), (npc.stats()['entries'], npc.stats()['shows']))
+
+        # an entry evicted after a switch is removed from the index of the ids it was cached with
+        npc.add('name 3', parser.ParseResult('name 3', show_obj=show_b))
+        show_b.prodid = 20
+        for cur_num in range(4, 7):
+            npc.add('name %s' % cur_num, parser.ParseResult('name %s' % cur_num, show_obj=show_a))
+        self.assertEqual((3, 1), (npc.stats()['entries'], npc.stats()['shows']))
+
+    def test_cache_bytes(self):
+        show_obj = TVShowTest(name='show a')
+        npc = parser.NameParserCache(max_entries=1000, max_bytes=4096)
+        for cur_num in range(100):
+            npc.add('name %s' % cur_num, parser.ParseResult('name %s' % cur_num, show_obj=show_obj))
+        stats = npc.stats()
+        self.assertTrue(4096 >= stats['bytes'])
+        self.assertEqual(100, stats['entries'] + stats['evictions'])
+        self.assertTrue(npc.get('name 99'))
+
+
 class TVShowTest(tv.TVShow):
     # noinspection PyMissingConstructor
     def __init__(self, is_anime=False, name='', prodid=1, tvid=1, year=1990, scene=0):
@@ -0,0 +1,103 @@
+# coding=utf-8
+import warnings
+warnings.filterwarnings('ignore', module=r'.*fuz.*', message='.*Sequence.*')
+
+import time
+import unittest
+
+import sys
+import os.path
+sys.path.insert(1, os.path.abspath('..'))
+sys.path.insert(1, os.path.abspath('../lib'))
+
+import sickgear
+from sickgear import page_cache, webserve
+
+
+class _Show(object):
+    def __init__(self, not_found_count):
+        self.not_found_count = not_found_count
+
+
+class _Handler(object):
+    def redirect(self, url):
+        self.url = url
+
+
+class PageCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        page_cache.pages.clear()
+        self.max_age, self.max_pages = page_cache.MAX_AGE, page_cache.MAX_PAGES
+
+    def tearDown(self):
+        page_cache.MAX_AGE, page_cache.MAX_PAGES = self.max_age, self.max_pages
+
+    def test_invalidate(self):
+        page_cache.add('home', page_cache.stamp(), 'home page')
+        for cur_tvid_prodid in ('1:1', '1:2'):
+            page_cache.add(cur_tvid_prodid, page_cache.stamp(cur_tvid_prodid), 'show page %s' % cur_tvid_prodid)
+        self.assertEqual('home page', page_cache.get('home'))
+        self.assertEqual('show page 1:1', page_cache.get('1:1', '1:1'))
+
+        # a show change drops pages of all shows and of that show
+        page_cache.invalidate('1:1')
+        self.assertIsNone(page_cache.get('home'))
+        self.assertIsNone(page_cache.get('1:1', '1:1'))
+        self.assertEqual('show page 1:2', page_cache.get('1:2', '1:2'))
+
+        # a page rendered while a change is made is dropped at next use
+        stamp = page_cache.stamp()
+        page_cache.invalidate('1:1')
+        page_cache.add('home', stamp, 'old home page')
+        self.assertIsNone(page_cache.get('home'))
+
+        page_cache.invalidate()
+        self.assertIsNone(page_cache.get('1:2', '1:2'))
+
+    def test_limits(self):
+        page_cache.MAX_PAGES = 2
+        for cur_page in ('a', 'b', 'c'):
+            page_cache.add(cur_page, page_cache.stamp(), cur_page)
+        self.assertEqual([None, 'b', 'c'], [page_cache.get(cur_page) for cur_page in ('a', 'b', 'c')])
+
+        page_cache.MAX_AGE = 0.1
+        time.sleep(0.2)
+        self.assertIsNone(page_cache.get('c'))
+
+    def test_display_settings(self):
+        # a setting changed without a config save drops the pages that show it
+        home_layout, display_show_specials = sickgear.HOME_LAYOUT, sickgear.DISPLAY_SHOW_SPECIALS
+        try:
+            for cur_method, cur_args in (
+                    (webserve.MainHandler.set_layout_view_shows, ('small',)),
+                    (webserve.MainHandler.toggle_specials_view_show, ('1:1',))):
+                page_cache.add('home', page_cache.stamp(), 'home page')
+                page_cache.add('1:1', page_cache.stamp('1:1'), 'show page')
+                cur_method(_Handler(), *cur_args)
+                self.assertIsNone(page_cache.get('home'))
+                self.assertIsNone(page_cache.get('1:1', '1:1'))
+        finally:
+            sickgear.HOME_LAYOUT, sickgear.DISPLAY_SHOW_SPECIALS = home_layout, display_show_specials
+
+    def test_header_counts(self):
+        show_list = sickgear.showList
+        try:
+            sickgear.showList = [_Show(0), _Show(2), _Show(-1)]
+            page_cache.invalidate()
+            self.assertEqual((1, 2), page_cache.get_header_counts())
+            sickgear.showList.append(_Show(1))
+            self.assertEqual((1, 2), page_cache.get_header_counts())
+            page_cache.invalidate('1:1')
+            self.assertEqual((2, 3), page_cache.get_header_counts())
+        finally:
+            sickgear.showList = show_list
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - Page Cache TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(PageCacheTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
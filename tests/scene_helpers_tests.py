@@ -121,6 +121,51 @@ class SceneExceptionTestCase(test.SickbeardTestDBCase):
         self.assertEqual(name_cache.retrieveNameFromCache('Cached Name'), (0, 0))
 
 
+class NameCacheTestCase(test.SickbeardTestDBCase):
+
+    def setUp(self):
+        super(NameCacheTestCase, self).setUp()
+
+        sickgear.showList = []
+        sickgear.showDict = {}
+        for prodid, name in [(1001, 'Show One'), (1002, 'Show Two')]:
+            s = TVShow(TVINFO_TVDB, prodid)
+            s.name = name
+            sickgear.showList.append(s)
+            sickgear.showDict[s.sid_int] = s
+        sickgear.webserve.Home.make_showlist_unique_names()
+        my_db = db.DBConnection()
+        # noinspection SqlConstantCondition
+        my_db.action('DELETE FROM scene_exceptions WHERE 1=1')
+        my_db.mass_action([
+            ['INSERT INTO scene_exceptions (indexer, indexer_id, show_name, season) VALUES (?,?,?,?)',
+             [TVINFO_TVDB, prodid, name, season]]
+            for prodid, name, season in [(1001, 'Show One Alias', -1), (1002, 'Show Two Alias', 2)]])
+        name_cache.buildNameCache()
+
+    def test_name_cache(self):
+        self.assertEqual(name_cache.retrieveNameFromCache('Show One'), (TVINFO_TVDB, 1001))
+        self.assertEqual(name_cache.sceneNameCache['show two alias'], [TVINFO_TVDB, 1002, 2])
+
+        # update only the changes of one show
+        show_obj = sickgear.showList[0]
+        show_obj.name = show_obj.unique_name = 'Show Renamed'
+        db.DBConnection().action('UPDATE scene_exceptions SET show_name = ? WHERE indexer_id = ?',
+                                 ['Show Renamed Alias', 1001])
+        name_cache.buildNameCache(show_obj)
+        self.assertEqual(name_cache.retrieveNameFromCache('Show One'), (None, None))
+        self.assertEqual(name_cache.retrieveNameFromCache('Show Renamed'), (TVINFO_TVDB, 1001))
+        self.assertEqual(name_cache.retrieveNameFromCache('Show Two'), (TVINFO_TVDB, 1002))
+        self.assertTrue('show one alias' not in name_cache.sceneNameCache)
+        self.assertEqual(name_cache.sceneNameCache['show renamed alias'], [TVINFO_TVDB, 1001, -1])
+        self.assertEqual(name_cache.sceneNameCache['show two alias'], [TVINFO_TVDB, 1002, 2])
+
+        name_cache.remove_from_namecache(TVINFO_TVDB, 1002)
+        self.assertEqual(name_cache.retrieveNameFromCache('Show Two'), (None, None))
+        self.assertEqual(name_cache.retrieveNameFromCache('Show Renamed'), (TVINFO_TVDB, 1001))
+        self.assertTrue((TVINFO_TVDB, 1002) not in name_cache.show_names)
+
+
 if '__main__' == __name__:
     if 1 < len(sys.argv):
         suite = unittest.TestLoader().loadTestsFromName(
@@ -0,0 +1,104 @@
+# coding=utf-8
+import warnings
+warnings.filterwarnings('ignore', module=r'.*fuz.*', message='.*Sequence.*')
+
+import datetime
+import threading
+import time
+import unittest
+import test_lib as test
+
+import sys
+import os.path
+sys.path.insert(1, os.path.abspath('..'))
+
+from sickgear import generic_queue, scheduler
+
+
+class _Action(object):
+    def __init__(self):
+        self.amActive = False
+        self.runs = 0
+        self.ran = threading.Event()
+
+    def run(self):
+        self.runs += 1
+        self.ran.set()
+
+
+class _Item(generic_queue.QueueItem):
+    def __init__(self, ran):
+        super(_Item, self).__init__('Test')
+        self.ran = ran
+
+    def run(self):
+        self.ran.set()
+        self.finish()
+
+
+class SchedulerTests(test.SickbeardTestDBCase):
+
+    def setUp(self):
+        super(SchedulerTests, self).setUp()
+        self.schedulers = []
+
+    def tearDown(self):
+        for cur_scheduler in self.schedulers:
+            cur_scheduler.stopit()
+            cur_scheduler.join(5)
+        super(SchedulerTests, self).tearDown()
+
+    def _start(self, action, **kwargs):
+        self.schedulers.append(scheduler.Scheduler(action, threadName='TEST', **kwargs))
+        self.schedulers[-1].start()
+        return self.schedulers[-1]
+
+    def test_wakeup(self):
+        action = _Action()
+        cur_scheduler = self._start(action, cycleTime=datetime.timedelta(hours=1),
+                                    run_delay=datetime.timedelta(hours=1))
+        time.sleep(0.2)
+        self.assertEqual(0, action.runs)
+
+        # a forced run does not wait for the cycle time
+        self.assertTrue(cur_scheduler.forceRun())
+        self.assertTrue(action.ran.wait(2))
+        self.assertEqual(1, action.runs)
+        self.assertFalse(cur_scheduler.force)
+
+        # a shorter cycle time is used without waiting for the current cycle time
+        action.ran.clear()
+        cur_scheduler.cycleTime = datetime.timedelta(seconds=0)
+        self.assertTrue(action.ran.wait(2))
+
+        # a stopped scheduler exits without waiting for the cycle time
+        cur_scheduler.cycleTime = datetime.timedelta(hours=1)
+        cur_scheduler.stopit()
+        cur_scheduler.join(2)
+        self.assertFalse(cur_scheduler.is_alive())
+
+    def test_queue_wakeup(self):
+        queue = generic_queue.GenericQueue()
+        cur_scheduler = self._start(queue, cycleTime=datetime.timedelta(seconds=3))
+        self.assertEqual(cur_scheduler.wake, queue.wakeup)
+        time.sleep(0.2)
+        self.assertTrue(queue.is_idle())
+        self.assertEqual(cur_scheduler.idle_queue_wait, cur_scheduler._wait_time())
+
+        # an added item is run without waiting for an idle queue to be checked
+        ran = threading.Event()
+        queue.pause()
+        queue.add_item(_Item(ran), add_to_db=False)
+        self.assertTrue(queue.is_idle())
+        self.assertFalse(ran.wait(0.5))
+        queue.unpause()
+        self.assertTrue(ran.wait(4))
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - Scheduler TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(SchedulerTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
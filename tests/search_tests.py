@@ -2,9 +2,14 @@ import warnings
 warnings.filterwarnings('ignore', module=r'.*fuz.*', message='.*Sequence.*')
 warnings.filterwarnings('ignore', module=r'.*connectionpool.*', message='.*certificate verification.*')
 
+import datetime
+import threading
+import time
 import unittest
 
-from sickgear import properFinder
+from sickgear import db, properFinder, search, search_queue
+from sickgear.common import Quality, ARCHIVED, DOWNLOADED, SKIPPED, UNAIRED, WANTED, WantedQualities
+from sickgear.tv import TVEpisode, TVShow
 
 import sickgear
 import test_lib as test
@@ -25,6 +30,309 @@ class ProperTests(test.SickbeardTestDBCase):
         ])
 
 
+class WantedEpisodesTests(test.SickbeardTestDBCase):
+    def setUp(self):
+        super(WantedEpisodesTests, self).setUp()
+        sickgear.showList = []
+        sickgear.showDict = {}
+        sickgear.WANTEDLIST_CACHE = WantedQualities()
+
+        aired = datetime.date.today() - datetime.timedelta(days=10)
+        future = datetime.date.today() + datetime.timedelta(days=10)
+        episodes = [(1, 1, WANTED, Quality.NONE, aired), (1, 2, DOWNLOADED, Quality.SDTV, aired),
+                    (1, 3, DOWNLOADED, Quality.FULLHDBLURAY, aired), (1, 4, SKIPPED, Quality.NONE, aired),
+                    (2, 1, ARCHIVED, Quality.HDTV, aired), (2, 2, UNAIRED, Quality.NONE, future),
+                    (2, 3, WANTED, Quality.NONE, aired), (0, 1, WANTED, Quality.NONE, aired)]
+        cl = []
+        for prodid, paused in ((701, False), (702, False), (703, True)):
+            show_obj = TVShow(1, prodid, 'en')
+            show_obj.name = 'show %s' % prodid
+            show_obj.quality = Quality.combineQualities([Quality.SDTV, Quality.HDTV], [Quality.FULLHDBLURAY])
+            show_obj.paused = paused
+            show_obj.save_to_db()
+            sickgear.showList.append(show_obj)
+            sickgear.showDict[show_obj.sid_int] = show_obj
+            for season, episode, status, quality, airdate in episodes:
+                ep_obj = TVEpisode(show_obj, season, episode)
+                ep_obj.status = Quality.compositeStatus(status, quality)
+                ep_obj.airdate = airdate
+                ep_obj.scene_season = season
+                ep_obj.name = 'nothing'
+                ep_obj.epid = prodid * 100 + season * 10 + episode
+                cl.append(ep_obj.get_sql())
+        db.DBConnection().mass_action(cl)
+        for cur_show_obj in sickgear.showList:
+            cur_show_obj.sxe_ep_obj = {}
+        # test_lib stubs specify_episode, episodes are reloaded from the db here
+        self._specify_episode = TVEpisode.specify_episode
+        TVEpisode.specify_episode = lambda ep_obj, season, episode, **kwargs: \
+            ep_obj.load_from_db(season, episode, show_result=kwargs.get('show_result'))
+
+    def tearDown(self):
+        TVEpisode.specify_episode = self._specify_episode
+        super(WantedEpisodesTests, self).tearDown()
+
+    @staticmethod
+    def _wanted_keys(wanted_eps):
+        return sorted([(ep_obj.show_obj.prodid, ep_obj.season, ep_obj.episode, tuple(ep_obj.wanted_quality),
+                        ep_obj.eps_aired_in_season, ep_obj.eps_aired_in_scene_season) for ep_obj in wanted_eps])
+
+    def test_wanted_episodes_all(self):
+        from_date = datetime.date.fromordinal(1)
+        for unaired in (False, True):
+            expected = []
+            for cur_show_obj in sickgear.showList:
+                if not cur_show_obj.paused:
+                    expected += search.wanted_episodes(cur_show_obj, from_date, unaired=unaired)
+            for cur_show_obj in sickgear.showList:
+                cur_show_obj.sxe_ep_obj = {}
+
+            result = search.wanted_episodes_all(sickgear.showList, from_date, unaired=unaired)
+            self.assertEqual([701, 702], [cur_show_obj.prodid for cur_show_obj, _ in result])
+            self.assertEqual(self._wanted_keys(expected), self._wanted_keys([ep_obj for _, eps in result
+                                                                             for ep_obj in eps]))
+            # only wanted episodes are instantiated
+            self.assertEqual((3, 4)[unaired], sum([len(eps) for eps in sickgear.showList[0].sxe_ep_obj.values()]))
+
+
+class _FakeResult(object):
+    resultType = 'nzb'
+
+    def __init__(self, provider, ep_obj, quality):
+        self.provider = provider
+        self.ep_obj = ep_obj
+        self.quality = quality
+
+
+class _FakeTorrentResult(_FakeResult):
+    resultType = 'torrent'
+
+    def __init__(self, provider, ep_obj, quality):
+        super(_FakeTorrentResult, self).__init__(provider, ep_obj, quality)
+        self.url = '%s/%s' % (provider.name, ep_obj.name)
+        self.content = None
+
+
+class _FakeProvider(object):
+    enable_recentsearch = True
+
+    def __init__(self, name, delay, found, result_class=_FakeResult, fail_urls=(), skip=False):
+        self.name = name
+        self.delay = delay
+        self.found = found
+        self.result_class = result_class
+        self.fail_urls = fail_urls
+        self.skip = skip
+        self.fetched = []
+        self.fetch_threads = set()
+
+    @staticmethod
+    def is_active():
+        return True
+
+    def search_rss(self, ep_obj_list):
+        time.sleep(self.delay)
+        if None is self.found:
+            raise ValueError('provider failure')
+        return dict([(ep_obj, [self.result_class(self, ep_obj, quality)]) for ep_obj, quality in self.found])
+
+    def get_url(self, url, **kwargs):
+        self.fetched += [url]
+        self.fetch_threads.add(threading.current_thread())
+        return (b'torrent', None)[url in self.fail_urls]
+
+    def should_skip(self):
+        return self.skip
+
+    def save_list(self):
+        pass
+
+
+class _FakeEpisode(object):
+    def __init__(self, name):
+        self.name = name
+        self.show_obj = TVShow(1, 1)
+
+    def pretty_name(self):
+        return self.name
+
+
+class SearchNeededEpisodesTests(test.SickbeardTestDBCase):
+    def setUp(self):
+        super(SearchNeededEpisodesTests, self).setUp()
+        self._sorted_provider_list = sickgear.providers.sortedProviderList
+        self._pick_best_result = search.pick_best_result
+        search.pick_best_result = lambda results, show_obj, **kwargs: results[0]
+
+    def tearDown(self):
+        sickgear.providers.sortedProviderList = self._sorted_provider_list
+        search.pick_best_result = self._pick_best_result
+        super(SearchNeededEpisodesTests, self).tearDown()
+
+    def test_search_for_needed_episodes(self):
+        ep1, ep2, ep3 = ep_objs = [_FakeEpisode('ep %s' % n) for n in range(3)]
+        # providers finish out of order, the first provider in list order keeps an equal quality result
+        providers = [_FakeProvider('p1', 0.2, [(ep1, Quality.SDTV), (ep2, Quality.HDTV)]),
+                     _FakeProvider('p2', 0, [(ep1, Quality.SDTV), (ep2, Quality.FULLHDBLURAY)]),
+                     _FakeProvider('p3', 0.1, None),
+                     _FakeProvider('p4', 0, [(ep1, Quality.HDTV), (ep3, Quality.SDTV)])]
+        sickgear.providers.sortedProviderList = lambda: providers
+
+        for _ in range(2):
+            results = search.search_for_needed_episodes(ep_objs)
+            self.assertEqual({'ep 0': ('p4', Quality.HDTV), 'ep 1': ('p2', Quality.FULLHDBLURAY),
+                              'ep 2': ('p4', Quality.SDTV)},
+                             dict([(r.ep_obj.name, (r.provider.name, r.quality)) for r in results]))
+
+            providers[-1].found = [(ep1, Quality.SDTV)]
+            results = search.search_for_needed_episodes(ep_objs)
+            self.assertEqual({'ep 0': ('p1', Quality.SDTV), 'ep 1': ('p2', Quality.FULLHDBLURAY)},
+                             dict([(r.ep_obj.name, (r.provider.name, r.quality)) for r in results]))
+            providers[-1].found = [(ep1, Quality.HDTV), (ep3, Quality.SDTV)]
+
+        # all providers failed
+        for cur_provider in providers:
+            cur_provider.found = None
+        self.assertEqual([], search.search_for_needed_episodes(ep_objs))
+
+    def test_fetch_taken_torrents(self):
+        ep1, ep2, ep3 = ep_objs = [_FakeEpisode('ep %s' % n) for n in range(3)]
+        providers = [_FakeProvider('p1', 0, [(ep1, Quality.SDTV), (ep2, Quality.HDTV)], _FakeTorrentResult,
+                                   fail_urls=['p1/ep 0']),
+                     _FakeProvider('p2', 0, [(ep1, Quality.SDTV), (ep2, Quality.FULLHDBLURAY)], _FakeTorrentResult),
+                     _FakeProvider('p3', 0, [(ep2, Quality.UHD4KWEB), (ep3, Quality.SDTV)], _FakeTorrentResult,
+                                   skip=True)]
+        sickgear.providers.sortedProviderList = lambda: providers
+        torrent_method = sickgear.TORRENT_METHOD
+        sickgear.TORRENT_METHOD = 'transmission'
+        try:
+            results = search.search_for_needed_episodes(ep_objs)
+        finally:
+            sickgear.TORRENT_METHOD = torrent_method
+
+        # a failed fetch falls back to an equal quality, a provider to skip falls back to a lower quality
+        self.assertEqual({'ep 0': 'p2', 'ep 1': 'p2'},
+                         dict([(r.ep_obj.name, r.provider.name) for r in results]))
+        # a torrent is only fetched for the best result of an episode, and not after a provider is to skip
+        self.assertEqual([['p1/ep 0'], ['p2/ep 0', 'p2/ep 1'], ['p3/ep 1']],
+                         [cur_provider.fetched for cur_provider in providers])
+        # torrents are fetched on the provider pool
+        self.assertNotIn(threading.current_thread(), set.union(*[p.fetch_threads for p in providers]))
+
+
+class _BacklogItem(search_queue.BacklogQueueItem):
+    def __init__(self, show_obj, segment, running):
+        super(_BacklogItem, self).__init__(show_obj, segment)
+        self.done = threading.Event()
+        self.running = running
+
+    def run(self):
+        self.running.append(self)
+        self.done.wait(5)
+        self.finish()
+
+
+class _RecentItem(search_queue.RecentSearchQueueItem):
+    def __init__(self, running):
+        super(_RecentItem, self).__init__()
+        self.running = running
+
+    def run(self):
+        self.running.append(self)
+        self.finish()
+
+
+class SearchQueueTests(test.SickbeardTestDBCase):
+    def setUp(self):
+        super(SearchQueueTests, self).setUp()
+        self._backlog_segments = sickgear.SEARCH_BACKLOG_SEGMENTS
+        sickgear.SEARCH_BACKLOG_SEGMENTS = 2
+
+    def tearDown(self):
+        sickgear.SEARCH_BACKLOG_SEGMENTS = self._backlog_segments
+        super(SearchQueueTests, self).tearDown()
+
+    @staticmethod
+    def _tick(queue, wait=0.1):
+        queue.run()
+        time.sleep(wait)
+
+    def test_backlog_segments_in_flight(self):
+        running = []
+        queue = search_queue.SearchQueue()
+        show_a, show_b = TVShow(1, 801), TVShow(1, 802)
+        items = []
+        for show_obj, episode in ((show_a, 1), (show_a, 2), (show_b, 1)):
+            ep_obj = TVEpisode(show_obj, 1, episode)
+            ep_obj.epid = show_obj.prodid * 10 + episode
+            items.append(_BacklogItem(show_obj, [ep_obj], running))
+        recent = _RecentItem(running)
+        for cur_item in items:
+            queue.add_item(cur_item, add_to_db=False)
+        self._tick(queue)
+        # the second segment of show a waits for the first, the segment of show b runs alongside
+        self.assertEqual([items[0], items[2]], running)
+        self.assertTrue(queue.is_backlog_in_progress())
+        self.assertEqual(3, len(queue.queue_length()['backlog']))
+
+        queue.add_item(recent, add_to_db=False)
+        items[0].done.set()
+        self._tick(queue)
+        self._tick(queue)
+        # a recent search waits for all backlog items to finish
+        self.assertEqual([items[0], items[2]], running)
+        items[2].done.set()
+        for _ in range(3):
+            self._tick(queue)
+        self.assertEqual([items[0], items[2], recent, items[1]], running)
+        items[1].done.set()
+        self._tick(queue)
+        self._tick(queue)
+        self.assertFalse(queue.is_backlog_in_progress())
+
+
+class _LockProvider(object):
+    def __init__(self, name):
+        self.name = name
+        self.active = 0
+        self.most_active = 0
+        self.searches = 0
+
+    def get_id(self):
+        return self.name
+
+    @staticmethod
+    def should_skip():
+        return False
+
+
+class ProviderPoolTests(unittest.TestCase):
+    def setUp(self):
+        self._search_provider_thread = search._search_provider_thread
+        search._search_provider_thread = self._fake_search
+
+    def tearDown(self):
+        search._search_provider_thread = self._search_provider_thread
+
+    @staticmethod
+    def _fake_search(provider, **kwargs):
+        provider.active += 1
+        provider.most_active = max(provider.most_active, provider.active)
+        time.sleep(0.05)
+        provider.searches += 1
+        provider.active -= 1
+
+    def test_provider_search_limit(self):
+        providers = [_LockProvider('p1'), _LockProvider('p2')]
+        pool = search.get_provider_pool()
+        futures = [pool.submit(search._search_provider_task, cur_provider, 'TEST')
+                   for _ in range(3) for cur_provider in providers]
+        for cur_future in futures:
+            cur_future.result()
+        self.assertEqual([3, 3], [cur_provider.searches for cur_provider in providers])
+        self.assertEqual([1, 1], [cur_provider.most_active for cur_provider in providers])
+        self.assertIs(pool, search.get_provider_pool())
+
 if '__main__' == __name__:
     suite = unittest.TestLoader().loadTestsFromTestCase(ProperTests)
     unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,119 @@
+# coding=utf-8
+import warnings
+warnings.filterwarnings('ignore', module=r'.*fuz.*', message='.*Sequence.*')
+
+import datetime
+import unittest
+import test_lib as test
+
+import sys
+import os.path
+sys.path.insert(1, os.path.abspath('..'))
+
+from sickgear import show_stats
+from sickgear.common import DOWNLOADED, FAILED, IGNORED, SKIPPED, SNATCHED, UNAIRED, WANTED, Quality
+
+
+class ShowStatsTests(test.SickbeardTestDBCase):
+
+    def setUp(self):
+        super(ShowStatsTests, self).setUp()
+        show_stats.show_stats.clear()
+        self.today = datetime.date.today().toordinal()
+        snatched = Quality.compositeStatus(SNATCHED, Quality.HDTV)
+        downloaded = Quality.compositeStatus(DOWNLOADED, Quality.HDTV)
+        # tvid, season, episode, status, airdate
+        self.episodes = [
+            (1, 1, 1, snatched, self.today - 10), (1, 1, 2, downloaded, self.today - 5),
+            (1, 1, 3, WANTED, self.today - 1), (1, 1, 4, SKIPPED, 1), (1, 1, 5, WANTED, self.today + 3),
+            (1, 1, 6, UNAIRED, self.today + 1), (1, 0, 1, UNAIRED, self.today), (1, 1, 7, IGNORED, self.today - 2),
+            (1, 1, 8, downloaded, 1), (1, 1, 9, FAILED, self.today),
+            (3, 2, 1, downloaded, self.today - 3)]
+        my_db = test.db.DBConnection()
+        my_db.mass_action([['INSERT INTO tv_episodes (indexer, showid, season, episode, status, airdate)'
+                            ' VALUES (?,1,?,?,?,?)', list(cur_ep)] for cur_ep in self.episodes])
+
+    def _db_show_stat(self, tvid):
+        # the query that stats replace
+        status_quality = ','.join([str(x) for x in Quality.SNATCHED_ANY])
+        status_download = ','.join([str(x) for x in Quality.DOWNLOADED + Quality.ARCHIVED])
+        status_total = '%s, %s, %s' % (SKIPPED, WANTED, FAILED)
+        return dict(test.db.DBConnection().select(
+            'SELECT '
+            + '(SELECT COUNT(*) FROM tv_episodes'
+              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
+              ' AND season > 0 AND episode > 0 AND airdate > 1 AND status IN (%s)) AS ep_snatched,'
+              ' (SELECT COUNT(*) FROM tv_episodes'
+              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
+              ' AND season > 0 AND episode > 0 AND airdate > 1 AND status IN (%s)) AS ep_downloaded,'
+              ' (SELECT COUNT(*) FROM tv_episodes'
+              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
+              ' AND season > 0 AND episode > 0 AND airdate > 1'
+              ' AND ('
+              '(airdate <= %s AND (status IN (%s)))'
+              ' OR (status IN (%s)) OR (status IN (%s)))) AS ep_total,'
+              ' (SELECT airdate FROM tv_episodes'
+              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
+              ' AND airdate >= %s AND (status = %s  OR status = %s)'
+              ' ORDER BY airdate ASC LIMIT 1) AS ep_airs_next'
+              ' FROM tv_episodes tv_eps WHERE indexer = ? GROUP BY indexer, showid'
+            % (status_quality, status_download, self.today, status_total,
+               status_quality, status_download, self.today, UNAIRED, WANTED), [tvid])[0])
+
+    def _show_stat(self, tvid):
+        stats = show_stats.get_show_stats()[(tvid, 1)]
+        return dict(zip(('ep_snatched', 'ep_downloaded', 'ep_total'), stats.episode_counts(self.today)),
+                    ep_airs_next=stats.next_airdate((UNAIRED, WANTED), self.today))
+
+    def test_stats(self):
+        self.assertEqual(self._db_show_stat(1), self._show_stat(1))
+        self.assertEqual(dict(ep_snatched=1, ep_downloaded=1, ep_total=4, ep_airs_next=self.today),
+                         self._show_stat(1))
+        self.assertEqual(self._db_show_stat(3), self._show_stat(3))
+
+        stats = show_stats.get_show_stats()
+        all_stats = list(stats.values())
+        today = str(self.today)
+        my_db = test.db.DBConnection()
+        self.assertEqual(my_db.select(
+            'SELECT COUNT(*) FROM tv_episodes WHERE status IN (' + ','.join(
+                [str(status) for status in Quality.DOWNLOADED + Quality.ARCHIVED])
+            + ') AND season != 0 and episode != 0 AND airdate <= ' + today)[0][0],
+            show_stats.sum_count(all_stats, groups=('downloaded',), until=self.today))
+        self.assertEqual(my_db.select(
+            'SELECT COUNT(*) FROM tv_episodes WHERE season != 0 AND episode != 0 AND (airdate != 1 OR status IN ('
+            + ','.join([str(status) for status in Quality.SNATCHED_ANY + Quality.DOWNLOADED + Quality.ARCHIVED])
+            + ')) AND airdate <= ' + today + ' AND status != ' + str(IGNORED))[0][0],
+            show_stats.sum_count(all_stats, groups=('snatched', 'downloaded'), until=1)
+            + show_stats.sum_count(all_stats, after=1, until=self.today)
+            - show_stats.sum_count(all_stats, groups=(IGNORED,), after=1, until=self.today))
+        self.assertEqual(self.today + 1, stats[(1, 1)].next_airdate((UNAIRED, WANTED, FAILED), self.today + 1))
+        self.assertIsNone(stats[(1, 1)].next_airdate((UNAIRED, WANTED), self.today + 4))
+
+    def test_changes(self):
+        stats = show_stats.get_show_stats()
+        my_db = test.db.DBConnection()
+        my_db.action('UPDATE tv_episodes SET name = ? WHERE indexer = 1', ['name'])
+        # other changes keep the loaded stats
+        self.assertIs(stats[(1, 1)], show_stats.get_show_stats()[(1, 1)])
+
+        my_db.action('UPDATE tv_episodes SET status = ? WHERE indexer = 1 AND season = 1 AND episode = 3',
+                     [Quality.compositeStatus(DOWNLOADED, Quality.HDTV)])
+        stats = show_stats.get_show_stats()
+        self.assertEqual(self._db_show_stat(1), self._show_stat(1))
+        self.assertEqual(2, self._show_stat(1)['ep_downloaded'])
+
+        my_db.action('DELETE FROM tv_episodes WHERE indexer = 3')
+        self.assertEqual(0, show_stats.get_show_stats()[(3, 1)].count())
+        my_db.action('DELETE FROM tv_show_stats WHERE indexer = 3')
+        self.assertNotIn((3, 1), show_stats.get_show_stats())
+        self.assertIs(stats[(1, 1)], show_stats.get_show_stats()[(1, 1)])
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - Show Stats TESTS')
+    print('==================')
+    print('######################################################################')
+    suite = unittest.TestLoader().loadTestsFromTestCase(ShowStatsTests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
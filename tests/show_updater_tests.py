@@ -0,0 +1,140 @@
+# coding=utf-8
+import warnings
+warnings.filterwarnings('ignore', module=r'.*fuz.*', message='.*Sequence.*')
+
+import threading
+import time
+import unittest
+import test_lib as test
+
+import sys
+import os.path
+sys.path.insert(1, os.path.abspath('..'))
+
+from sickgear import scene_exceptions, scene_numbering, show_queue, show_updater
+
+
+class _Show(object):
+    def __init__(self, tvid, prodid):
+        self.tvid = tvid
+        self.prodid = prodid
+        self.unique_name = '%s:%s' % (tvid, prodid)
+
+
+class _UpkeepShow(_Show):
+    def __init__(self, tvid, prodid):
+        super(_UpkeepShow, self).__init__(tvid, prodid)
+        self.name = self.tvid_prodid = self.unique_name
+        self.done = []
+
+    def refresh_dir(self):
+        self.done.append('refresh_dir')
+
+    def write_metadata(self, force=False):
+        self.done.append(('write_metadata', force))
+
+    def populate_cache(self, force=False):
+        self.done.append(('populate_cache', force))
+
+
+class _QueueItem(object):
+    def __init__(self):
+        self.inProgress = False
+        self.ident = None
+
+
+class _Prefetch(show_updater.TVInfoPrefetch):
+    limits = {1: (2, 0.0), 3: (1, 0.2)}
+
+    def __init__(self, window):
+        super(_Prefetch, self).__init__(window)
+        self.fetches = []
+        self.running = {}
+        self.max_running = {}
+        self.fetch_lock = threading.Lock()
+
+    @staticmethod
+    def src_limits(tvid):
+        return _Prefetch.limits[tvid]
+
+    def _get_show(self, show_obj):
+        with self.fetch_lock:
+            self.fetches.append((show_obj.tvid, show_obj.prodid, time.time()))
+            self.running[show_obj.tvid] = self.running.get(show_obj.tvid, 0) + 1
+            self.max_running[show_obj.tvid] = max(self.max_running.get(show_obj.tvid, 0),
+                                                  self.running[show_obj.tvid])
+        time.sleep(0.1)
+        with self.fetch_lock:
+            self.running[show_obj.tvid] -= 1
+
+
+class TVInfoPrefetchTests(test.SickbeardTestDBCase):
+
+    def test_source_limits(self):
+        update_list = [(_Show(tvid, prodid), _QueueItem()) for prodid in range(1, 5) for tvid in (1, 3)]
+        prefetch = _Prefetch(window=len(update_list))
+        prefetch.run(update_list)
+
+        self.assertEqual(len(update_list), prefetch.fetched)
+        self.assertEqual({1: 2, 3: 1}, prefetch.max_running)
+        src_3_times = [cur_time for cur_tvid, _, cur_time in prefetch.fetches if 3 == cur_tvid]
+        for cur_time, next_time in zip(src_3_times, src_3_times[1:]):
+            self.assertLessEqual(0.19, next_time - cur_time)
+
+    def test_window(self):
+        update_list = [(_Show(1, prodid), _QueueItem()) for prodid in range(1, 7)]
+        # the update of a show started before its prefetch does not need prefetched data
+        update_list[3][1].ident = 1
+        prefetch = _Prefetch(window=2)
+        prefetch_task = threading.Thread(target=prefetch.run, args=(update_list,))
+        prefetch_task.start()
+        try:
+            time.sleep(0.5)
+            self.assertEqual([1, 2], [cur_prodid for _, cur_prodid, _ in prefetch.fetches])
+
+            # prefetch continues as the queue starts items
+            update_list[0][1].inProgress = True
+            time.sleep(1.5)
+            self.assertEqual([1, 2, 3], [cur_prodid for _, cur_prodid, _ in prefetch.fetches])
+        finally:
+            for _, cur_queue_item in update_list:
+                cur_queue_item.ident = 1
+            prefetch_task.join(5)
+        self.assertFalse(prefetch_task.is_alive())
+
+        prefetch = _Prefetch(window=2)
+        prefetch.stop.set()
+        prefetch.run([(_Show(1, 1), _QueueItem())])
+        self.assertEqual([], prefetch.fetches)
+
+
+class ShowUpkeepTests(test.SickbeardTestDBCase):
+
+    def test_dir_unchanged(self):
+        show_obj = _UpkeepShow(1, 701)
+        xem_refresh = scene_numbering.xem_refresh
+        refreshed = []
+        scene_numbering.xem_refresh = lambda tvid, prodid, *args, **kwargs: refreshed.append((tvid, prodid))
+        scene_exceptions.xem_ids_list[1].append(701)
+        try:
+            # the show dir of a show unchanged at source and on disk is not scanned, but upkeep is done
+            show_queue.QueueItemRefresh(show_obj, scheduled_update=True, dir_unchanged=True).run()
+            self.assertEqual([('write_metadata', False), ('populate_cache', False)], show_obj.done)
+            self.assertEqual([(1, 701)], refreshed)
+
+            show_obj.done = []
+            show_queue.QueueItemRefresh(show_obj, scheduled_update=True).run()
+            self.assertEqual('refresh_dir', show_obj.done[0])
+        finally:
+            scene_numbering.xem_refresh = xem_refresh
+            scene_exceptions.xem_ids_list[1].remove(701)
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - Show Updater TESTS')
+    print('==================')
+    print('######################################################################')
+    for cur_case in (TVInfoPrefetchTests, ShowUpkeepTests):
+        suite = unittest.TestLoader().loadTestsFromTestCase(cur_case)
+        unittest.TextTestRunner(verbosity=2).run(suite)
@@ -23,7 +23,11 @@ from random import  randint
 
 import datetime
 import copy
+import os
+import shutil
+import tempfile
 import sickgear
+from sickgear.common import DOWNLOADED, Quality
 from sickgear.tv import TVEpisode, TVShow, TVidProdid, prodid_bitshift
 from exceptions_helper import ex, MultipleShowObjectsException
 from sickgear.helpers import find_show_by_id
@@ -75,6 +79,41 @@ class TVShowTests(test.SickbeardTestDBCase):
         show_obj.load_from_db()
         self.assertEqual(show_obj.name, 'newName')
 
+    def test_delta_update(self):
+        show_obj = TVShow(1, 1, 'en')
+        self.assertFalse(show_obj.is_src_unchanged(100))
+        show_obj._src_update_time = 100
+        self.assertFalse(show_obj.is_src_unchanged(None))
+        self.assertTrue(show_obj.is_src_unchanged(100))
+        self.assertFalse(show_obj.is_src_unchanged(101))
+
+        show_dir = tempfile.mkdtemp()
+        try:
+            show_obj._location = os.path.join(show_dir, 'missing')
+            self.assertIsNone(show_obj.get_dir_mtime())
+
+            show_obj._location = show_dir
+            season_dir = os.path.join(show_dir, 'Season 1')
+            os.mkdir(season_dir)
+            os.utime(show_dir, (1000, 1000))
+            os.utime(season_dir, (2000, 2000))
+            self.assertEqual(2000, show_obj.get_dir_mtime())
+            # a file in a show folder changes the time
+            with open(os.path.join(season_dir, 'file.mkv'), 'w'):
+                pass
+            os.utime(season_dir, (3000, 3000))
+            self.assertEqual(3000, show_obj.get_dir_mtime())
+        finally:
+            shutil.rmtree(show_dir)
+
+        sql = 'SELECT dir_mtime FROM show_updates WHERE indexer = ? AND indexer_id = ?'
+        my_db = test.db.DBConnection('cache.db')
+        show_obj.save_dir_mtime(3000)
+        show_obj.save_dir_mtime(4000)
+        self.assertEqual([4000], [cur_result['dir_mtime'] for cur_result in my_db.select(sql, [1, 1])])
+        show_obj.save_dir_mtime(None)
+        self.assertEqual([], my_db.select(sql, [1, 1]))
+
 
 class TVEpisodeTests(test.SickbeardTestDBCase):
 
@@ -91,6 +130,110 @@ class TVEpisodeTests(test.SickbeardTestDBCase):
         ep_obj.load_from_db(1, 1)
         self.assertEqual(ep_obj.name, 'asdasdasdajkaj')
 
+    def test_episodes_sql(self):
+        show_obj = TVShow(1, 1, 'en')
+        ep_obj_list = []
+        for episode in range(1, 4):
+            ep_obj = TVEpisode(show_obj, 1, episode)
+            ep_obj.name = 'episode %s' % episode
+            ep_obj_list.append(ep_obj)
+        ep_obj_list[0].save_to_db(force_save=True)
+        ep_obj_list[1].save_to_db(force_save=True)
+        ep_obj_list[1].name = 'changed'
+
+        my_db = test.db.DBConnection()
+        sql = 'SELECT * FROM tv_episodes WHERE indexer = ? AND showid = ? ORDER BY episode'
+        db_rows = dict([((cur_row['season'], cur_row['episode']), cur_row) for cur_row in my_db.select(sql, [1, 1])])
+        queries = show_obj.get_episodes_sql(
+            [(ep_obj.season, ep_obj.episode, ep_obj.get_db_values()) for ep_obj in ep_obj_list], db_rows)
+        # only the changed and the new episode are written
+        self.assertEqual([1, 1], [len(cur_args) for _, cur_args in queries])
+        self.assertEqual(2, my_db.mass_action_many(queries))
+        self.assertEqual(['episode 1', 'changed', 'episode 3'],
+                         [cur_row['name'] for cur_row in my_db.select(sql, [1, 1])])
+        self.assertEqual([db_rows[(1, 1)]['episode_id'], db_rows[(1, 2)]['episode_id']],
+                         [cur_row['episode_id'] for cur_row in my_db.select(sql, [1, 1])][0:2])
+
+    def test_episode_records(self):
+        show_obj = TVShow(1, 1, 'en')
+        for season, episode, airdate in ((0, 1, 2), (1, 1, 5), (1, 2, 9)):
+            ep_obj = TVEpisode(show_obj, season, episode)
+            ep_obj.airdate = datetime.date.fromordinal(700000 + airdate)
+            ep_obj.status = Quality.compositeStatus(DOWNLOADED, Quality.HDTV)
+            ep_obj.save_to_db(force_save=True)
+        show_obj.flush_episodes()
+
+        ep_records = show_obj.get_episode_records(season=1)
+        self.assertEqual([(1, 1), (1, 2)], [(rec.season, rec.episode) for rec in ep_records])
+        self.assertEqual(Quality.HDTV, ep_records[0].quality)
+        self.assertEqual(datetime.date.fromordinal(700005), ep_records[0].airdate)
+        # the first regular episode is the only episode object created
+        self.assertIsNone(show_obj.get_episode(1, 2, no_create=True))
+        ep_obj = show_obj.first_aired_regular_episode
+        self.assertEqual((1, 1), (ep_obj.season, ep_obj.episode))
+        self.assertIs(ep_obj, ep_records[0].get_episode())
+        self.assertIsNone(show_obj.get_episode(1, 2, no_create=True))
+
+    def test_related_episodes(self):
+        show_obj = TVShow(1, 1, 'en')
+        for epid, (season, episode, location) in enumerate(
+                ((1, 1, 'a.mkv'), (1, 2, 'a.mkv'), (1, 3, 'a.mkv'), (1, 4, 'b.mkv'), (2, 1, 'a.mkv'), (2, 2, ''))):
+            ep_obj = show_obj.get_episode(season, episode)
+            ep_obj.tvid, ep_obj.epid, ep_obj.location = 1, 1 + epid, location
+            ep_obj.save_to_db(force_save=True)
+
+        ep_obj_list = show_obj.get_all_episodes()
+        self.assertEqual([[2, 3], [1, 3], [1, 2], [], [], []],
+                         [[rel.episode for rel in ep_obj.related_ep_obj] for ep_obj in ep_obj_list])
+        self.assertIs(ep_obj_list[1], ep_obj_list[0].related_ep_obj[0])
+        self.assertEqual([[], []], [ep_obj.related_ep_obj for ep_obj in show_obj.get_all_episodes(
+            season=1, check_related_eps=False)][2:4])
+
+    def test_episode_cache(self):
+        cache_size = sickgear.EPISODE_CACHE_SIZE
+        sickgear.EPISODE_CACHE_SIZE = 2
+        try:
+            show_obj = TVShow(1, 1, 'en')
+            ep_obj_list = []
+            for cur_ep in range(1, 6):
+                # objects with unsaved changes are kept, others are as if loaded from db
+                ep_obj_list.append(show_obj.get_episode(1, cur_ep))
+                ep_obj_list[-1].dirty = 3 == cur_ep
+            ep_obj, busy_ep_obj = ep_obj_list[0], ep_obj_list[2]
+            del ep_obj_list
+            # the least recently used idle objects are released
+            self.assertEqual([None, None], [show_obj.sxe_ep_obj[1][cur_ep] for cur_ep in (1, 2)])
+            self.assertIs(busy_ep_obj, show_obj.sxe_ep_obj[1][3])
+            # a released object still referenced elsewhere is reused
+            self.assertIs(ep_obj, show_obj.get_episode(1, 1, no_create=True))
+            self.assertIs(ep_obj, show_obj.sxe_ep_obj[1][1])
+            self.assertIsNone(show_obj.get_episode(1, 2, no_create=True))
+        finally:
+            sickgear.EPISODE_CACHE_SIZE = cache_size
+
+    def test_episode_cache_release(self):
+        show_obj = TVShow(1, 1, 'en')
+        ep_obj = show_obj.get_episode(1, 1)
+
+        class _ReleasingDict(dict):
+            # the episode cache of another thread releases the object right after the first read
+            def _release(self, value):
+                if None is not value and None is self.released:
+                    self.released = value
+                    show_obj.released_ep_obj[(value.season, value.episode)] = value
+                    dict.__setitem__(self, value.episode, None)
+                return value
+
+            def __getitem__(self, key):
+                return self._release(dict.__getitem__(self, key))
+
+            def get(self, key, default=None):
+                return self._release(dict.get(self, key, default))
+
+        show_obj.sxe_ep_obj[1] = _ReleasingDict(show_obj.sxe_ep_obj[1])
+        show_obj.sxe_ep_obj[1].released = None
+        self.assertIs(ep_obj, show_obj.get_episode(1, 1))
+
 
 class TVTests(test.SickbeardTestDBCase):
 
@@ -268,6 +411,28 @@ class TVFindTests(test.SickbeardTestDBCase):
                                  msg='error finding show (%s) with para: %s' %
                                      (show_test.get('description'), show_test['para']))
 
+    def test_find_show_by_mapped_id(self):
+        find_para = dict(no_mapped_ids=False, check_multishow=True)
+        show_obj = find_show_by_id({TVINFO_TVMAZE: 22}, **find_para)
+        self.assertEqual((TVINFO_TVDB, 123), (show_obj.tvid, show_obj.prodid))
+        self.assertTrue((TVINFO_TVMAZE, 22) in sickgear.showMappedIds)
+
+        # a changed mapping is indexed when set
+        ids = copy.deepcopy(show_obj.ids)
+        ids[TVINFO_TVMAZE]['id'] = 854
+        show_obj.ids = ids
+        self.assertEqual(None, find_show_by_id({TVINFO_TVMAZE: 22}, **find_para))
+        self.assertRaises(MultipleShowObjectsException, find_show_by_id, {TVINFO_TVMAZE: 854}, **find_para)
+
+        # a mapping changed in place is not returned for the old id
+        show_obj.ids[TVINFO_IMDB]['id'] = 0
+        self.assertEqual(None, find_show_by_id({TVINFO_IMDB: 54321}, **find_para))
+
+        del sickgear.showDict[show_obj.sid_int]
+        sickgear.helpers.unindex_show_mapped_ids(show_obj.sid_int)
+        show_obj = find_show_by_id({TVINFO_TVMAZE: 854}, **find_para)
+        self.assertEqual((TVINFO_TVDB, 222), (show_obj.tvid, show_obj.prodid))
+
 
 if '__main__' == __name__:
     print('==================')
@@ -0,0 +1,232 @@
+import warnings
+warnings.filterwarnings('ignore', module=r'.*fuz.*', message='.*Sequence.*')
+
+import datetime
+import glob
+import os
+import unittest
+
+from sickgear import classes, db, indexermapper, tvcache
+from sickgear.common import Quality
+from sickgear.databases import cache_db
+from sickgear.indexers.indexer_api import TVInfoAPI
+from sickgear.name_parser.parser import NameParser
+from sickgear.tv import TVShow
+
+import sickgear
+import test_lib as test
+
+sickgear.SYS_ENCODING = 'UTF-8'
+
+
+class _FakeProvider(object):
+    anime_only = False
+
+    @staticmethod
+    def get_id():
+        return 'fakeprovider'
+
+    @staticmethod
+    def get_result(ep_obj_list, url):
+        result = classes.NZBSearchResult(ep_obj_list)
+        result.url = url
+        return result
+
+
+class _TVCache(tvcache.TVCache):
+    @staticmethod
+    def get_db():
+        return db.DBConnection('cache.db')
+
+
+class _FakeShow(object):
+    def __init__(self, tvid, prodid):
+        self.tvid = tvid
+        self.prodid = prodid
+
+
+class _FakeEpisode(object):
+    name = None
+
+    def __init__(self, show_obj, season, episode, wanted_quality):
+        self.show_obj = show_obj
+        self.season = season
+        self.episode = episode
+        self.wanted_quality = wanted_quality
+
+
+class CacheDbUpgradeTests(test.SickbeardTestDBCase):
+    def setUp(self):
+        super(CacheDbUpgradeTests, self).setUp()
+        self.db_file = os.path.join(test.TESTDIR, 'cache_upgrade.db')
+
+    def tearDown(self):
+        db.DBConnection('cache_upgrade.db').close()
+        # the db, its journal and the backups made by the upgrade
+        for cur_file in glob.glob(self.db_file + '*'):
+            os.remove(cur_file)
+        super(CacheDbUpgradeTests, self).tearDown()
+
+    def test_upgrade_from_v7(self):
+        my_db = db.DBConnection('cache_upgrade.db')
+        for cur_class in (cache_db.InitialSchema, cache_db.ConsolidateProviders, cache_db.AddBacklogParts,
+                          cache_db.AddProviderFailureHandling, cache_db.AddIndexerToTables,
+                          cache_db.AddGenericFailureHandling, cache_db.AddSaveQueues):
+            cur_class(my_db).execute()
+        self.assertEqual(7, my_db.checkDBVersion())
+        my_db.action('INSERT INTO provider_cache (provider, name, season, episodes, indexerid, url, indexer)'
+                     ' VALUES (?,?,?,?,?,?,?)', ['fakeprovider', 'Show.Name.S01E01', 1, '|1|', 701, 'url1', 1])
+
+        db.upgradeDatabase(my_db, cache_db.InitialSchema)
+        self.assertEqual(cache_db.MAX_DB_VERSION, my_db.checkDBVersion())
+        # entries are cleared as they have no episode index
+        self.assertEqual(0, my_db.select('SELECT COUNT(*) AS num FROM provider_cache')[0]['num'])
+        self.assertTrue(my_db.hasTable('provider_cache_episodes'))
+        for cur_column in ('extra_info', 'is_repack', 'proper_level'):
+            self.assertTrue(my_db.hasColumn('provider_cache', cur_column))
+        self.assertEqual(['idx_provider_cache', 'idx_provider_cache_episodes', 'idx_provider_cache_episodes_url',
+                          'provider_cache_episodes_delete'],
+                         sorted([cur_row['name'] for cur_row in my_db.select(
+                             'SELECT name FROM sqlite_master WHERE type IN (\'index\', \'trigger\')'
+                             ' AND tbl_name IN (\'provider_cache\', \'provider_cache_episodes\')'
+                             ' AND name NOT LIKE \'sqlite_%\'')]))
+
+
+class TVCacheTests(test.SickbeardTestDBCase):
+    def setUp(self):
+        super(TVCacheTests, self).setUp()
+        sickgear.showList = []
+        sickgear.showDict = {}
+        indexermapper.indexer_list = [i for i in TVInfoAPI().all_sources]
+        self.show_objs = []
+        for prodid, name in ((701, 'Show Name'), (702, 'Other Show')):
+            show_obj = TVShow(1, prodid, 'en')
+            show_obj.name = name
+            show_obj.ids = {1: {'id': prodid, 'status': indexermapper.MapStatus.SOURCE,
+                                'date': datetime.date.today()}}
+            show_obj.quality = Quality.combineQualities([Quality.SDTV, Quality.HDTV], [])
+            show_obj.want_episode = lambda *args, **kwargs: True
+            show_obj.get_episode = lambda season, episode, _show_obj=show_obj: _FakeEpisode(
+                _show_obj, season, episode, [])
+            sickgear.showList.append(show_obj)
+            sickgear.showDict[show_obj.sid_int] = show_obj
+            self.show_objs.append(show_obj)
+        self.cache = _TVCache(_FakeProvider())
+        self.my_db = self.cache.get_db()
+
+    def tearDown(self):
+        sickgear.showList = []
+        sickgear.showDict = {}
+        super(TVCacheTests, self).tearDown()
+
+    def _add(self, name, url, show_obj):
+        parse_result = NameParser(show_obj=show_obj, convert=True, indexer_lookup=False).parse(name)
+        self.my_db.mass_action(self.cache.add_cache_entry(name, url, parse_result=parse_result))
+        return parse_result
+
+    def _episodes(self, url):
+        return [cur_row['episode'] for cur_row in self.my_db.select(
+            'SELECT episode FROM provider_cache_episodes WHERE url = ? ORDER BY episode', [url])]
+
+    def test_add_cache_entry(self):
+        parse_result = self._add('Show.Name.S01E02E03.PROPER.720p.HDTV.x264-GRP', 'url1', self.show_objs[0])
+
+        sql_result = self.my_db.select('SELECT * FROM provider_cache WHERE url = ?', ['url1'])
+        self.assertEqual(1, len(sql_result))
+        self.assertEqual(('fakeprovider', 1, 701, 1, '|2|3|', str(Quality.HDTV), 'GRP'),
+                         tuple([sql_result[0][k] for k in ('provider', 'indexer', 'indexerid', 'season', 'episodes',
+                                                           'quality', 'release_group')]))
+        self.assertEqual((parse_result.extra_info_no_name(), 0, 1),
+                         tuple([sql_result[0][k] for k in ('extra_info', 'is_repack', 'proper_level')]))
+        # each episode of a multi episode entry is indexed
+        self.assertEqual([2, 3], self._episodes('url1'))
+
+        # the episode index follows deleted entries
+        self.my_db.action('DELETE FROM provider_cache WHERE url = ?', ['url1'])
+        self.assertEqual([], self._episodes('url1'))
+
+    def test_add_cache_entries(self):
+        parse_many = NameParser.parse_many
+        parsed = []
+
+        def _parse_many(parser, names, *args, **kwargs):
+            parsed.append((getattr(parser.show_obj, 'prodid', None), names))
+            return parse_many(parser, names, *args, **kwargs)
+
+        NameParser.parse_many = _parse_many
+        try:
+            cl = self.cache.add_cache_entries([
+                ('Show.Name.S01E01.720p.HDTV.x264-GRP', 'url1', '1:701'),
+                ('Other.Show.S02E01.720p.HDTV.x264-GRP', 'url2', {1: 702}),
+                ('Show.Name.S01E02.720p.HDTV.x264-GRP', 'url3', '1:701'),
+                ('not a release', 'url4', '1:701')])
+        finally:
+            NameParser.parse_many = parse_many
+
+        # one batch per show
+        self.assertEqual([(701, ['Show.Name.S01E01.720p.HDTV.x264-GRP', 'Show.Name.S01E02.720p.HDTV.x264-GRP',
+                                 'not a release']),
+                          (702, ['Other.Show.S02E01.720p.HDTV.x264-GRP'])], parsed)
+        self.my_db.mass_action(cl)
+        self.assertEqual([('url1', 701, 1), ('url2', 702, 2), ('url3', 701, 1)],
+                         [(cur_row['url'], cur_row['indexerid'], cur_row['season']) for cur_row in self.my_db.select(
+                             'SELECT url, indexerid, season FROM provider_cache ORDER BY url')])
+
+    def test_select_needed(self):
+        show_obj = _FakeShow(1, 701)
+        cl = []
+        ep_obj_list = []
+        # enough seasons and episodes to need more than one query within the sql variable limit,
+        # and a season with too many episodes for a single query
+        for season, episodes in [(cur_season, range(1, 4)) for cur_season in range(1, 302)] + [(500, range(1, 2001))]:
+            for episode in episodes:
+                url = 'url-%s-%s' % (season, episode)
+                quality = (Quality.SDTV, Quality.FULLHDBLURAY)[3 == episode and 500 != season]
+                cl += [['INSERT INTO provider_cache (provider, name, season, episodes, indexerid, url, quality,'
+                        ' indexer) VALUES (?,?,?,?,?,?,?,?)',
+                        ['fakeprovider', url, season, '|%s|' % episode, 701, url, quality, 1]],
+                       ['INSERT INTO provider_cache_episodes (provider, indexer, indexerid, season, episode, url)'
+                        ' VALUES (?,?,?,?,?,?)', ['fakeprovider', 1, 701, season, episode, url]]]
+                ep_obj_list.append(_FakeEpisode(show_obj, season, episode, [Quality.SDTV]))
+        # an entry of another provider
+        cl += [['INSERT INTO provider_cache_episodes (provider, indexer, indexerid, season, episode, url)'
+                ' VALUES (?,?,?,?,?,?)', ['otherprovider', 1, 701, 1, 1, 'other-url']]]
+        self.my_db.mass_action(cl)
+        self.assertTrue(900 < len(ep_obj_list))
+
+        num_params = []
+        select = self.my_db.select
+        self.my_db.select = lambda query, args=None: num_params.append(len(args)) or select(query, args)
+        sql_result = self.cache._select_needed(self.my_db, ep_obj_list)
+        self.assertTrue(3 < len(num_params))
+        self.assertTrue(all(900 >= cur_num for cur_num in num_params))
+        # episode 3 of each season has an unwanted quality
+        self.assertEqual(sorted(['url-%s-%s' % (season, episode) for season in range(1, 302) for episode in (1, 2)]
+                                + ['url-500-%s' % episode for episode in range(1, 2001)]),
+                         sorted([cur_row['url'] for cur_row in sql_result]))
+
+    def test_find_needed_episodes(self):
+        show_obj = self.show_objs[0]
+        self._add('Show.Name.S01E01.720p.HDTV.x264-GRP', 'url1', show_obj)
+        # a stored proper level is used as is, it is not taken from the name again
+        self.my_db.action('UPDATE provider_cache SET is_repack = 1, proper_level = 2 WHERE url = ?', ['url1'])
+        # an entry cached before the proper level was stored is parsed
+        self._add('Show.Name.S01E02.REPACK.720p.HDTV.x264-GRP', 'url2', show_obj)
+        self.my_db.action('UPDATE provider_cache SET extra_info = NULL, is_repack = NULL, proper_level = NULL'
+                          ' WHERE url = ?', ['url2'])
+
+        needed_eps = self.cache.findNeededEpisodes([_FakeEpisode(show_obj, 1, episode, [Quality.HDTV])
+                                                    for episode in (1, 2)])
+        self.assertEqual({'url1': (True, 2), 'url2': (True, 1)},
+                         dict([(cur_result.url, (cur_result.is_repack, cur_result.properlevel))
+                               for results in needed_eps.values() for cur_result in results]))
+
+
+if '__main__' == __name__:
+    print('==================')
+    print('STARTING - TV Cache TESTS')
+    print('==================')
+    print('######################################################################')
+    for cur_case in (CacheDbUpgradeTests, TVCacheTests):
+        suite = unittest.TestLoader().loadTestsFromTestCase(cur_case)
+        unittest.TextTestRunner(verbosity=2).run(suite)
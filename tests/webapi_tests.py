@@ -35,7 +35,7 @@ from sickgear.common import Quality, ARCHIVED, DOWNLOADED, WANTED, UNAIRED, SNAT
 from sickgear.event_queue import Events
 from sickgear.tv import TVEpisode, TVShow
 from sickgear.webserveInit import WebServer
-from sickgear import webapi, scheduler, search_backlog, search_queue, show_queue, history, db
+from sickgear import webapi, webserve, scheduler, search_backlog, search_queue, show_queue, history, db
 from sickgear.scene_numbering import set_scene_numbering_helper
 from lib import requests
 from six import integer_types, iteritems, iterkeys, itervalues, string_types
@@ -457,6 +457,36 @@ class WebAPICase(test.SickbeardTestDBCase):
         self.assertEqual(data['message'], 'Pong')
         self.assertEqual(data['result'], 'success')
 
+    def test_get_network_icon(self):
+        url = 'http://127.0.0.1:%s/api/%s' % (sickgear.WEB_PORT, sickgear.API_KEYS[0][1])
+        params = {'cmd': webapi._functionMaper_reversed[webapi.CMD_SickGearGetNetworkIcon], 'network': '2be'}
+        with open(os.path.join(sickgear.PROG_DIR, 'gui', 'slick', 'images', 'network', '2be.png'), 'rb') as f:
+            image = f.read()
+        response = requests.get(url, params=params)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(image, response.content)
+        self.assertEqual('image/png', response.headers['Content-Type'])
+        etag = response.headers['Etag']
+
+        response = requests.get(url, params=params, headers={'If-None-Match': etag})
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b'', response.content)
+        response = requests.get(url, params=params, headers={'If-None-Match': '"other"'})
+        self.assertEqual(image, response.content)
+        response = requests.get(url, params=params,
+                                headers={'If-Modified-Since': response.headers['Last-Modified']})
+        self.assertEqual(304, response.status_code)
+
+    def test_static_image_cache_headers(self):
+        url = 'http://127.0.0.1:%s/images/poster.png' % sickgear.WEB_PORT
+        response = requests.get(url, params={'v': '1'})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('max-age=%s, immutable' % webserve.BaseStaticFileHandler.CACHE_MAX_AGE,
+                         response.headers['Cache-Control'])
+        self.assertNotIn('Pragma', response.headers)
+        response = requests.get(url)
+        self.assertEqual('no-cache, max-age=0', response.headers['Cache-Control'])
+
     def test_get_indexers(self):
         data = self._request_from_api(webapi.CMD_SickGearGetIndexers)
         self._check_success_base_response(data, webapi.CMD_SickGearGetIndexers)